@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class AnyhedgeConfig(AppConfig):
     name = 'anyhedge'
+
+    def ready(self):
+        import anyhedge.signals
@@ -27,7 +27,9 @@ default_settings = {
     "ANYHEDGE_DEFAULT_ORACLE_RELAY": "",
     "ANYHEDGE_DEFAULT_ORACLE_PORT": 0,
     "ANYHEDGE_DEFAULT_ORACLE_PUBKEY": "",
+    "ANYHEDGE_ORACLE_BROADCAST_PORT": 7084,
     "ANYHEDGE_SETTLEMENT_SERVICE_AUTH_TOKEN": "",
+    "ANYHEDGE_PRICE_MESSAGE_RETENTION_DAYS": 30,
 }
 
 # In case you need to read settings from the main project settings
@@ -26,3 +26,8 @@ class AnyhedgeUpdatesConsumer(AsyncJsonWebsocketConsumer):
         del data["type"]
         data = data["data"]
         await self.send(json.dumps(data))
+
+    async def send_updates(self, data):
+        # coalesced updates, see `anyhedge.utils.websocket.flush_updates`
+        for update in data["data"]:
+            await self.send(json.dumps(update))
@@ -10,6 +10,7 @@ from .models import (
 
     Oracle,
     PriceOracleMessage,
+    PriceOracleMessageOHLC,
 )
 
 class TimestampFilter(filters.NumberFilter):
@@ -128,3 +129,17 @@ class PriceOracleMessageFilter(filters.FilterSet):
             "message_sequence_after",
             "message_sequence_before",
         ]
+
+
+class PriceOracleMessageOHLCFilter(filters.FilterSet):
+    pubkey = filters.CharFilter(field_name="pubkey")
+    timestamp_after = TimestampFilter(field_name="bucket_start", lookup_expr="gt")
+    timestamp_before = TimestampFilter(field_name="bucket_start", lookup_expr="lt")
+
+    class Meta:
+        model = PriceOracleMessageOHLC
+        fields = [
+            "pubkey",
+            "timestamp_after",
+            "timestamp_before",
+        ]
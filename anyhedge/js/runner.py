@@ -58,3 +58,33 @@ def generate_func(func_name):
         return result
 
     return func
+
+
+def run_batch(calls):
+    """
+        Run many function calls in a single node process instead of one process per call
+
+    Parameters
+    ------------
+        calls: list((func_name, args))
+
+    Returns
+    ------------
+        results: list
+            in the same order as `calls`, failed calls are returned as `Exception` instances
+    """
+    if not len(calls):
+        return []
+
+    batch_calls = [{ "function": func_name, "params": list(args) } for func_name, args in calls]
+    batch_results = AnyhedgeFunctions.batch(batch_calls)
+    if not isinstance(batch_results, list) or len(batch_results) != len(calls):
+        raise Exception(f"batch | unexpected response: {batch_results}")
+
+    results = []
+    for batch_result in batch_results:
+        if batch_result.get("success"):
+            results.append(batch_result.get("result"))
+        else:
+            results.append(Exception(batch_result.get("error")))
+    return results
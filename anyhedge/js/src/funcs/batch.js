@@ -0,0 +1,29 @@
+import funcs from './index.js'
+
+/**
+ * @typedef {Object} BatchCall
+ * @property {String} function - name of a function in funcs/index.js
+ * @property {Array} [params]
+ */
+
+/**
+ * Run many function calls in a single process instead of spawning one process per call,
+ * results are in the same order as the calls
+ * @param {BatchCall[]} calls
+ */
+export async function batch(calls) {
+  if (!Array.isArray(calls)) throw 'expected array of function calls'
+
+  const promises = calls.map(async (call) => {
+    const func = funcs[call?.function]
+    if (!func || func === batch) throw `'${call?.function}' function not found`
+    return func(...(call.params || []))
+  })
+
+  const results = await Promise.allSettled(promises)
+  return results.map(result => {
+    if (result.status === 'fulfilled') return { success: true, result: result.value }
+    const reason = result.reason
+    return { success: false, error: typeof reason === 'string' ? reason : reason?.message || String(reason) }
+  })
+}
@@ -1,4 +1,5 @@
 import { getSettlementServiceAuthToken } from './authToken.js'
+import { batch } from './batch.js'
 import { compileContract, create } from './create.js'
 import { calculateFundingAmounts, completeFundingProposal } from './funding.js'
 import { completeMutualRedemption } from './mutual-settlement.js'
@@ -22,6 +23,7 @@ const funcs = {
     getContractStatus,
     sum,
     asyncSum,
+    batch,
 }
 
 export default funcs
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from anyhedge.tasks import liquidate_contract
+from anyhedge.utils.liquidation import LiquidationIndex
+from anyhedge.utils.price_oracle_stream import PriceOracleStream
+from anyhedge.utils.summary import update_wallet_position_summaries_price
+
+
+class Command(BaseCommand):
+    help = "Stream and save price messages of active oracles, and liquidate contracts as prices come in"
+
+    def handle(self, *args, **options):
+        liquidation_index = LiquidationIndex()
+
+        def on_save(price_oracle_messages):
+            liquidation_index.handle_price_messages(
+                price_oracle_messages,
+                dispatch=lambda address, message_sequence: liquidate_contract.delay(address, message_sequence),
+            )
+            update_wallet_position_summaries_price(price_oracle_messages)
+
+        stream = PriceOracleStream(on_save=on_save)
+        stream.run()
@@ -0,0 +1,27 @@
+import logging
+from django.core.management.base import BaseCommand
+
+from anyhedge.models import HedgePosition
+from anyhedge.utils.summary import refresh_wallet_position_summaries
+
+LOGGER = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Recompute position summaries of all wallets with funded contracts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        funded_contracts = HedgePosition.objects.filter(funding_tx_hash__isnull=False).exclude(funding_tx_hash="")
+        wallet_hashes = set(funded_contracts.values_list("hedge_wallet_hash", flat=True).distinct())
+        wallet_hashes.update(funded_contracts.values_list("long_wallet_hash", flat=True).distinct())
+        wallet_hashes.discard("")
+        wallet_hashes = sorted(wallet_hashes)
+
+        for index in range(0, len(wallet_hashes), batch_size):
+            batch = wallet_hashes[index:index+batch_size]
+            refresh_wallet_position_summaries(batch)
+            LOGGER.info(f"Refreshed position summaries of {index + len(batch)}/{len(wallet_hashes)} wallet/s")
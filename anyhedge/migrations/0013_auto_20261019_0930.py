@@ -0,0 +1,28 @@
+# Generated by Django 3.0.14 on 2026-10-19 09:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('anyhedge', '0012_oracle_active'),
+    ]
+
+    operations = [
+        # remove duplicate messages saved before the unique constraint, keeping the earliest saved row
+        migrations.RunSQL(
+            sql="""
+                DELETE FROM anyhedge_priceoraclemessage a
+                USING anyhedge_priceoraclemessage b
+                WHERE a.pubkey = b.pubkey
+                    AND a.message_sequence = b.message_sequence
+                    AND a.id > b.id
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AlterUniqueTogether(
+            name='priceoraclemessage',
+            unique_together={('pubkey', 'message_sequence')},
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.0.14 on 2026-10-19 10:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('anyhedge', '0013_auto_20261019_0930'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hedgepositionoffer',
+            name='satoshis_bucket',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunSQL(
+            sql="UPDATE anyhedge_hedgepositionoffer SET satoshis_bucket = FLOOR(satoshis / 10000.0)",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name='hedgepositionoffercounterparty',
+            name='settlement_deadline',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='hedgepositionoffer',
+            index=models.Index(condition=models.Q(status='pending'), fields=['oracle_pubkey', 'position', 'duration_seconds', 'low_liquidation_multiplier', 'high_liquidation_multiplier', 'satoshis_bucket', 'satoshis'], name='anyhedge_offer_book_idx'),
+        ),
+    ]
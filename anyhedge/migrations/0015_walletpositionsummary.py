@@ -0,0 +1,33 @@
+# Generated by Django 3.0.14 on 2026-10-19 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('anyhedge', '0014_auto_20261019_1015'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WalletPositionSummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('wallet_hash', models.CharField(db_index=True, max_length=75)),
+                ('oracle_pubkey', models.CharField(db_index=True, max_length=75)),
+                ('position', models.CharField(choices=[('hedge', 'Hedge'), ('long', 'Long')], max_length=5)),
+                ('open_count', models.IntegerField(default=0)),
+                ('total_nominal_unit_sats', models.BigIntegerField(default=0)),
+                ('total_sats', models.BigIntegerField(default=0)),
+                ('total_payout_sats', models.BigIntegerField(default=0)),
+                ('price_value', models.IntegerField(blank=True, null=True)),
+                ('price_message_sequence', models.IntegerField(blank=True, null=True)),
+                ('unrealized_pnl_sats', models.BigIntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('wallet_hash', 'oracle_pubkey', 'position')},
+            },
+        ),
+    ]
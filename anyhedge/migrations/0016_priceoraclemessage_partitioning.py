@@ -0,0 +1,136 @@
+# Generated by Django 3.0.14 on 2026-10-19 11:40
+
+from django.db import migrations, models
+import psqlextra.backend.migrations.operations.create_partitioned_model
+import psqlextra.manager.manager
+import psqlextra.models.partitioned
+
+
+# The old table is renamed and stripped of its constraints & indexes so their names
+# are free for the partitioned table created below
+DETACH_OLD_TABLE_SQL = """
+ALTER TABLE anyhedge_priceoraclemessage RENAME TO anyhedge_priceoraclemessage_old;
+ALTER SEQUENCE IF EXISTS anyhedge_priceoraclemessage_id_seq RENAME TO anyhedge_priceoraclemessage_old_id_seq;
+DO $$
+DECLARE r record;
+BEGIN
+    FOR r IN SELECT conname FROM pg_constraint WHERE conrelid = 'anyhedge_priceoraclemessage_old'::regclass LOOP
+        EXECUTE format('ALTER TABLE anyhedge_priceoraclemessage_old DROP CONSTRAINT %I', r.conname);
+    END LOOP;
+    FOR r IN SELECT indexname FROM pg_indexes WHERE tablename = 'anyhedge_priceoraclemessage_old' LOOP
+        EXECUTE format('DROP INDEX %I', r.indexname);
+    END LOOP;
+END $$;
+"""
+
+# Monthly partitions from the oldest message up to 3 months ahead, named & commented the same way
+# as the partitions created by `anyhedge.partitioning.manager` so it picks them up as its own
+COPY_DATA_SQL = """
+DO $$
+DECLARE
+    month_start date;
+    last_month date := date_trunc('month', now() + interval '3 months')::date;
+    partition_name text;
+BEGIN
+    SELECT COALESCE(date_trunc('month', MIN(message_timestamp)), date_trunc('month', now()))::date
+    INTO month_start FROM anyhedge_priceoraclemessage_old;
+
+    WHILE month_start <= last_month LOOP
+        partition_name := 'anyhedge_priceoraclemessage_' || to_char(month_start, 'YYYY') || '_' || lower(to_char(month_start, 'Mon'));
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF anyhedge_priceoraclemessage FOR VALUES FROM (%L) TO (%L)',
+            partition_name, month_start, (month_start + interval '1 month')::date
+        );
+        EXECUTE format('COMMENT ON TABLE %I IS %L', partition_name, 'psqlextra_auto_partitioned');
+        month_start := (month_start + interval '1 month')::date;
+    END LOOP;
+END $$;
+
+INSERT INTO anyhedge_priceoraclemessage (
+    id, pubkey, signature, message, message_timestamp, price_value, price_sequence, message_sequence
+)
+SELECT id, pubkey, signature, message, message_timestamp, price_value, price_sequence, message_sequence
+FROM anyhedge_priceoraclemessage_old
+ON CONFLICT DO NOTHING;
+
+DROP TABLE anyhedge_priceoraclemessage_old;
+
+SELECT setval(
+    pg_get_serial_sequence('anyhedge_priceoraclemessage', 'id'),
+    COALESCE((SELECT MAX(id) FROM anyhedge_priceoraclemessage), 0) + 1,
+    false
+);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('anyhedge', '0015_walletpositionsummary'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(DETACH_OLD_TABLE_SQL, reverse_sql=migrations.RunSQL.noop),
+            ],
+            state_operations=[
+                migrations.DeleteModel(
+                    name='PriceOracleMessage',
+                ),
+            ],
+        ),
+        psqlextra.backend.migrations.operations.create_partitioned_model.PostgresCreatePartitionedModel(
+            name='PriceOracleMessage',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pubkey', models.CharField(db_index=True, max_length=75)),
+                ('signature', models.CharField(max_length=130)),
+                ('message', models.CharField(max_length=40)),
+                ('message_timestamp', models.DateTimeField(db_index=True)),
+                ('price_value', models.IntegerField()),
+                ('price_sequence', models.IntegerField(db_index=True)),
+                ('message_sequence', models.IntegerField(db_index=True)),
+            ],
+            options={
+                'ordering': ['-message_timestamp'],
+                'unique_together': {('pubkey', 'message_sequence', 'message_timestamp')},
+                'abstract': False,
+                'base_manager_name': 'objects',
+            },
+            partitioning_options={
+                'method': 'range',
+                'key': ['message_timestamp'],
+            },
+            bases=(psqlextra.models.partitioned.PostgresPartitionedModel,),
+            managers=[
+                ('objects', psqlextra.manager.manager.PostgresManager()),
+            ],
+        ),
+        migrations.RunSQL(COPY_DATA_SQL, reverse_sql=migrations.RunSQL.noop),
+        migrations.CreateModel(
+            name='PriceOracleMessageOHLC',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pubkey', models.CharField(db_index=True, max_length=75)),
+                ('bucket_start', models.DateTimeField(db_index=True)),
+                ('bucket_seconds', models.IntegerField(default=3600)),
+                ('open', models.IntegerField()),
+                ('high', models.IntegerField()),
+                ('low', models.IntegerField()),
+                ('close', models.IntegerField()),
+                ('open_sequence', models.IntegerField()),
+                ('close_sequence', models.IntegerField()),
+                ('message_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-bucket_start'],
+                'unique_together': {('pubkey', 'bucket_seconds', 'bucket_start')},
+                'abstract': False,
+                'base_manager_name': 'objects',
+            },
+            managers=[
+                ('objects', psqlextra.manager.manager.PostgresManager()),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 3.0.14 on 2026-10-19 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('anyhedge', '0016_priceoraclemessage_partitioning'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='priceoraclemessageohlc',
+            name='pruned',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='hedgeposition',
+            index=models.Index(fields=['oracle_pubkey', 'start_timestamp'], name='anyhedge_position_start_idx'),
+        ),
+    ]
@@ -1,5 +1,9 @@
+from datetime import timedelta
 from django.db import models
 from django.contrib.postgres.fields import ArrayField
+from django.utils import timezone
+from psqlextra.models import PostgresModel, PostgresPartitionedModel
+from psqlextra.types import PostgresPartitioningMethod
 
 # Create your models here.
 class HedgePositionQuerySet(models.QuerySet):
@@ -95,6 +99,10 @@ class HedgePosition(models.Model):
 
     class Meta:
         ordering = ['-start_timestamp']
+        indexes = [
+            # price messages used as a contract's starting price are kept when removing old price messages
+            models.Index(fields=["oracle_pubkey", "start_timestamp"], name="anyhedge_position_start_idx"),
+        ]
 
 
     @property
@@ -145,10 +153,8 @@ class HedgePosition(models.Model):
             if price_oracle_message.pubkey == self.oracle_pubkey and price_oracle_message.message_timestamp == self.start_timestamp:
                 return price_oracle_message
 
-        self._price_oracle_message = PriceOracleMessage.objects.filter(
-            pubkey=self.oracle_pubkey,
-            message_timestamp=self.start_timestamp,
-        ).first()
+        from .utils.price_cache import get_price_oracle_message_at_timestamp
+        self._price_oracle_message = get_price_oracle_message_at_timestamp(self.oracle_pubkey, self.start_timestamp)
         return self._price_oracle_message
         
 
@@ -263,7 +269,41 @@ class MutualRedemption(models.Model):
     funding_tx_hash = models.CharField(max_length=75, null=True, blank=True)
 
 
+class HedgePositionOfferQuerySet(models.QuerySet):
+    def order_book(self, position="", duration_seconds=0, low_liquidation_multiplier=0, high_liquidation_multiplier=0, oracle_pubkey="", now=None):
+        """
+            Open offers with the same contract terms, covered by the partial index `anyhedge_offer_book_idx`
+        """
+        if now is None:
+            now = timezone.now()
+
+        return self.filter(
+            models.Q(expires_at__isnull=True) | models.Q(expires_at__gte=now),
+            status=HedgePositionOffer.STATUS_PENDING,
+            oracle_pubkey=oracle_pubkey,
+            position=position,
+            duration_seconds=duration_seconds,
+            low_liquidation_multiplier=low_liquidation_multiplier,
+            high_liquidation_multiplier=high_liquidation_multiplier,
+        )
+
+    def filter_satoshis_range(self, min_satoshis, max_satoshis):
+        """
+            Filters by satoshis bucket first so the range scan only reads the buckets overlapping the range
+        """
+        min_bucket = HedgePositionOffer.get_satoshis_bucket(min_satoshis)
+        max_bucket = HedgePositionOffer.get_satoshis_bucket(max_satoshis)
+        return self.filter(
+            satoshis_bucket__gte=min_bucket,
+            satoshis_bucket__lte=max_bucket,
+            satoshis__gte=min_satoshis,
+            satoshis__lte=max_satoshis,
+        )
+
+
 class HedgePositionOffer(models.Model):
+    SATOSHIS_BUCKET_SIZE = 10 ** 4
+
     STATUS_PENDING = "pending"
     STATUS_ACCEPTED = "accepted"
     STATUS_SETTLED = "settled"
@@ -288,6 +328,7 @@ class HedgePositionOffer(models.Model):
     position = models.CharField(max_length=5, choices=POSITIONS, null=True, blank=True)
     wallet_hash = models.CharField(max_length=100, db_index=True)
     satoshis = models.BigIntegerField()
+    satoshis_bucket = models.BigIntegerField(default=0)
 
     duration_seconds = models.IntegerField()
     high_liquidation_multiplier = models.FloatField()
@@ -309,6 +350,36 @@ class HedgePositionOffer(models.Model):
     expires_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = HedgePositionOfferQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                name="anyhedge_offer_book_idx",
+                fields=[
+                    "oracle_pubkey",
+                    "position",
+                    "duration_seconds",
+                    "low_liquidation_multiplier",
+                    "high_liquidation_multiplier",
+                    "satoshis_bucket",
+                    "satoshis",
+                ],
+                condition=models.Q(status="pending"),
+            ),
+        ]
+
+    @classmethod
+    def get_satoshis_bucket(cls, satoshis):
+        return int(satoshis // cls.SATOSHIS_BUCKET_SIZE)
+
+    def save(self, *args, **kwargs):
+        self.satoshis_bucket = self.get_satoshis_bucket(self.satoshis)
+        update_fields = kwargs.get("update_fields", None)
+        if update_fields is not None and "satoshis" in update_fields:
+            kwargs["update_fields"] = { *update_fields, "satoshis_bucket" }
+        return super().save(*args, **kwargs)
+
     def get_counter_party_info(self):
         try:
             return self.counter_party_info
@@ -347,7 +418,7 @@ class HedgePositionOfferCounterParty(models.Model):
     settlement_service_fee = models.IntegerField(default=0)
     settlement_service_fee_address = models.CharField(max_length=75, default='')
 
-    settlement_deadline = models.DateTimeField(null=True, blank=True)
+    settlement_deadline = models.DateTimeField(null=True, blank=True, db_index=True)
 
     @property
     def price_oracle_message(self):
@@ -359,10 +430,8 @@ class HedgePositionOfferCounterParty(models.Model):
             if price_oracle_message.pubkey == pubkey and price_oracle_message.message_sequence == message_sequence:
                 return price_oracle_message
 
-        self._price_oracle_message = PriceOracleMessage.objects.filter(
-            pubkey=pubkey,
-            message_sequence=message_sequence,
-        ).first()
+        from .utils.price_cache import get_price_oracle_message_by_sequence
+        self._price_oracle_message = get_price_oracle_message_by_sequence(pubkey, message_sequence)
         return self._price_oracle_message
 
 class Oracle(models.Model):
@@ -376,7 +445,11 @@ class Oracle(models.Model):
     asset_decimals = models.IntegerField(default=0)
 
 
-class PriceOracleMessage(models.Model):
+class PriceOracleMessage(PostgresPartitionedModel):
+    """
+    Partitioned by month of message_timestamp, see `anyhedge.partitioning`.
+    Old messages are rolled into `PriceOracleMessageOHLC` and removed, see `anyhedge.utils.price_history`
+    """
     pubkey = models.CharField(max_length=75, db_index=True)
     signature = models.CharField(max_length=130)
     message = models.CharField(max_length=40)
@@ -385,5 +458,106 @@ class PriceOracleMessage(models.Model):
     price_sequence = models.IntegerField(db_index=True)
     message_sequence = models.IntegerField(db_index=True)
 
+    class PartitioningMeta:
+        method = PostgresPartitioningMethod.RANGE
+        key = ["message_timestamp"]
+
     class Meta:
         ordering = ['-message_timestamp']
+        # unique constraints of partitioned tables must include the partition key
+        unique_together = (
+            ("pubkey", "message_sequence", "message_timestamp"),
+        )
+
+
+class PriceOracleMessageOHLC(PostgresModel):
+    """
+    Downsampled price messages of an oracle, one row per bucket
+    """
+    BUCKET_SECONDS_HOUR = 60 * 60
+
+    pubkey = models.CharField(max_length=75, db_index=True)
+    bucket_start = models.DateTimeField(db_index=True)
+    bucket_seconds = models.IntegerField(default=BUCKET_SECONDS_HOUR)
+
+    open = models.IntegerField()
+    high = models.IntegerField()
+    low = models.IntegerField()
+    close = models.IntegerField()
+
+    open_sequence = models.IntegerField()
+    close_sequence = models.IntegerField()
+    message_count = models.IntegerField(default=0)
+
+    # the bucket's price messages are removed, except those kept for contracts & offers
+    pruned = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ['-bucket_start']
+        unique_together = (
+            ("pubkey", "bucket_seconds", "bucket_start"),
+        )
+
+    @property
+    def bucket_end(self):
+        return self.bucket_start + timedelta(seconds=self.bucket_seconds)
+
+    def get_closest_price(self, timestamp):
+        """
+        Returns (price_value, timestamp) of the bucket's open or close, whichever is closer to the timestamp
+        """
+        if timestamp - self.bucket_start <= self.bucket_end - timestamp:
+            return self.open, self.bucket_start
+        return self.close, self.bucket_end
+
+
+class WalletPositionSummary(models.Model):
+    """
+    Totals of a wallet's open (funded & unsettled) contracts per oracle & position.
+    Refreshed per wallet on funding & settlement, and price values are updated on new price messages
+    """
+    POSITION_HEDGE = "hedge"
+    POSITION_LONG = "long"
+    POSITIONS = [
+        POSITION_HEDGE,
+        POSITION_LONG,
+    ]
+    POSITIONS = [(POSITION, POSITION.replace('_', ' ').capitalize()) for POSITION in POSITIONS]
+
+    wallet_hash = models.CharField(max_length=75, db_index=True)
+    oracle_pubkey = models.CharField(max_length=75, db_index=True)
+    position = models.CharField(max_length=5, choices=POSITIONS)
+
+    open_count = models.IntegerField(default=0)
+    total_nominal_unit_sats = models.BigIntegerField(default=0) # sum of satoshis * start_price
+    total_sats = models.BigIntegerField(default=0) # sats put in by the wallet
+    total_payout_sats = models.BigIntegerField(default=0) # sats locked in the contracts
+
+    price_value = models.IntegerField(null=True, blank=True)
+    price_message_sequence = models.IntegerField(null=True, blank=True)
+    unrealized_pnl_sats = models.BigIntegerField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = (
+            ("wallet_hash", "oracle_pubkey", "position"),
+        )
+
+    @classmethod
+    def get_unrealized_pnl_expression(cls, price_value):
+        """
+            Liquidation bounds are ignored since contracts that cross them are liquidated & removed from the totals
+        """
+        hedge_payout = models.F("total_nominal_unit_sats") / models.Value(price_value)
+        return models.Case(
+            models.When(position=cls.POSITION_HEDGE, then=hedge_payout - models.F("total_sats")),
+            default=models.F("total_payout_sats") - hedge_payout - models.F("total_sats"),
+            output_field=models.BigIntegerField(),
+        )
+
+    def calculate_unrealized_pnl(self, price_value):
+        hedge_payout = self.total_nominal_unit_sats // price_value
+        if self.position == self.POSITION_HEDGE:
+            return hedge_payout - self.total_sats
+        return self.total_payout_sats - hedge_payout - self.total_sats
@@ -0,0 +1,18 @@
+from psqlextra.partitioning import (
+    PostgresPartitioningManager,
+    partition_by_current_time,
+)
+
+from .models import PriceOracleMessage
+
+
+# Monthly partitions of price messages, kept 3 months ahead.
+# Old partitions are not dropped here, old messages are downsampled & removed by
+# `anyhedge.tasks.downsample_price_oracle_messages` which keeps messages referenced by contracts
+manager = PostgresPartitioningManager([
+    partition_by_current_time(
+        model=PriceOracleMessage,
+        count=3,
+        months=1,
+    ),
+])
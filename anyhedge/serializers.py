@@ -21,6 +21,8 @@ from .models import (
 
     Oracle,
     PriceOracleMessage,
+    PriceOracleMessageOHLC,
+    WalletPositionSummary,
 )
 from .utils.address import match_pubkey_to_cash_address
 from .utils.contract import (
@@ -40,6 +42,10 @@ from .utils.liquidity import (
     find_close_matching_offer_suggestion,
     fund_hedge_position,
 )
+from .utils.price_cache import (
+    get_latest_price_oracle_message,
+    get_price_oracle_message_by_sequence,
+)
 from .utils.price_oracle import (
     get_price_messages,
     save_price_oracle_message,
@@ -854,15 +860,12 @@ class HedgePositionOfferCounterPartySerializer(serializers.ModelSerializer):
 
     def get_price_message(self, oracle_pubkey, oracle_message_sequence=None):
         now = timezone.now()
-        query_kwargs = {
-            "pubkey": oracle_pubkey,
-        }
         if oracle_message_sequence:
-            query_kwargs["message_sequence"] = oracle_message_sequence
+            price_oracle_message = get_price_oracle_message_by_sequence(oracle_pubkey, oracle_message_sequence)
         else:
-            query_kwargs["message_timestamp__gte"] = now - timedelta(seconds=60)
-
-        price_oracle_message = PriceOracleMessage.objects.filter(**query_kwargs).order_by("-message_timestamp").first()
+            price_oracle_message = get_latest_price_oracle_message(oracle_pubkey)
+            if price_oracle_message and price_oracle_message.message_timestamp < now - timedelta(seconds=60):
+                price_oracle_message = None
 
         if not price_oracle_message:
             query_kwargs = { "count": 1 }
@@ -1272,10 +1275,10 @@ class FundGeneralProcotolLPContractSerializer(serializers.Serializer):
 
             starting_oracle_message = ""
             starting_oracle_signature = ""
-            price_oracle_message = PriceOracleMessage.objects.filter(
-                pubkey=contract_metadata["oraclePublicKey"],
-                message_sequence=oracle_message_sequence,
-            ).first()
+            price_oracle_message = get_price_oracle_message_by_sequence(
+                contract_metadata["oraclePublicKey"],
+                oracle_message_sequence,
+            )
             if price_oracle_message:
                 starting_oracle_message = price_oracle_message.message
                 starting_oracle_signature = price_oracle_message.signature
@@ -1381,3 +1384,68 @@ class PriceOracleMessageSerializer(serializers.ModelSerializer):
             "message",
             "signature",
         ]
+
+
+class PriceOracleMessageOHLCSerializer(serializers.ModelSerializer):
+    """
+    Price messages that are no longer kept at full resolution, in the same shape as
+    `PriceOracleMessageSerializer` using the bucket's first message & with the bucket's OHLC
+    """
+    message_timestamp = TimestampField(source="bucket_start")
+    price_value = serializers.IntegerField(source="open")
+    price_sequence = serializers.SerializerMethodField()
+    message_sequence = serializers.IntegerField(source="open_sequence")
+    message = serializers.SerializerMethodField()
+    signature = serializers.SerializerMethodField()
+    ohlc = serializers.SerializerMethodField()
+
+    class Meta:
+        model = PriceOracleMessageOHLC
+        fields = [
+            "pubkey",
+            "message_timestamp",
+            "price_value",
+            "price_sequence",
+            "message_sequence",
+            "message",
+            "signature",
+            "ohlc",
+        ]
+
+    def get_price_sequence(self, obj):
+        return None
+
+    def get_message(self, obj):
+        return None
+
+    def get_signature(self, obj):
+        return None
+
+    def get_ohlc(self, obj):
+        return {
+            "bucket_seconds": obj.bucket_seconds,
+            "open": obj.open,
+            "high": obj.high,
+            "low": obj.low,
+            "close": obj.close,
+            "close_sequence": obj.close_sequence,
+            "message_count": obj.message_count,
+        }
+
+
+class WalletPositionSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WalletPositionSummary
+        fields = [
+            "wallet_hash",
+            "oracle_pubkey",
+            "position",
+            "open_count",
+            "total_nominal_unit_sats",
+            "total_sats",
+            "total_payout_sats",
+            "price_value",
+            "price_message_sequence",
+            "unrealized_pnl_sats",
+            "updated_at",
+        ]
@@ -0,0 +1,31 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import (
+    HedgePosition,
+    HedgeSettlement,
+)
+from .utils.maturity import (
+    schedule_contract_maturity,
+    unschedule_contract_maturity,
+)
+from .utils.summary import get_hedge_position_wallet_hashes
+from .tasks import update_wallet_position_summaries
+
+
+@receiver(post_save, sender=HedgePosition)
+def hedge_position_post_save(sender, instance=None, created=False, **kwargs):
+    if instance.funding_tx_hash:
+        schedule_contract_maturity(instance)
+
+        wallet_hashes = get_hedge_position_wallet_hashes(instance)
+        transaction.on_commit(lambda: update_wallet_position_summaries.delay(wallet_hashes))
+
+
+@receiver(post_save, sender=HedgeSettlement)
+def hedge_settlement_post_save(sender, instance=None, created=False, **kwargs):
+    unschedule_contract_maturity(instance.hedge_position.address)
+
+    wallet_hashes = get_hedge_position_wallet_hashes(instance.hedge_position)
+    transaction.on_commit(lambda: update_wallet_position_summaries.delay(wallet_hashes))
@@ -3,7 +3,6 @@ import pytz
 from datetime import datetime
 from celery import shared_task
 from django.db import models
-from django.utils import timezone
 from main.tasks import broadcast_transaction
 from .models import (
     MutualRedemption,
@@ -11,36 +10,60 @@ from .models import (
     HedgeSettlement,
     HedgePositionFunding,
     Oracle,
-    PriceOracleMessage,
 )
+from .partitioning import manager as partitioning_manager
 from .utils.auth_token import get_settlement_service_auth_token
 from .utils.contract import get_contract_status
 from .utils.funding import (
     complete_funding_proposal,
+    complete_funding_proposals,
     search_funding_tx,
+    search_funding_txs,
     get_tx_hash,
     validate_funding_transaction,
+    validate_funding_transactions,
     attach_funding_tx_to_wallet_history_meta,
 )
-from .utils.liquidity import resolve_liquidity_fee
+from .utils.liquidity import (
+    get_liquidity_fee_cursor,
+    set_liquidity_fee_cursor,
+    resolve_liquidity_fee,
+    resolve_liquidity_fees,
+    update_hedge_position_offer_deadline,
+)
+from .utils.maturity import (
+    claim_due_contract_maturities,
+    sync_maturity_schedule,
+    unschedule_contract_maturity,
+)
+from .utils.price_cache import get_latest_price_oracle_message
+from .utils.price_history import downsample_price_oracle_messages as _downsample_price_oracle_messages
 from .utils.price_oracle import (
+    bulk_save_price_oracle_messages,
     get_price_messages,
     parse_oracle_message,
-    save_price_oracle_message,
 )
 from .utils.push_notification import (
     send_contract_matured,
 )
+from .utils.summary import (
+    refresh_wallet_position_summaries,
+    update_wallet_position_summaries_price,
+)
 from .utils.settlement import (
     get_contracts_for_liquidation,
     search_settlement_tx,
+    search_settlement_txs,
     settle_hedge_position_maturity,
+    settle_hedge_positions_maturity,
     liquidate_hedge_position,
     complete_mutual_redemption,
+    complete_mutual_redemptions,
     save_settlement_data_from_mutual_redemption,
     attach_settlement_tx_to_wallet_history_meta,
 )
 from .utils.websocket import (
+    flush_updates,
     send_settlement_update,
     send_funding_tx_update,
 )
@@ -51,6 +74,14 @@ _TASK_TIME_LIMIT = 300 # 5 minutes
 _QUEUE_PRICE_ORACLE = "anyhedge__price_oracle"
 _QUEUE_SETTLEMENT_UPDATE = "anyhedge__settlement_updates"
 _QUEUE_FUNDING_PARSER = "anyhedge__funding_parser"
+_QUEUE_WEBSOCKET_UPDATES = "anyhedge__websocket_updates"
+
+# max number of contracts per batch task
+SETTLEMENT_BATCH_SIZE = 25
+# max number of contracts per funding transactions fetch in `parse_contracts_liquidity_fee`
+LIQUIDITY_FEE_BATCH_SIZE = 100
+# max number of batches per run of `parse_contracts_liquidity_fee`, the next run continues where it stopped
+LIQUIDITY_FEE_MAX_BATCHES = 10
 
 
 LOGGER = logging.getLogger(__name__)
@@ -67,11 +98,10 @@ def check_new_price_messages():
 @shared_task(queue=_QUEUE_PRICE_ORACLE, time_limit=_TASK_TIME_LIMIT)
 def check_new_oracle_price_messages(oracle_pubkey):
     LOGGER.info(f"Updating prices for oracle: {oracle_pubkey}")
-    latest_timestamp = PriceOracleMessage.objects.filter(
-        pubkey=oracle_pubkey,
-    ).aggregate(
-        latest_timestamp = models.Max("message_timestamp"),
-    ).get("latest_timestamp")
+    latest_timestamp = None
+    latest_price_oracle_message = get_latest_price_oracle_message(oracle_pubkey)
+    if latest_price_oracle_message:
+        latest_timestamp = latest_price_oracle_message.message_timestamp
 
     count = 5
     if latest_timestamp is not None:
@@ -97,8 +127,23 @@ def check_new_oracle_price_messages(oracle_pubkey):
         min_message_timestamp=latest_timestamp, count=count,
     )
 
-    for price_message in price_messages:
-        save_price_oracle_message(oracle_pubkey, price_message)
+    # gaps are normally filled by the `anyhedge_price_oracle_stream` command,
+    # this remains as a fallback when the stream is down
+    price_oracle_messages = bulk_save_price_oracle_messages(oracle_pubkey, price_messages)
+    update_wallet_position_summaries_price(price_oracle_messages)
+
+
+@shared_task(queue=_QUEUE_PRICE_ORACLE, time_limit=_TASK_TIME_LIMIT)
+def update_price_oracle_message_partitions():
+    # only creates the upcoming partitions, old messages are removed by `downsample_price_oracle_messages`
+    plan = partitioning_manager.plan(skip_delete=True)
+    plan.apply()
+    return [partition.name() for partition in plan.creations]
+
+
+@shared_task(queue=_QUEUE_PRICE_ORACLE, time_limit=_TASK_TIME_LIMIT)
+def downsample_price_oracle_messages():
+    return _downsample_price_oracle_messages()
 
 @shared_task(queue=_QUEUE_SETTLEMENT_UPDATE, time_limit=_TASK_TIME_LIMIT)
 def update_contracts_for_liquidation():
@@ -112,31 +157,58 @@ def update_contracts_for_liquidation():
 
 
 @shared_task(queue=_QUEUE_SETTLEMENT_UPDATE, time_limit=_TASK_TIME_LIMIT)
-def update_matured_contracts():
-    matured_hedge_positions = HedgePosition.objects.filter(
-        funding_tx_hash__isnull=False,
-        maturity_timestamp__lte=timezone.now(),
-        settlements__isnull=True
-    ).exclude(
-        funding_tx_hash=""
+def settle_due_contracts():
+    """
+        Dispatch settlement of contracts in the maturity schedule that are due,
+        only reads the schedule in redis instead of scanning contracts in the db
+    """
+    contract_addresses = claim_due_contract_maturities()
+    if not contract_addresses:
+        return []
+
+    hedge_positions = HedgePosition.objects.filter(
+        address__in=contract_addresses,
+    ).select_related("settlement_service").annotate(
+        settled=models.Exists(HedgeSettlement.objects.filter(hedge_position_id=models.OuterRef("pk"))),
     )
 
-    contract_addresses = []
-    for hedge_position in matured_hedge_positions:
+    dispatched_addresses = []
+    addresses_to_settle = []
+    for hedge_position in hedge_positions:
+        if hedge_position.settled or not hedge_position.funding_tx_hash:
+            continue
+
         try:
             if hedge_position.settlement_service:
                 update_contract_settlement_from_service.delay(hedge_position.address)
         except HedgePosition.settlement_service.RelatedObjectDoesNotExist:
-            settle_contract_maturity.delay(hedge_position.address)
+            addresses_to_settle.append(hedge_position.address)
 
         try:
             send_contract_matured(hedge_position)
         except Exception as exception:
             LOGGER.exception(exception)
 
-        contract_addresses.append(hedge_position.address)
+        dispatched_addresses.append(hedge_position.address)
+
+    for index in range(0, len(addresses_to_settle), SETTLEMENT_BATCH_SIZE):
+        settle_contracts_maturity.delay(addresses_to_settle[index:index+SETTLEMENT_BATCH_SIZE])
+
+    # settled, unfunded or removed contracts
+    unschedule_contract_maturity(*[
+        address for address in contract_addresses if address not in dispatched_addresses
+    ])
+
+    return dispatched_addresses
 
-    return contract_addresses
+
+@shared_task(queue=_QUEUE_SETTLEMENT_UPDATE, time_limit=_TASK_TIME_LIMIT)
+def update_matured_contracts():
+    """
+        Fallback for the maturity schedule, reconciles it with the db then dispatches the due contracts
+    """
+    sync_maturity_schedule()
+    return settle_due_contracts()
 
 def __save_settlement(settlement_data, hedge_position_obj, funding_txid=None):
     LOGGER.info(f"SAVING SETTLEMENT FOR '{hedge_position_obj.address}': {funding_txid} - {settlement_data}")
@@ -436,6 +508,27 @@ def liquidate_contract(contract_address, message_sequence):
     return response
 
 
+def __save_submitted_funding(hedge_position_obj, tx_hash):
+    hedge_position_obj.funding_tx_hash = tx_hash
+    hedge_position_obj.save()
+
+    try:
+        metadata_obj = hedge_position_obj.metadata
+        metadata_obj.total_hedge_funding_sats = hedge_position_obj.hedge_funding_proposal.tx_value
+        metadata_obj.total_long_funding_sats = hedge_position_obj.long_funding_proposal.tx_value
+        if not metadata_obj.network_fee:
+            total_funding_sats = metadata_obj.total_hedge_funding_sats + metadata_obj.total_long_funding_sats
+            total_input_sats = hedge_position_obj.total_sats_with_fee
+            metadata_obj.network_fee = total_funding_sats - total_input_sats
+        metadata_obj.save()
+    except HedgePosition.metadata.RelatedObjectDoesNotExist:
+        LOGGER.info(f"skipping metadata update for contract({hedge_position_obj.address}), no metadata obj found")
+    except Exception as error:
+        LOGGER.exception(error)
+
+    send_funding_tx_update(hedge_position_obj, tx_hash=tx_hash)
+
+
 @shared_task(queue=_QUEUE_SETTLEMENT_UPDATE, time_limit=_TASK_TIME_LIMIT)
 def complete_contract_funding(contract_address):
     LOGGER.info(f"Attempting to complete funding for contract({contract_address})")
@@ -475,27 +568,10 @@ def complete_contract_funding(contract_address):
 
         if success:
             tx_hash = result.split(' ')[-1]
-            hedge_position_obj.funding_tx_hash = tx_hash
-            hedge_position_obj.save()
+            __save_submitted_funding(hedge_position_obj, tx_hash)
             response["success"] = True
             response["tx_hash"] = tx_hash
             response["message"] = "submitted funding transaction"
-
-            try:
-                metadata_obj = hedge_position_obj.metadata
-                metadata_obj.total_hedge_funding_sats = hedge_position_obj.hedge_funding_proposal.tx_value
-                metadata_obj.total_long_funding_sats = hedge_position_obj.long_funding_proposal.tx_value
-                if not metadata_obj.network_fee:
-                    total_funding_sats = metadata_obj.total_hedge_funding_sats + metadata_obj.total_long_funding_sats
-                    total_input_sats = hedge_position_obj.total_sats_with_fee
-                    metadata_obj.network_fee = total_funding_sats - total_input_sats
-                metadata_obj.save()
-            except HedgePosition.metadata.RelatedObjectDoesNotExist:
-                LOGGER.info(f"skipping metadata update for contract({hedge_position_obj.address}), no metadata obj found")
-            except Exception as error:
-                LOGGER.exception(error)
-
-            send_funding_tx_update(hedge_position_obj, tx_hash=tx_hash)
             return response
         else:
             response["success"] = False
@@ -509,6 +585,27 @@ def complete_contract_funding(contract_address):
         return response
 
 
+def __save_funding_validation(hedge_position_obj, funding_tx_validation):
+    defaults = {
+        "funding_output": funding_tx_validation["funding_output"],
+        "funding_satoshis": funding_tx_validation["funding_satoshis"],
+        "validated": True,
+    }
+
+    HedgePositionFunding.objects.update_or_create(
+        hedge_position=hedge_position_obj,
+        tx_hash=hedge_position_obj.funding_tx_hash,
+        defaults=defaults
+    )
+    hedge_position_obj.funding_tx_hash_validated = True
+    hedge_position_obj.save()
+    try:
+        LOGGER.error(f"FUNDING TX META ERROR: {hedge_position_obj.address}")
+        attach_funding_tx_to_wallet_history_meta(hedge_position_obj)
+    except Exception as exception:
+        LOGGER.exception(exception)
+
+
 @shared_task(queue=_QUEUE_FUNDING_PARSER, time_limit=_TASK_TIME_LIMIT)
 def validate_contract_funding(contract_address, save=True):
     LOGGER.info(f"Attempting to validate funding for contract({contract_address})")
@@ -527,29 +624,24 @@ def validate_contract_funding(contract_address, save=True):
         return response
 
     if save:
-        defaults = {
-            "funding_output": funding_tx_validation["funding_output"],
-            "funding_satoshis": funding_tx_validation["funding_satoshis"],
-            "validated": True,
-        }
-
-        HedgePositionFunding.objects.update_or_create(
-            hedge_position=hedge_position_obj,
-            tx_hash=hedge_position_obj.funding_tx_hash,
-            defaults=defaults
-        )
-        hedge_position_obj.funding_tx_hash_validated = True
-        hedge_position_obj.save()
-        try:
-            LOGGER.error(f"FUNDING TX META ERROR: {hedge_position_obj.address}")
-            attach_funding_tx_to_wallet_history_meta(hedge_position_obj)
-        except Exception as exception:
-            LOGGER.exception(exception)
+        __save_funding_validation(hedge_position_obj, funding_tx_validation)
 
     response["success"] = True
     response["validation"] = funding_tx_validation
     return response
 
+def __save_completed_mutual_redemption(mutual_redemption_obj, mutual_redemption_response):
+    mutual_redemption_obj.tx_hash = mutual_redemption_response["settlementTxid"]
+    mutual_redemption_obj.funding_tx_hash = mutual_redemption_response["fundingTxid"]
+    mutual_redemption_obj.save()
+    try:
+        settlement_obj = save_settlement_data_from_mutual_redemption(mutual_redemption_obj.hedge_position)
+        if settlement_obj:
+            send_settlement_update(mutual_redemption_obj.hedge_position)
+    except Exception as error:
+        LOGGER.exception(error)
+
+
 @shared_task(queue=_QUEUE_SETTLEMENT_UPDATE, time_limit=_TASK_TIME_LIMIT)
 def redeem_contract(contract_address):
     response = { "success": False }
@@ -589,20 +681,253 @@ def redeem_contract(contract_address):
         response["error"] = mutual_redemption_response.get("error", None) or "Error in completing redemption"
         return response
 
-    mutual_redemption_obj.tx_hash = mutual_redemption_response["settlementTxid"]
-    mutual_redemption_obj.funding_tx_hash = mutual_redemption_response["fundingTxid"]
-    mutual_redemption_obj.save()
-    try:
-        settlement_obj = save_settlement_data_from_mutual_redemption(mutual_redemption_obj.hedge_position)
-        if settlement_obj:
-            send_settlement_update(mutual_redemption_obj.hedge_position)
-    except Exception as error:
-        LOGGER.exception(error)
+    __save_completed_mutual_redemption(mutual_redemption_obj, mutual_redemption_response)
     response["success"] = True
     response["tx_hash"] = mutual_redemption_response
     return response
 
 
+## BATCH TASKS
+# Variants of the tasks above that handle many contracts at once, chain queries are done in one pass
+# and AnyHedge functions are run in a single node process for all contracts
+
+@shared_task(queue=_QUEUE_FUNDING_PARSER, time_limit=_TASK_TIME_LIMIT)
+def validate_contracts_funding(contract_addresses, save=True):
+    LOGGER.info(f"Attempting to validate funding for {len(contract_addresses)} contract/s")
+    responses = {}
+    hedge_position_objs = {
+        obj.address: obj for obj in HedgePosition.objects.filter(address__in=contract_addresses)
+    }
+
+    funding_txs = []
+    for contract_address in contract_addresses:
+        hedge_position_obj = hedge_position_objs.get(contract_address)
+        if not hedge_position_obj or not hedge_position_obj.funding_tx_hash:
+            responses[contract_address] = { "success": False, "error": "funding transaction not found" }
+            continue
+        funding_txs.append((hedge_position_obj.funding_tx_hash, contract_address))
+
+    validations = validate_funding_transactions(funding_txs)
+    for contract_address, funding_tx_validation in validations.items():
+        if not funding_tx_validation["valid"]:
+            responses[contract_address] = { "success": False, "error": "invalid funding transaction" }
+            continue
+
+        if save:
+            __save_funding_validation(hedge_position_objs[contract_address], funding_tx_validation)
+
+        responses[contract_address] = { "success": True, "error": None, "validation": funding_tx_validation }
+
+    return responses
+
+
+@shared_task(queue=_QUEUE_SETTLEMENT_UPDATE, time_limit=_TASK_TIME_LIMIT)
+def complete_contracts_funding(contract_addresses):
+    LOGGER.info(f"Attempting to complete funding for {len(contract_addresses)} contract/s")
+    responses = {}
+    hedge_position_objs = {
+        obj.address: obj for obj in HedgePosition.objects.filter(address__in=contract_addresses)
+    }
+
+    unfunded_objs = []
+    for contract_address in contract_addresses:
+        response = { "success": False, "tx_hash": "", "error": "", "message": "" }
+        responses[contract_address] = response
+
+        hedge_position_obj = hedge_position_objs.get(contract_address)
+        if not hedge_position_obj:
+            response["error"] = "contract not found"
+        elif hedge_position_obj.funding_tx_hash:
+            response["success"] = True
+            response["tx_hash"] = hedge_position_obj.funding_tx_hash
+            response["message"] = "funding transaction already in db"
+        else:
+            unfunded_objs.append(hedge_position_obj)
+
+    funding_tx_map = search_funding_txs([obj.address for obj in unfunded_objs])
+    to_complete = []
+    for hedge_position_obj in unfunded_objs:
+        funding_tx_hash = funding_tx_map.get(hedge_position_obj.address)
+        if not funding_tx_hash:
+            to_complete.append(hedge_position_obj)
+            continue
+
+        hedge_position_obj.funding_tx_hash = funding_tx_hash
+        hedge_position_obj.save()
+        response = responses[hedge_position_obj.address]
+        response["success"] = True
+        response["tx_hash"] = funding_tx_hash
+        response["message"] = "found funding transaction in chain"
+
+    complete_funding_proposal_responses = complete_funding_proposals(to_complete)
+    for hedge_position_obj in to_complete:
+        response = responses[hedge_position_obj.address]
+        complete_funding_proposal_response = complete_funding_proposal_responses[hedge_position_obj.address]
+        if not complete_funding_proposal_response["success"]:
+            response["error"] = complete_funding_proposal_response["error"]
+            continue
+
+        try:
+            success, result = broadcast_transaction(complete_funding_proposal_response["fundingTxHex"])
+            if 'already have transaction' in result:
+                success = True
+
+            if not success:
+                response["error"] = result
+                continue
+
+            tx_hash = result.split(' ')[-1]
+            __save_submitted_funding(hedge_position_obj, tx_hash)
+            response["success"] = True
+            response["tx_hash"] = tx_hash
+            response["message"] = "submitted funding transaction"
+        except Exception as exception:
+            LOGGER.exception(exception)
+            response["error"] = str(exception)
+
+    return responses
+
+
+@shared_task(queue=_QUEUE_SETTLEMENT_UPDATE, time_limit=_TASK_TIME_LIMIT)
+def settle_contracts_maturity(contract_addresses):
+    """
+        Batch variant of `settle_contract_maturity` for contracts settled by the server,
+        contracts with a settlement service are passed to `update_contract_settlement_from_service`
+    """
+    LOGGER.info(f"Attempting to settle maturity of {len(contract_addresses)} contract/s")
+    responses = {}
+    hedge_position_objs = {
+        obj.address: obj
+        for obj in HedgePosition.objects.filter(address__in=contract_addresses).select_related("settlement_service")
+    }
+
+    chain_objs = []
+    for contract_address in contract_addresses:
+        hedge_position_obj = hedge_position_objs.get(contract_address)
+        if not hedge_position_obj:
+            responses[contract_address] = { "success": False, "error": "contract not found" }
+            continue
+
+        try:
+            if hedge_position_obj.settlement_service:
+                responses[contract_address] = update_contract_settlement_from_service(contract_address)
+                continue
+        except HedgePosition.settlement_service.RelatedObjectDoesNotExist:
+            pass
+
+        chain_objs.append(hedge_position_obj)
+
+    # contracts that are already settled in chain but not yet saved in db
+    settlements_map = search_settlement_txs([obj.address for obj in chain_objs])
+    unsettled_objs = []
+    for hedge_position_obj in chain_objs:
+        settlements = settlements_map.get(hedge_position_obj.address)
+        if not settlements:
+            unsettled_objs.append(hedge_position_obj)
+            continue
+
+        for settlement in settlements:
+            __save_settlement(settlement["settlement"], hedge_position_obj, funding_txid=settlement.get("funding_tx_hash"))
+        send_settlement_update(hedge_position_obj)
+        responses[hedge_position_obj.address] = { "success": True, "settlements": settlements }
+
+    validated_funding_tx_hashes = set(
+        HedgePositionFunding.objects.filter(
+            tx_hash__in=[obj.funding_tx_hash for obj in unsettled_objs if obj.funding_tx_hash],
+        ).values_list("tx_hash", flat=True)
+    )
+    unvalidated_addresses = [
+        obj.address for obj in unsettled_objs
+        if obj.funding_tx_hash not in validated_funding_tx_hashes
+    ]
+    funding_validations = validate_contracts_funding(unvalidated_addresses)
+
+    to_settle = []
+    for hedge_position_obj in unsettled_objs:
+        funding_validation = funding_validations.get(hedge_position_obj.address)
+        if funding_validation and not funding_validation["success"]:
+            responses[hedge_position_obj.address] = { "success": False, "error": "contract funding not validated" }
+            continue
+        to_settle.append(hedge_position_obj)
+
+    settle_responses = settle_hedge_positions_maturity(to_settle)
+    for hedge_position_obj in to_settle:
+        settle_hedge_position_maturity_response = settle_responses[hedge_position_obj.address]
+        settlement_data = settle_hedge_position_maturity_response.get("settlementData", None)
+        if not settle_hedge_position_maturity_response["success"] or not settlement_data:
+            responses[hedge_position_obj.address] = {
+                "success": False,
+                "error": settle_hedge_position_maturity_response.get("error", None) or "encountered error in settling contract maturity",
+            }
+            continue
+
+        __save_settlement(settlement_data, hedge_position_obj)
+        send_settlement_update(hedge_position_obj)
+        responses[hedge_position_obj.address] = { "success": True, "settlements": [settlement_data] }
+
+    return responses
+
+
+@shared_task(queue=_QUEUE_SETTLEMENT_UPDATE, time_limit=_TASK_TIME_LIMIT)
+def redeem_contracts(contract_addresses):
+    responses = {}
+    mutual_redemption_objs = {
+        obj.hedge_position.address: obj
+        for obj in MutualRedemption.objects.filter(
+            hedge_position__address__in=contract_addresses,
+        ).select_related("hedge_position").annotate(
+            settled=models.Exists(HedgeSettlement.objects.filter(hedge_position_id=models.OuterRef("hedge_position_id"))),
+        )
+    }
+
+    unsettled_objs = []
+    for contract_address in contract_addresses:
+        mutual_redemption_obj = mutual_redemption_objs.get(contract_address)
+        if not mutual_redemption_obj:
+            responses[contract_address] = { "success": False, "error": "Mutual redemption not found" }
+        elif mutual_redemption_obj.settled:
+            responses[contract_address] = { "success": False, "error": "Contract is already settled" }
+        else:
+            unsettled_objs.append(mutual_redemption_obj)
+
+    settlements_map = search_settlement_txs([obj.hedge_position.address for obj in unsettled_objs])
+    to_redeem = []
+    for mutual_redemption_obj in unsettled_objs:
+        hedge_position_obj = mutual_redemption_obj.hedge_position
+        settlements = settlements_map.get(hedge_position_obj.address)
+        if settlements:
+            for settlement in settlements:
+                __save_settlement(settlement["settlement"], hedge_position_obj, funding_txid=settlement.get("funding_tx_hash"))
+            send_settlement_update(hedge_position_obj)
+            responses[hedge_position_obj.address] = {
+                "success": False,
+                "error": "Contarct is already settled",
+                "settlements": settlements,
+            }
+        elif mutual_redemption_obj.tx_hash:
+            responses[hedge_position_obj.address] = { "success": False, "error": "Mutual redemption is already completed" }
+        elif not mutual_redemption_obj.hedge_schnorr_sig or not mutual_redemption_obj.long_schnorr_sig:
+            responses[hedge_position_obj.address] = { "success": False, "error": "Incomplete signatures" }
+        else:
+            to_redeem.append(mutual_redemption_obj)
+
+    mutual_redemption_responses = complete_mutual_redemptions(to_redeem)
+    for mutual_redemption_obj in to_redeem:
+        contract_address = mutual_redemption_obj.hedge_position.address
+        mutual_redemption_response = mutual_redemption_responses[contract_address]
+        if not mutual_redemption_response["success"]:
+            responses[contract_address] = {
+                "success": False,
+                "error": mutual_redemption_response.get("error", None) or "Error in completing redemption",
+            }
+            continue
+
+        __save_completed_mutual_redemption(mutual_redemption_obj, mutual_redemption_response)
+        responses[contract_address] = { "success": True, "tx_hash": mutual_redemption_response }
+
+    return responses
+
+
 @shared_task(queue=_QUEUE_FUNDING_PARSER, time_limit=_TASK_TIME_LIMIT)
 def parse_contract_liquidity_fee(contract_address, hard_update=False):
     response = { "success": False, "error": None }
@@ -619,7 +944,6 @@ def parse_contract_liquidity_fee(contract_address, hard_update=False):
 
 @shared_task(queue=_QUEUE_FUNDING_PARSER, time_limit=_TASK_TIME_LIMIT)
 def parse_contracts_liquidity_fee():
-    NO_CONTRACTS_TO_PARSE = 5 
     hedge_position_objects = HedgePosition.objects.annotate(
         funding_tx_len=models.functions.Coalesce(
             models.functions.Length("funding_tx_hash"), models.Value(0)
@@ -630,14 +954,41 @@ def parse_contracts_liquidity_fee():
         models.Q(hedge_wallet_hash_len__gt=0, long_wallet_hash_len=0) | models.Q(hedge_wallet_hash_len=0, long_wallet_hash_len__gt=0),
         funding_tx_len__gt=0,
         metadata__isnull=True,
-    )[:NO_CONTRACTS_TO_PARSE]
+    ).order_by("id")
 
+    # contracts that fail to resolve are skipped by the id cursor, the cursor is saved so the backlog
+    # is gone through across runs and starts over once the end is reached
     contracts_parsed = []
-    for hedge_position_obj in hedge_position_objects:
+    last_id = get_liquidity_fee_cursor()
+    for _ in range(LIQUIDITY_FEE_MAX_BATCHES):
+        hedge_position_objs = list(hedge_position_objects.filter(id__gt=last_id)[:LIQUIDITY_FEE_BATCH_SIZE])
+        if not hedge_position_objs:
+            last_id = 0
+            break
+
+        last_id = hedge_position_objs[-1].id
         try:
-            resolve_liquidity_fee(hedge_position_obj)
-            contracts_parsed.append(hedge_position_obj.address)
-        except Exception:
-            pass
+            metadata_objs = resolve_liquidity_fees(hedge_position_objs)
+            contracts_parsed += [metadata_obj.hedge_position.address for metadata_obj in metadata_objs]
+        except Exception as exception:
+            LOGGER.exception(exception)
 
+    set_liquidity_fee_cursor(last_id)
     return contracts_parsed
+
+
+@shared_task(queue=_QUEUE_SETTLEMENT_UPDATE, time_limit=_TASK_TIME_LIMIT)
+def expire_hedge_position_offers():
+    return update_hedge_position_offer_deadline()
+
+
+@shared_task(queue=_QUEUE_FUNDING_PARSER, time_limit=_TASK_TIME_LIMIT)
+def update_wallet_position_summaries(wallet_hashes):
+    summaries = refresh_wallet_position_summaries(wallet_hashes)
+    return len(summaries)
+
+
+@shared_task(queue=_QUEUE_WEBSOCKET_UPDATES, time_limit=_TASK_TIME_LIMIT)
+def flush_websocket_updates(room_name):
+    updates = flush_updates(room_name)
+    return len(updates)
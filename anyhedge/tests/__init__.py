@@ -1 +1,6 @@
 from .contract import *
+from .liquidation import *
+from .liquidity import *
+from .maturity import *
+from .price_cache import *
+from .price_history import *
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
+from django.test import SimpleTestCase
+
+from anyhedge.utils.liquidation import LiquidationIndex
+
+
+class LiquidationIndexTestCase(SimpleTestCase):
+    def setUp(self):
+        self.start = datetime(2023, 1, 1)
+        self.maturity = self.start + timedelta(days=1)
+        self.index = LiquidationIndex()
+        # skip loading from db
+        self.index.last_refresh = float("inf")
+
+        self.open_contracts = [
+            SimpleNamespace(
+                address=address,
+                oracle_pubkey="oracle",
+                low_liquidation_price=low,
+                high_liquidation_price=high,
+                start_timestamp=self.start,
+                maturity_timestamp=self.maturity,
+            )
+            for address, low, high in [("a", 80, 200), ("b", 90, 150), ("c", 50, 300)]
+        ]
+        for hedge_position in self.open_contracts:
+            self.index.add(hedge_position)
+
+    def price_message(self, price_value, message_sequence=1, message_timestamp=None):
+        return SimpleNamespace(
+            pubkey="oracle",
+            price_value=price_value,
+            message_sequence=message_sequence,
+            message_timestamp=message_timestamp or self.start + timedelta(hours=1),
+        )
+
+    def test_no_bounds_crossed(self):
+        self.assertEqual(self.index.handle_price_messages([self.price_message(100)]), [])
+
+    def test_bounds_crossed(self):
+        triggered = self.index.handle_price_messages([self.price_message(80, message_sequence=2)])
+        self.assertEqual(sorted(triggered), [("a", 2), ("b", 2)])
+
+        triggered = self.index.handle_price_messages([self.price_message(150, message_sequence=3)])
+        self.assertEqual(triggered, [])
+
+        triggered = self.index.handle_price_messages([self.price_message(300, message_sequence=4)])
+        self.assertEqual(triggered, [("c", 4)])
+
+    def test_price_message_after_maturity(self):
+        message = self.price_message(10, message_timestamp=self.maturity + timedelta(minutes=1))
+        self.assertEqual(self.index.handle_price_messages([message]), [])
+
+    def test_refresh_after_dispatch(self):
+        triggered = self.index.handle_price_messages([self.price_message(80, message_sequence=2)])
+        self.assertEqual(sorted(triggered), [("a", 2), ("b", 2)])
+
+        # dispatched contracts are not settled yet so they are still loaded as open contracts
+        with mock.patch.object(LiquidationIndex, "get_open_contracts", return_value=self.open_contracts):
+            self.index.refresh()
+        self.index.last_refresh = float("inf")
+
+        triggered = self.index.handle_price_messages([self.price_message(70, message_sequence=3)])
+        self.assertEqual(triggered, [])
+
+    def test_refresh_after_dispatch_settled(self):
+        self.index.handle_price_messages([self.price_message(80, message_sequence=2)])
+
+        # "a" & "b" got settled
+        open_contracts = [contract for contract in self.open_contracts if contract.address == "c"]
+        with mock.patch.object(LiquidationIndex, "get_open_contracts", return_value=open_contracts):
+            self.index.refresh()
+        self.assertEqual(self.index.dispatched, {})
+
+    def test_refresh_after_dispatch_ttl(self):
+        self.index.dispatched_ttl = 0
+        self.index.handle_price_messages([self.price_message(80, message_sequence=2)])
+
+        # liquidation was not settled within the ttl, the contracts are retried
+        with mock.patch.object(LiquidationIndex, "get_open_contracts", return_value=self.open_contracts):
+            self.index.refresh()
+        self.index.last_refresh = float("inf")
+
+        triggered = self.index.handle_price_messages([self.price_message(70, message_sequence=3)])
+        self.assertEqual(sorted(triggered), [("a", 3), ("b", 3)])
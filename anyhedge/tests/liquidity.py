@@ -0,0 +1,144 @@
+from datetime import timedelta
+from unittest import mock
+from django.test import TestCase, tag
+from django.utils import timezone
+
+from anyhedge import tasks
+from anyhedge.models import (
+    HedgePosition,
+    HedgePositionFunding,
+    HedgePositionMetadata,
+)
+from anyhedge.utils import liquidity
+
+
+class ResolveLiquidityFeesTestCase(TestCase):
+    def setUp(self):
+        bchd_patcher = mock.patch.object(liquidity, "get_bchd_instance")
+        self.bchd = bchd_patcher.start().return_value
+        self.addCleanup(bchd_patcher.stop)
+
+        start_timestamp = timezone.now()
+        # bulk_create skips the signals parsing the contract's funding tx
+        self.hedge_positions = HedgePosition.objects.bulk_create([
+            HedgePosition(
+                address=f"contract-{index}",
+                anyhedge_contract_version="v0.11",
+                satoshis=100000,
+                start_timestamp=start_timestamp,
+                maturity_timestamp=start_timestamp + timedelta(days=1),
+                hedge_wallet_hash="hedge-wallet",
+                oracle_pubkey="oracle",
+                start_price=100,
+                low_liquidation_multiplier=0.5,
+                high_liquidation_multiplier=2,
+                funding_tx_hash=f"funding-tx-{index}",
+            )
+            for index in range(2)
+        ])
+
+        # the contracts' total payout is 200000 sats, 100000 sats each side
+        self.bchd.get_transactions.return_value = {
+            hedge_position.funding_tx_hash: {
+                "inputs": [{ "value": 99000 }, { "value": 101000 }],
+                "outputs": [{ "address": hedge_position.address, "value": 200000, "index": 0 }],
+            }
+            for hedge_position in self.hedge_positions
+        }
+
+    @tag("unit")
+    def test_resolve(self):
+        metadata_objs = liquidity.resolve_liquidity_fees(self.hedge_positions)
+        self.assertEqual(len(metadata_objs), 2)
+        self.bchd.get_transactions.assert_called_once_with(["funding-tx-0", "funding-tx-1"], parse_slp=False)
+
+        metadata_obj = HedgePositionMetadata.objects.get(hedge_position=self.hedge_positions[0])
+        self.assertEqual(metadata_obj.position_taker, "hedge")
+        self.assertEqual(metadata_obj.liquidity_fee, 1000)
+        self.assertEqual((metadata_obj.total_hedge_funding_sats, metadata_obj.total_long_funding_sats), (101000, 99000))
+
+        funding_obj = HedgePositionFunding.objects.get(hedge_position=self.hedge_positions[0])
+        self.assertEqual((funding_obj.funding_output, funding_obj.funding_satoshis), (0, 200000))
+        self.assertEqual(HedgePosition.objects.filter(funding_tx_hash_validated=True).count(), 2)
+
+    @tag("unit")
+    def test_resolve_with_concurrent_metadata(self):
+        compute_liquidity_fee = liquidity._compute_liquidity_fee
+
+        def compute_liquidity_fee_with_concurrent_metadata(hedge_pos_obj, tx_data):
+            # metadata saved by `resolve_liquidity_fee()` after the batch read the existing records
+            if hedge_pos_obj.id == self.hedge_positions[0].id:
+                HedgePositionMetadata.objects.create(hedge_position=hedge_pos_obj, liquidity_fee=500)
+            return compute_liquidity_fee(hedge_pos_obj, tx_data)
+
+        with mock.patch.object(liquidity, "_compute_liquidity_fee", side_effect=compute_liquidity_fee_with_concurrent_metadata):
+            metadata_objs = liquidity.resolve_liquidity_fees(self.hedge_positions)
+
+        self.assertEqual(len(metadata_objs), 2)
+        self.assertEqual(HedgePositionMetadata.objects.count(), 2)
+
+        metadata_obj = HedgePositionMetadata.objects.get(hedge_position=self.hedge_positions[0])
+        self.assertEqual((metadata_obj.liquidity_fee, metadata_obj.position_taker), (500, "hedge"))
+
+    @tag("unit")
+    def test_skip_missing_transactions(self):
+        del self.bchd.get_transactions.return_value["funding-tx-1"]
+
+        metadata_objs = liquidity.resolve_liquidity_fees(self.hedge_positions)
+        self.assertEqual([obj.hedge_position_id for obj in metadata_objs], [self.hedge_positions[0].id])
+
+
+class ParseContractsLiquidityFeeTestCase(TestCase):
+    def setUp(self):
+        start_timestamp = timezone.now()
+        self.hedge_positions = HedgePosition.objects.bulk_create([
+            HedgePosition(
+                address=f"contract-{index}",
+                anyhedge_contract_version="v0.11",
+                satoshis=100000,
+                start_timestamp=start_timestamp,
+                maturity_timestamp=start_timestamp + timedelta(days=1),
+                hedge_wallet_hash="hedge-wallet",
+                oracle_pubkey="oracle",
+                start_price=100,
+                low_liquidation_multiplier=0.5,
+                high_liquidation_multiplier=2,
+                funding_tx_hash=f"funding-tx-{index}",
+            )
+            for index in range(3)
+        ])
+
+        self.cursor = 0
+        for name, patcher in [
+            ("resolve_liquidity_fees", mock.patch.object(tasks, "resolve_liquidity_fees", return_value=[])),
+            ("get_cursor", mock.patch.object(tasks, "get_liquidity_fee_cursor", side_effect=lambda: self.cursor)),
+            ("set_cursor", mock.patch.object(tasks, "set_liquidity_fee_cursor", side_effect=self.set_cursor)),
+            ("batch_size", mock.patch.object(tasks, "LIQUIDITY_FEE_BATCH_SIZE", 1)),
+            ("max_batches", mock.patch.object(tasks, "LIQUIDITY_FEE_MAX_BATCHES", 2)),
+        ]:
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def set_cursor(self, last_id):
+        self.cursor = last_id
+
+    def resolved_ids(self):
+        return [
+            hedge_position.id
+            for call in self.resolve_liquidity_fees.call_args_list
+            for hedge_position in call.args[0]
+        ]
+
+    @tag("unit")
+    def test_runs_are_bounded(self):
+        hedge_position_ids = [obj.id for obj in self.hedge_positions]
+
+        tasks.parse_contracts_liquidity_fee()
+        self.assertEqual(self.resolved_ids(), hedge_position_ids[:2])
+        self.assertEqual(self.cursor, hedge_position_ids[1])
+
+        # next run continues after the cursor, then starts over once the backlog is done
+        self.resolve_liquidity_fees.reset_mock()
+        tasks.parse_contracts_liquidity_fee()
+        self.assertEqual(self.resolved_ids(), hedge_position_ids[2:])
+        self.assertEqual(self.cursor, 0)
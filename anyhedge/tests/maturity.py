@@ -0,0 +1,123 @@
+from datetime import timedelta
+from unittest import mock
+from django.test import SimpleTestCase, TestCase, tag
+from django.utils import timezone
+
+from anyhedge import tasks
+from anyhedge.models import HedgePosition
+from anyhedge.utils import maturity
+
+
+class MaturitySchedule:
+    """
+        In-memory sorted set for the redis commands & claim script used by `anyhedge.utils.maturity`
+    """
+    def __init__(self):
+        self.scores = {}
+
+    def zadd(self, key, mapping, nx=False):
+        added = 0
+        for member, score in mapping.items():
+            if nx and member in self.scores:
+                continue
+            added += member not in self.scores
+            self.scores[member] = score
+        return added
+
+    def zrem(self, key, *members):
+        return len([self.scores.pop(member) for member in members if member in self.scores])
+
+    def zrange(self, key, start, end, withscores=False):
+        members = sorted(self.scores.items(), key=lambda item: item[1])
+        members = members[start:None if end == -1 else end + 1]
+        if withscores:
+            return [(member.encode(), score) for member, score in members]
+        return [member.encode() for member, _ in members]
+
+    def claim_due(self, keys=[], args=[]):
+        timestamp, retry_timestamp, limit = args
+        members = [
+            member for member, score in sorted(self.scores.items(), key=lambda item: item[1])
+            if score <= timestamp
+        ][:limit]
+        for member in members:
+            self.scores[member] = retry_timestamp
+        return [member.encode() for member in members]
+
+
+class MaturityScheduleMixin:
+    def setUp(self):
+        self.schedule = MaturitySchedule()
+        for patcher in [
+            mock.patch.object(maturity, "REDIS_CLIENT", self.schedule),
+            mock.patch.object(maturity, "_claim_due_script", side_effect=self.schedule.claim_due),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class ClaimDueContractMaturitiesTestCase(MaturityScheduleMixin, SimpleTestCase):
+    @tag("unit")
+    def test_due_contract_is_claimed_once(self):
+        now = timezone.now()
+        maturity.schedule_contract_maturity(
+            mock.Mock(address="contract-a", maturity_timestamp=now - timedelta(minutes=1)),
+            mock.Mock(address="contract-b", maturity_timestamp=now + timedelta(minutes=1)),
+        )
+
+        self.assertEqual(maturity.claim_due_contract_maturities(now=now), ["contract-a"])
+        self.assertEqual(maturity.claim_due_contract_maturities(now=now), [])
+
+        # not settled within the retry interval so it is due again
+        retry_at = now + timedelta(seconds=maturity.RETRY_INTERVAL)
+        self.assertEqual(maturity.claim_due_contract_maturities(now=retry_at), ["contract-b", "contract-a"])
+
+    @tag("unit")
+    def test_schedule_keeps_claimed_retry_time(self):
+        now = timezone.now()
+        hedge_position = mock.Mock(address="contract-a", maturity_timestamp=now - timedelta(minutes=1))
+        maturity.schedule_contract_maturity(hedge_position)
+        maturity.claim_due_contract_maturities(now=now)
+
+        # e.g. saving the contract again while its settlement is running
+        maturity.schedule_contract_maturity(hedge_position)
+        self.assertEqual(maturity.claim_due_contract_maturities(now=now), [])
+
+
+class SettleDueContractsTestCase(MaturityScheduleMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        for name, patcher in [
+            ("settle_contracts_maturity", mock.patch.object(tasks, "settle_contracts_maturity")),
+            ("send_contract_matured", mock.patch.object(tasks, "send_contract_matured")),
+        ]:
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+
+        start_timestamp = timezone.now() - timedelta(days=1)
+        # bulk_create skips the signals scheduling the contract's maturity
+        self.hedge_position = HedgePosition.objects.bulk_create([
+            HedgePosition(
+                address="contract-a",
+                anyhedge_contract_version="v0.11",
+                satoshis=100000,
+                start_timestamp=start_timestamp,
+                maturity_timestamp=start_timestamp + timedelta(hours=23),
+                oracle_pubkey="oracle",
+                start_price=100,
+                low_liquidation_multiplier=0.5,
+                high_liquidation_multiplier=2,
+                funding_tx_hash="funding-tx",
+            )
+        ])[0]
+        maturity.schedule_contract_maturity(self.hedge_position)
+
+    @tag("unit")
+    def test_due_contract_is_dispatched_once(self):
+        self.assertEqual(tasks.settle_due_contracts(), ["contract-a"])
+        self.assertEqual(tasks.settle_due_contracts(), [])
+
+        self.settle_contracts_maturity.delay.assert_called_once_with(["contract-a"])
+        self.send_contract_matured.assert_called_once()
+        # stays scheduled until it is settled
+        self.assertIn("contract-a", self.schedule.scores)
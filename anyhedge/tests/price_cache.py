@@ -0,0 +1,91 @@
+import pytz
+from datetime import datetime, timedelta
+from unittest import mock
+from django.test import SimpleTestCase, TestCase, override_settings, tag
+from django.utils import timezone
+
+from anyhedge.models import PriceOracleMessage
+from anyhedge.utils import price_cache
+
+
+def create_price_oracle_message(message_sequence, message_timestamp, pubkey="oracle"):
+    return PriceOracleMessage(
+        pubkey=pubkey,
+        signature=f"signature-{message_sequence}",
+        message=f"message-{message_sequence}",
+        message_timestamp=message_timestamp,
+        price_value=10000 + message_sequence,
+        price_sequence=message_sequence,
+        message_sequence=message_sequence,
+    )
+
+
+class PriceCacheSerializationTestCase(SimpleTestCase):
+    @tag("unit")
+    @override_settings(TIME_ZONE="Asia/Manila")
+    def test_round_trip(self):
+        price_oracle_message = create_price_oracle_message(1, datetime(2023, 1, 1, 12, 30, tzinfo=pytz.UTC))
+
+        cached = price_cache._deserialize(price_cache._serialize(price_oracle_message))
+
+        self.assertIsNone(cached.id)
+        self.assertEqual(cached.message_timestamp, price_oracle_message.message_timestamp)
+        self.assertEqual(cached.message_timestamp.utcoffset(), timedelta(0))
+        for field_name in ["pubkey", "signature", "message", "price_value", "price_sequence", "message_sequence"]:
+            self.assertEqual(getattr(cached, field_name), getattr(price_oracle_message, field_name))
+
+
+class LatestPriceOracleMessageTestCase(TestCase):
+    def setUp(self):
+        price_cache.clear_local_cache()
+        self.addCleanup(price_cache.clear_local_cache)
+
+        redis_patcher = mock.patch.object(price_cache, "REDIS_CLIENT")
+        self.redis_client = redis_patcher.start()
+        self.addCleanup(redis_patcher.stop)
+        self.redis_client.hget.return_value = None
+
+        script_patcher = mock.patch.object(price_cache, "_set_latest_script")
+        self.set_latest_script = script_patcher.start()
+        self.addCleanup(script_patcher.stop)
+
+        # partitions of price messages are created from the current month onwards
+        self.start = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    @tag("unit")
+    def test_latest_from_db_when_not_cached(self):
+        PriceOracleMessage.objects.bulk_create([
+            create_price_oracle_message(sequence, self.start + timedelta(minutes=sequence))
+            for sequence in [1, 2, 3]
+        ])
+        # an older message cached by a lookup, e.g. for a liquidation, is not served as the latest
+        price_cache.cache_price_oracle_messages([create_price_oracle_message(1, self.start + timedelta(minutes=1))])
+
+        latest = price_cache.get_latest_price_oracle_message("oracle")
+        self.assertEqual(latest.message_sequence, 3)
+
+        # only the value read from the db may set a missing latest key
+        set_missing_args = [call.kwargs["args"][2] for call in self.set_latest_script.call_args_list]
+        self.assertEqual(set_missing_args, ["0", "1"])
+
+    @tag("unit")
+    def test_latest_from_redis(self):
+        cached = create_price_oracle_message(5, self.start + timedelta(minutes=5))
+        self.redis_client.hget.return_value = price_cache._serialize(cached).encode()
+
+        latest = price_cache.get_latest_price_oracle_message("oracle")
+        self.assertEqual(latest.message_sequence, 5)
+        self.assertEqual(latest.message_timestamp, cached.message_timestamp)
+        self.redis_client.hget.assert_called_once_with(price_cache._latest_key("oracle"), "value")
+
+    @tag("unit")
+    def test_local_latest_only_moves_forward(self):
+        cached = create_price_oracle_message(5, self.start + timedelta(minutes=5))
+        self.redis_client.hget.return_value = price_cache._serialize(cached).encode()
+        self.assertEqual(price_cache.get_latest_price_oracle_message("oracle").message_sequence, 5)
+
+        price_cache.cache_price_oracle_messages([create_price_oracle_message(2, self.start + timedelta(minutes=2))])
+        self.assertEqual(price_cache.get_latest_price_oracle_message("oracle").message_sequence, 5)
+
+        price_cache.cache_price_oracle_messages([create_price_oracle_message(6, self.start + timedelta(minutes=6))])
+        self.assertEqual(price_cache.get_latest_price_oracle_message("oracle").message_sequence, 6)
@@ -0,0 +1,154 @@
+from datetime import timedelta
+from django.test import TestCase, tag
+from django.utils import timezone
+
+from anyhedge.models import (
+    HedgePosition,
+    Oracle,
+    PriceOracleMessage,
+    PriceOracleMessageOHLC,
+)
+from anyhedge.utils.price_history import (
+    aggregate_price_oracle_messages,
+    downsample_price_oracle_messages,
+    get_price_message_retention_cutoff,
+    get_price_oracle_message_ohlc,
+)
+
+
+class PriceHistoryTestCase(TestCase):
+    def setUp(self):
+        self.pubkey = "oracle-a"
+        Oracle.objects.create(pubkey=self.pubkey, relay="", port=0, asset_name="USD")
+
+        # partitions of price messages are created from the current month onwards
+        self.start = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        self.message_sequence = 0
+
+    def create_messages(self, timestamp, prices, pubkey=None, interval=timedelta(minutes=10)):
+        price_oracle_messages = []
+        for index, price_value in enumerate(prices):
+            self.message_sequence += 1
+            price_oracle_messages.append(PriceOracleMessage(
+                pubkey=pubkey or self.pubkey,
+                signature="signature",
+                message="message",
+                message_timestamp=timestamp + interval * index,
+                price_value=price_value,
+                price_sequence=self.message_sequence,
+                message_sequence=self.message_sequence,
+            ))
+        return PriceOracleMessage.objects.bulk_create(price_oracle_messages)
+
+    def create_hedge_position(self, start_timestamp, funding_tx_hash=None):
+        # bulk_create skips the signals scheduling the contract's settlement
+        return HedgePosition.objects.bulk_create([
+            HedgePosition(
+                address=f"contract-{start_timestamp.timestamp()}",
+                anyhedge_contract_version="v0.11",
+                satoshis=100000,
+                start_timestamp=start_timestamp,
+                maturity_timestamp=start_timestamp + timedelta(days=1),
+                oracle_pubkey=self.pubkey,
+                start_price=100,
+                low_liquidation_multiplier=0.5,
+                high_liquidation_multiplier=2,
+                funding_tx_hash=funding_tx_hash,
+            )
+        ])[0]
+
+    def get_bucket(self, bucket_start, pubkey=None):
+        return PriceOracleMessageOHLC.objects.get(
+            pubkey=pubkey or self.pubkey,
+            bucket_seconds=PriceOracleMessageOHLC.BUCKET_SECONDS_HOUR,
+            bucket_start=bucket_start,
+        )
+
+    @tag("unit")
+    def test_aggregate(self):
+        self.create_messages(self.start, [100, 120, 90, 110])
+        self.create_messages(self.start + timedelta(hours=1), [200])
+        self.create_messages(self.start, [300], pubkey="oracle-b")
+
+        ohlc_count = aggregate_price_oracle_messages(self.start, self.start + timedelta(hours=2), pubkey=self.pubkey)
+        self.assertEqual(ohlc_count, 2)
+        self.assertFalse(PriceOracleMessageOHLC.objects.filter(pubkey="oracle-b").exists())
+
+        bucket = self.get_bucket(self.start)
+        self.assertEqual((bucket.open, bucket.high, bucket.low, bucket.close), (100, 120, 90, 110))
+        self.assertEqual((bucket.open_sequence, bucket.close_sequence, bucket.message_count), (1, 4, 4))
+
+        bucket = self.get_bucket(self.start + timedelta(hours=1))
+        self.assertEqual((bucket.open, bucket.high, bucket.low, bucket.close), (200, 200, 200, 200))
+
+    @tag("unit")
+    def test_downsample_late_messages_per_oracle(self):
+        Oracle.objects.create(pubkey="oracle-b", relay="", port=0, asset_name="USD")
+        self.create_messages(self.start, [100, 110])
+        self.create_messages(self.start + timedelta(hours=1), [120])
+        self.create_messages(self.start + timedelta(hours=5), [300], pubkey="oracle-b")
+        downsample_price_oracle_messages(now=self.start + timedelta(hours=6))
+
+        # history of oracle b backfilled before its latest bucket, but after oracle a's
+        self.create_messages(self.start + timedelta(hours=2), [250], pubkey="oracle-b")
+        # late message of oracle a in an aggregated bucket
+        self.create_messages(self.start + timedelta(minutes=30), [90])
+        downsample_price_oracle_messages(now=self.start + timedelta(hours=6))
+
+        bucket = self.get_bucket(self.start + timedelta(hours=2), pubkey="oracle-b")
+        self.assertEqual(bucket.open, 250)
+
+        bucket = self.get_bucket(self.start)
+        self.assertEqual((bucket.low, bucket.message_count), (90, 3))
+
+    @tag("unit")
+    def test_retention_cutoff(self):
+        now = self.start + timedelta(days=40)
+        self.assertEqual(get_price_message_retention_cutoff(now=now), now - timedelta(days=30))
+
+        # open contracts keep the price messages from their start
+        self.create_hedge_position(self.start + timedelta(days=5), funding_tx_hash="funding-tx")
+        self.create_hedge_position(self.start + timedelta(days=1))
+        self.assertEqual(get_price_message_retention_cutoff(now=now), self.start + timedelta(days=5))
+
+    @tag("unit")
+    def test_downsample_removes_messages_past_retention(self):
+        old_messages = self.create_messages(self.start, [100, 110, 120])
+        recent_messages = self.create_messages(self.start + timedelta(days=20), [130])
+        downsample_price_oracle_messages(now=self.start + timedelta(days=40))
+
+        self.assertFalse(PriceOracleMessage.objects.filter(id__in=[obj.id for obj in old_messages]).exists())
+        self.assertTrue(PriceOracleMessage.objects.filter(id__in=[obj.id for obj in recent_messages]).exists())
+
+        bucket = self.get_bucket(self.start)
+        self.assertTrue(bucket.pruned)
+        self.assertEqual((bucket.open, bucket.close, bucket.message_count), (100, 120, 3))
+
+        # messages saved after the bucket is pruned are not aggregated, so they are kept
+        late_messages = self.create_messages(self.start + timedelta(minutes=50), [90])
+        downsample_price_oracle_messages(now=self.start + timedelta(days=40))
+        self.assertTrue(PriceOracleMessage.objects.filter(id=late_messages[0].id).exists())
+        self.assertEqual(self.get_bucket(self.start).low, 100)
+
+    @tag("unit")
+    def test_downsample_keeps_contract_start_price(self):
+        price_oracle_messages = self.create_messages(self.start, [100, 110, 120])
+        self.create_hedge_position(price_oracle_messages[1].message_timestamp)
+        downsample_price_oracle_messages(now=self.start + timedelta(days=40))
+
+        remaining_ids = set(PriceOracleMessage.objects.filter(pubkey=self.pubkey).values_list("id", flat=True))
+        self.assertEqual(remaining_ids, { price_oracle_messages[1].id })
+        self.assertTrue(self.get_bucket(self.start).pruned)
+
+    @tag("unit")
+    def test_ohlc_price_lookup(self):
+        self.create_messages(self.start, [100, 110, 120], interval=timedelta(minutes=20))
+        aggregate_price_oracle_messages(self.start, self.start + timedelta(hours=1))
+
+        ohlc = get_price_oracle_message_ohlc([self.pubkey], self.start + timedelta(minutes=10))
+        self.assertEqual(ohlc.get_closest_price(self.start + timedelta(minutes=10)), (100, self.start))
+        self.assertEqual(
+            ohlc.get_closest_price(self.start + timedelta(minutes=40)),
+            (120, self.start + timedelta(hours=1)),
+        )
+        self.assertIsNone(get_price_oracle_message_ohlc([self.pubkey], self.start + timedelta(hours=1)))
@@ -3,8 +3,8 @@ from ..js.runner import AnyhedgeFunctions
 from ..models import (
     HedgePositionOffer,
     Oracle,
-    PriceOracleMessage,
 )
+from .price_cache import get_price_oracle_message_by_sequence
 
 
 def calculate_hedge_sats(long_sats=0.0, low_price_mult=1, price_value=None):
@@ -72,9 +72,7 @@ def create_contract(
 
     startingPriceMessage = None
     if oracle_pubkey and price_oracle_message_sequence:
-        price_oracle_message = PriceOracleMessage.objects.filter(
-            pubkey=oracle_pubkey, message_sequence=price_oracle_message_sequence
-        ).first()
+        price_oracle_message = get_price_oracle_message_by_sequence(oracle_pubkey, price_oracle_message_sequence)
         if price_oracle_message:
             startingPriceMessage = {
                 "publicKey": price_oracle_message.pubkey,
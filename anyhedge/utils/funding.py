@@ -12,7 +12,7 @@ from .contract import (
     compile_contract_from_hedge_position,
     calculate_hedge_sats,
 )
-from ..js.runner import AnyhedgeFunctions
+from ..js.runner import AnyhedgeFunctions, run_batch
 
 
 def get_tx_hash(tx_hex):
@@ -61,7 +61,7 @@ def calculate_funding_amounts(contract_data, position="hedge", premium=0):
     return AnyhedgeFunctions.calculateFundingAmounts(contract_data, position, premium)
 
 
-def complete_funding_proposal(hedge_position_obj):
+def get_funding_proposal_params(hedge_position_obj):
     contract_data = compile_contract_from_hedge_position(hedge_position_obj)
     hedge_funding_proposal = hedge_position_obj.hedge_funding_proposal
     long_funding_proposal = hedge_position_obj.long_funding_proposal
@@ -93,8 +93,87 @@ def complete_funding_proposal(hedge_position_obj):
         "inputTxHashes": long_funding_proposal.input_tx_hashes,
     }
 
-    return AnyhedgeFunctions.completeFundingProposal(
-        contract_data, hedge_funding_proposal_data, long_funding_proposal_data)
+    return contract_data, hedge_funding_proposal_data, long_funding_proposal_data
+
+
+def complete_funding_proposal(hedge_position_obj):
+    return AnyhedgeFunctions.completeFundingProposal(*get_funding_proposal_params(hedge_position_obj))
+
+
+def complete_funding_proposals(hedge_position_objs):
+    """
+        Batch variant of `complete_funding_proposal()` using a single node process
+
+    Returns
+    ------------
+        results: Map<contract_address, { success, error, fundingTxHex }>
+    """
+    results = {}
+    calls = []
+    call_addresses = []
+    for hedge_position_obj in hedge_position_objs:
+        try:
+            calls.append(("completeFundingProposal", get_funding_proposal_params(hedge_position_obj)))
+            call_addresses.append(hedge_position_obj.address)
+        except Exception as exception:
+            results[hedge_position_obj.address] = { "success": False, "error": str(exception) }
+
+    for address, result in zip(call_addresses, run_batch(calls)):
+        if isinstance(result, Exception):
+            result = { "success": False, "error": str(result) }
+        results[address] = result
+
+    return results
+
+
+def _bitdb_find(find, project, limit=10):
+    query = {
+        "v": 3,
+        "q": {
+            "find": find,
+            "limit": limit,
+            "project": project,
+        },
+    }
+    query_string = json.dumps(query)
+    query_bytes = query_string.encode('ascii')
+    query_b64 = base64.b64encode(query_bytes)
+    url = f"https://bitdb.bch.sx/q/{query_b64.decode()}"
+    data = requests.get(url).json()
+    return [*data["c"], *data["u"]]
+
+
+def _to_bitdb_address(contract_address):
+    cash_address = convert.to_cash_address(contract_address)
+    return cash_address.replace("bitcoincash:", "")
+
+
+def search_funding_txs(contract_addresses):
+    """
+        Batch variant of `search_funding_tx()` using a single bitdb query
+
+    Returns
+    ------------
+        funding_tx_map: Map<contract_address, tx_hash>
+    """
+    address_map = { _to_bitdb_address(contract_address): contract_address for contract_address in contract_addresses }
+    if not address_map:
+        return {}
+
+    txs = _bitdb_find(
+        { "out.e.a": { "$in": list(address_map.keys()) } },
+        { "tx.h": 1, "out.e": 1 },
+        limit=len(address_map) * 10,
+    )
+
+    funding_tx_map = {}
+    for tx in txs:
+        for output in tx["out"]:
+            contract_address = address_map.get(output["e"].get("a"))
+            if contract_address and contract_address not in funding_tx_map:
+                funding_tx_map[contract_address] = tx["tx"]["h"]
+
+    return funding_tx_map
 
 
 def search_funding_tx(contract_address, sats:int=None):
@@ -194,6 +273,53 @@ def validate_funding_transaction(tx_hash, contract_address):
     return response
 
 
+def validate_funding_transactions(funding_txs):
+    """
+        Batch variant of `validate_funding_transaction()` using a single bitdb query
+
+    Parameters
+    ------------
+        funding_txs: list((tx_hash, contract_address))
+
+    Returns
+    ------------
+        validations: Map<contract_address, { valid, funding_output, funding_satoshis }>
+    """
+    validations = {}
+    address_map = {}
+    for tx_hash, contract_address in funding_txs:
+        validations[contract_address] = {
+            "valid": False,
+            "funding_output": -1,
+            "funding_satoshis": 0,
+        }
+        address_map[_to_bitdb_address(contract_address)] = (tx_hash, contract_address)
+
+    if not address_map:
+        return validations
+
+    txs = _bitdb_find(
+        {
+            "tx.h": { "$in": list(set(tx_hash for tx_hash, _ in address_map.values())) },
+            "out.e.a": { "$in": list(address_map.keys()) },
+        },
+        { "tx.h": 1, "out.e": 1 },
+        limit=len(address_map) * 10,
+    )
+
+    for tx in txs:
+        for output in tx["out"]:
+            tx_hash, contract_address = address_map.get(output["e"].get("a"), (None, None))
+            if tx_hash is None or tx["tx"]["h"] != tx_hash:
+                continue
+
+            validations[contract_address]["funding_satoshis"] = output["e"]["v"]
+            validations[contract_address]["funding_output"] = output["e"]["i"]
+            validations[contract_address]["valid"] = True
+
+    return validations
+
+
 def attach_funding_tx_to_wallet_history_meta(hedge_position_obj, force=False):
     if not hedge_position_obj.funding_tx_hash:
         return
@@ -0,0 +1,190 @@
+import bisect
+import time
+import logging
+
+from ..models import HedgePosition
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+class OracleLiquidationBook:
+    """
+        Open contracts of a single oracle sorted by their low & high liquidation prices
+    """
+    def __init__(self):
+        self.lows = [] # sorted list of (low_liquidation_price, address)
+        self.highs = [] # sorted list of (high_liquidation_price, address)
+
+    def add(self, address, low_liquidation_price, high_liquidation_price):
+        bisect.insort(self.lows, (low_liquidation_price, address))
+        bisect.insort(self.highs, (high_liquidation_price, address))
+
+    def remove(self, address, low_liquidation_price, high_liquidation_price):
+        for entries, entry in [
+            (self.lows, (low_liquidation_price, address)),
+            (self.highs, (high_liquidation_price, address)),
+        ]:
+            index = bisect.bisect_left(entries, entry)
+            if index < len(entries) and entries[index] == entry:
+                entries.pop(index)
+
+    def get_crossed(self, price_value):
+        """
+        Returns
+        ------------
+            addresses: set(str)
+                contracts whose low liquidation price >= price or high liquidation price <= price
+        """
+        low_index = bisect.bisect_left(self.lows, (price_value,))
+        # (price_value, chr(0x10FFFF)) sorts after every address with the same price
+        high_index = bisect.bisect_right(self.highs, (price_value, chr(0x10FFFF)))
+
+        addresses = { address for _, address in self.lows[low_index:] }
+        addresses.update(address for _, address in self.highs[:high_index])
+        return addresses
+
+    def __len__(self):
+        return len(self.lows)
+
+
+class LiquidationIndex:
+    """
+        In-memory index of funded & unsettled contracts keyed by oracle pubkey.
+        Each price message only looks up the contracts whose liquidation bounds it crosses,
+        O(log n + k) per price message instead of joining all contracts against price messages.
+        Dispatched contracts are kept out of the index until their settlement is saved or
+        `dispatched_ttl` passes, in case the liquidation failed and has to be retried.
+    """
+    def __init__(self, refresh_interval=60, dispatched_ttl=60 * 10):
+        self.refresh_interval = refresh_interval
+        self.dispatched_ttl = dispatched_ttl
+        self.books = {} # Map<oracle_pubkey, OracleLiquidationBook>
+        self.contracts = {} # Map<address, (oracle_pubkey, low, high, start_timestamp, maturity_timestamp)>
+        self.dispatched = {} # Map<address, dispatched_at (monotonic)>
+        self.last_refresh = None
+
+    def add(self, hedge_position):
+        if hedge_position.address in self.contracts:
+            return
+
+        low = hedge_position.low_liquidation_price
+        high = hedge_position.high_liquidation_price
+        self.contracts[hedge_position.address] = (
+            hedge_position.oracle_pubkey,
+            low,
+            high,
+            hedge_position.start_timestamp,
+            hedge_position.maturity_timestamp,
+        )
+        self.books.setdefault(hedge_position.oracle_pubkey, OracleLiquidationBook()).add(
+            hedge_position.address, low, high,
+        )
+
+    def remove(self, address):
+        contract = self.contracts.pop(address, None)
+        if not contract:
+            return
+
+        oracle_pubkey, low, high, _, _ = contract
+        book = self.books.get(oracle_pubkey)
+        if book:
+            book.remove(address, low, high)
+
+    def get_open_contracts(self):
+        return HedgePosition.objects.filter(
+            funding_tx_hash__isnull=False, # funded
+            settlements__isnull=True, # not settled
+        ).exclude(
+            funding_tx_hash="",
+        ).only(
+            "address",
+            "oracle_pubkey",
+            "start_price",
+            "low_liquidation_multiplier",
+            "high_liquidation_multiplier",
+            "start_timestamp",
+            "maturity_timestamp",
+        )
+
+    def refresh(self):
+        """
+            Rebuild the index from the db, only reads the open contracts and not price messages.
+            Contracts already dispatched for liquidation but not yet settled are left out
+        """
+        open_contracts = list(self.get_open_contracts())
+        open_addresses = { hedge_position.address for hedge_position in open_contracts }
+
+        # settled contracts no longer show up as open, expired entries are retried
+        now = time.monotonic()
+        self.dispatched = {
+            address: dispatched_at
+            for address, dispatched_at in self.dispatched.items()
+            if address in open_addresses and now - dispatched_at < self.dispatched_ttl
+        }
+
+        self.books = {}
+        self.contracts = {}
+        for hedge_position in open_contracts:
+            if hedge_position.address in self.dispatched:
+                continue
+            self.add(hedge_position)
+
+        self.last_refresh = time.monotonic()
+        LOGGER.info(f"Liquidation index refreshed with {len(self.contracts)} open contract/s")
+
+    def refresh_if_stale(self):
+        if self.last_refresh is None or time.monotonic() - self.last_refresh >= self.refresh_interval:
+            self.refresh()
+
+    def get_contracts_for_liquidation(self, oracle_pubkey, price_value, message_timestamp):
+        """
+        Returns
+        ------------
+            addresses: list(str)
+                contracts of the oracle whose liquidation bounds are crossed by the price,
+                and the price message is within the contract's duration
+        """
+        book = self.books.get(oracle_pubkey)
+        if not book:
+            return []
+
+        addresses = []
+        for address in book.get_crossed(price_value):
+            _, _, _, start_timestamp, maturity_timestamp = self.contracts[address]
+            if start_timestamp <= message_timestamp <= maturity_timestamp:
+                addresses.append(address)
+        return addresses
+
+    def handle_price_messages(self, price_oracle_messages, dispatch=None):
+        """
+            Find contracts to liquidate for each price message, triggered contracts are removed from the index
+            so they are only dispatched once
+
+        Parameters
+        ------------
+            price_oracle_messages: list(anyhedge.models.PriceOracleMessage)
+            dispatch: callable(address, message_sequence)
+                Called for each contract to liquidate
+
+        Returns
+        ------------
+            triggered: list((address, message_sequence))
+        """
+        self.refresh_if_stale()
+
+        triggered = []
+        for price_oracle_message in sorted(price_oracle_messages, key=lambda msg: msg.message_sequence):
+            addresses = self.get_contracts_for_liquidation(
+                price_oracle_message.pubkey,
+                price_oracle_message.price_value,
+                price_oracle_message.message_timestamp,
+            )
+            for address in addresses:
+                self.remove(address)
+                self.dispatched[address] = time.monotonic()
+                triggered.append((address, price_oracle_message.message_sequence))
+                if callable(dispatch):
+                    dispatch(address, price_oracle_message.message_sequence)
+
+        return triggered
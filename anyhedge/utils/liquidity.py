@@ -2,6 +2,7 @@ import json
 import requests
 import logging
 from urllib.parse import urljoin
+from django.conf import settings
 from django.utils import timezone
 from django.db import transaction
 from django.db.models import OuterRef, Subquery, Sum, F, Value, Q
@@ -9,6 +10,7 @@ from django.db.models.functions import Coalesce, Greatest, Abs
 from ..conf import settings as app_settings
 from ..js.runner import AnyhedgeFunctions
 from ..models import (
+    HedgePosition,
     HedgePositionFunding,
     HedgePositionMetadata,
     HedgePositionOffer,
@@ -18,19 +20,44 @@ from .api import get_bchd_instance
 from .websocket import send_long_account_update
 
 LOGGER = logging.getLogger("main")
+REDIS_CLIENT = settings.REDISKV
+
+# id of the last contract checked by `parse_contracts_liquidity_fee` task, the next run continues after it
+_REDIS_KEY_LIQUIDITY_FEE_CURSOR = "anyhedge:liquidity-fee-cursor"
 
 @transaction.atomic()
 def update_hedge_position_offer_deadline():
-    hedge_position_offers = HedgePositionOffer.objects.filter(
-        status=HedgePositionOffer.STATUS_ACCEPTED,
-        counter_party_info__settlement_deadline__lte=timezone.now(),
+    """
+        Return accepted offers past their settlement deadline back to the order book.
+        Runs in the `expire_hedge_position_offers` task instead of on every offer lookup.
+    """
+    hedge_position_offer_ids = list(
+        HedgePositionOffer.objects.select_for_update(skip_locked=True).filter(
+            status=HedgePositionOffer.STATUS_ACCEPTED,
+            counter_party_info__settlement_deadline__lte=timezone.now(),
+        ).values_list("id", flat=True)
     )
 
-    if not hedge_position_offers.count():
-        return
+    if not len(hedge_position_offer_ids):
+        return 0
 
-    HedgePositionOfferCounterParty.objects.filter(hedge_position_offer__in=hedge_position_offers).delete()
-    return hedge_position_offers.update(status=HedgePositionOffer.STATUS_PENDING)
+    HedgePositionOfferCounterParty.objects.filter(hedge_position_offer_id__in=hedge_position_offer_ids).delete()
+    return HedgePositionOffer.objects.filter(
+        id__in=hedge_position_offer_ids,
+    ).update(status=HedgePositionOffer.STATUS_PENDING)
+
+
+def get_counter_party_sats(position, amount, low_liquidation_multiplier):
+    if position == HedgePositionOffer.POSITION_HEDGE:
+        return amount * (1/low_liquidation_multiplier - 1) # calculating long sats
+    else:
+        return amount / (1/low_liquidation_multiplier - 1) # calculating hedge sats
+
+
+def get_counter_position(position):
+    if position == HedgePositionOffer.POSITION_HEDGE:
+        return HedgePositionOffer.POSITION_LONG
+    return HedgePositionOffer.POSITION_HEDGE
 
 
 def find_matching_position_offer(
@@ -42,31 +69,24 @@ def find_matching_position_offer(
     exclude_wallet_hash="",
     oracle_pubkey="",
 ):
-    update_hedge_position_offer_deadline()
-    now = timezone.now()
-    _position = HedgePositionOffer.POSITION_HEDGE
-    if position == HedgePositionOffer.POSITION_HEDGE:
-        _position = HedgePositionOffer.POSITION_LONG
-
-    if position == HedgePositionOffer.POSITION_HEDGE:
-        counter_party_sats = amount * (1/low_liquidation_multiplier - 1) # calculating long sats
-    else:
-        counter_party_sats = amount / (1/low_liquidation_multiplier - 1) # calculating hedge sats
+    """
+        Read-only lookup of the closest offer in the order book of the contract terms
+    """
+    counter_party_sats = get_counter_party_sats(position, amount, low_liquidation_multiplier)
 
     # due to missing price value, there is an error in the actual sats
     # we filter a range instead of filtering the exact sats using the value below
     sats_range = 10 ** 4
 
-    queryset = HedgePositionOffer.objects.filter(
-        Q(expires_at__isnull=True) | Q(expires_at__gte=now),
-        position=_position,
-        status=HedgePositionOffer.STATUS_PENDING,
-        satoshis__gte = counter_party_sats - sats_range,
-        satoshis__lte = counter_party_sats + sats_range,
+    queryset = HedgePositionOffer.objects.order_book(
+        position=get_counter_position(position),
         duration_seconds=duration_seconds,
         low_liquidation_multiplier=low_liquidation_multiplier,
         high_liquidation_multiplier=high_liquidation_multiplier,
         oracle_pubkey=oracle_pubkey,
+    ).filter_satoshis_range(
+        counter_party_sats - sats_range,
+        counter_party_sats + sats_range,
     )
     if exclude_wallet_hash:
         queryset = queryset.exclude(wallet_hash=exclude_wallet_hash)
@@ -88,38 +108,16 @@ def find_close_matching_offer_suggestion(
     oracle_pubkey="",
     similarity=0.5, # a common value to be used as multipler for filter range value value between 0 to 1
 ):
-    update_hedge_position_offer_deadline()
     now = timezone.now()
-    _position = HedgePositionOffer.POSITION_HEDGE
-    if position == HedgePositionOffer.POSITION_HEDGE:
-        _position = HedgePositionOffer.POSITION_LONG
+    _position = get_counter_position(position)
 
     # ranges are 2 length arrays representing min & max, respectively
     low_liquidation_multiplier_range = [low_liquidation_multiplier*(similarity), low_liquidation_multiplier*(2 - similarity)]
     high_liquidation_multiplier_range = [high_liquidation_multiplier*(similarity), high_liquidation_multiplier*(2 - similarity)]
     duration_seconds_range = [duration_seconds*(similarity), duration_seconds*(2-similarity)]
 
-    if position == HedgePositionOffer.POSITION_HEDGE:
-        counter_party_sats = amount * (1/low_liquidation_multiplier - 1) # calculating long sats
-        counter_party_sats_range = [counter_party_sats*(similarity), counter_party_sats*(2-similarity)]
-    else:
-        counter_party_sats = amount / (1/low_liquidation_multiplier - 1) # calculating hedge sats
-        counter_party_sats_range = [counter_party_sats*(similarity), counter_party_sats*(2-similarity)]
-
-    # LOGGER.info(
-    #     f"find_close_matching_offer_suggestion({position}):\n" \
-    #     f"\tamount={amount}\n" \
-    #     f"\tduration_seconds={duration_seconds}\n" \
-    #     f"\tlow_liquidation_multiplier={low_liquidation_multiplier}\n" \
-    #     f"\thigh_liquidation_multiplier={high_liquidation_multiplier}\n" \
-    #     f"\texclude_wallet_hash={exclude_wallet_hash}\n" \
-    #     f"\toracle_pubkey={oracle_pubkey}\n" \
-    #     f"\tsimilarity={similarity}\n" \
-    #     f"\tlow_liquidation_multiplier_range={low_liquidation_multiplier_range}\n" \
-    #     f"\thigh_liquidation_multiplier_range={high_liquidation_multiplier_range}\n" \
-    #     f"\tduration_seconds_range={duration_seconds_range}\n" \
-    #     f"\tcounter_party_sats_range={counter_party_sats_range}\n"
-    # )
+    counter_party_sats = get_counter_party_sats(position, amount, low_liquidation_multiplier)
+    counter_party_sats_range = [counter_party_sats*(similarity), counter_party_sats*(2-similarity)]
 
     # filter offers by a range of value
     queryset = HedgePositionOffer.objects.filter(
@@ -127,15 +125,13 @@ def find_close_matching_offer_suggestion(
         position=_position,
         status=HedgePositionOffer.STATUS_PENDING,
         oracle_pubkey=oracle_pubkey,
-        satoshis__gte = counter_party_sats_range[0],
-        satoshis__lte = counter_party_sats_range[1],
         duration_seconds__gte=duration_seconds_range[0],
         duration_seconds__lte=duration_seconds_range[1],
         high_liquidation_multiplier__gte=high_liquidation_multiplier_range[0],
         high_liquidation_multiplier__lte=high_liquidation_multiplier_range[1],
         low_liquidation_multiplier__gte=low_liquidation_multiplier_range[0],
         low_liquidation_multiplier__lte=low_liquidation_multiplier_range[1],
-    )
+    ).filter_satoshis_range(*counter_party_sats_range)
 
     if exclude_wallet_hash:
         queryset = queryset.exclude(wallet_hash=exclude_wallet_hash)
@@ -203,22 +199,20 @@ def fund_hedge_position(contract_data, funding_proposal, oracle_message_sequence
         return response
 
 
-def resolve_liquidity_fee(hedge_pos_obj, hard_update=False):
+def _compute_liquidity_fee(hedge_pos_obj, tx_data):
     """
-    Populates values for models.HedgePositionMetadata of a models.HedgePosition obj. Also does a funding transaction validation update, if data is available
+    Computes the funding output & models.HedgePositionMetadata values of a contract from its funding transaction
 
     Parameters
     ------------
-        hedge_position_obj: models.HedgePosition
-        hard_update: bool
-            If set to true, will update all metadata values even if resolves to "None"
-    """
-    bchd = get_bchd_instance()
-    if not hedge_pos_obj.funding_tx_hash:
-        return
+        hedge_pos_obj: models.HedgePosition
+        tx_data: dict
+            funding transaction parsed by `BCHDQuery`
 
-    # funding tx data
-    tx_data = bchd.get_transaction(hedge_pos_obj.funding_tx_hash, parse_slp=False)
+    Returns
+    ------------
+        (funding_output, funding_satoshis, metadata_values): (int | None, int | None, dict)
+    """
     total_input =  sum([inp["value"] for inp in tx_data["inputs"]])
     total_output =  sum([out["value"] for out in tx_data["outputs"]])
     funding_satoshis = None
@@ -228,23 +222,6 @@ def resolve_liquidity_fee(hedge_pos_obj, hard_update=False):
             funding_satoshis = output["value"]
             funding_output = output["index"]
 
-    # not really necessary functionality
-    # validate contract funding_tx_hash since the data is already available anyway
-    if funding_output is not None and funding_satoshis is not None:
-        defaults={
-            "funding_output": funding_output,
-            "funding_satoshis": funding_satoshis,
-            "validated": True,
-        }
-
-        HedgePositionFunding.objects.update_or_create(
-            hedge_position=hedge_pos_obj,
-            tx_hash=hedge_pos_obj.funding_tx_hash,
-            defaults=defaults
-        )
-        hedge_pos_obj.funding_tx_hash_validated = True
-        hedge_pos_obj.save()
-
     hedge_sats = hedge_pos_obj.satoshis
     long_sats = hedge_pos_obj.long_input_sats
     total_payout_sats = hedge_sats + long_sats
@@ -288,6 +265,57 @@ def resolve_liquidity_fee(hedge_pos_obj, hard_update=False):
         "total_hedge_funding_sats": hedge_funding_sats,
         "total_long_funding_sats": long_funding_sats,
     }
+    return funding_output, funding_satoshis, metadata_values
+
+
+def _keep_existing_metadata_values(metadata_values, existing_metadata_obj):
+    if existing_metadata_obj.position_taker:
+        metadata_values["position_taker"] = existing_metadata_obj.position_taker
+    if existing_metadata_obj.liquidity_fee:
+        metadata_values["liquidity_fee"] = existing_metadata_obj.liquidity_fee
+    if existing_metadata_obj.network_fee:
+        metadata_values["network_fee"] = existing_metadata_obj.network_fee
+    if existing_metadata_obj.total_hedge_funding_sats:
+        metadata_values["total_hedge_funding_sats"] = existing_metadata_obj.total_hedge_funding_sats
+    if existing_metadata_obj.total_long_funding_sats:
+        metadata_values["total_long_funding_sats"] = existing_metadata_obj.total_long_funding_sats
+    return metadata_values
+
+
+def resolve_liquidity_fee(hedge_pos_obj, hard_update=False):
+    """
+    Populates values for models.HedgePositionMetadata of a models.HedgePosition obj. Also does a funding transaction validation update, if data is available
+
+    Parameters
+    ------------
+        hedge_position_obj: models.HedgePosition
+        hard_update: bool
+            If set to true, will update all metadata values even if resolves to "None"
+    """
+    bchd = get_bchd_instance()
+    if not hedge_pos_obj.funding_tx_hash:
+        return
+
+    # funding tx data
+    tx_data = bchd.get_transaction(hedge_pos_obj.funding_tx_hash, parse_slp=False)
+    funding_output, funding_satoshis, metadata_values = _compute_liquidity_fee(hedge_pos_obj, tx_data)
+
+    # not really necessary functionality
+    # validate contract funding_tx_hash since the data is already available anyway
+    if funding_output is not None and funding_satoshis is not None:
+        defaults={
+            "funding_output": funding_output,
+            "funding_satoshis": funding_satoshis,
+            "validated": True,
+        }
+
+        HedgePositionFunding.objects.update_or_create(
+            hedge_position=hedge_pos_obj,
+            tx_hash=hedge_pos_obj.funding_tx_hash,
+            defaults=defaults
+        )
+        hedge_pos_obj.funding_tx_hash_validated = True
+        hedge_pos_obj.save()
 
     existing_metadata_obj = None
     try:
@@ -296,16 +324,7 @@ def resolve_liquidity_fee(hedge_pos_obj, hard_update=False):
         pass
 
     if existing_metadata_obj and not hard_update:
-        if existing_metadata_obj.position_taker:
-            metadata_values["position_taker"] = existing_metadata_obj.position_taker
-        if existing_metadata_obj.liquidity_fee:
-            metadata_values["liquidity_fee"] = existing_metadata_obj.liquidity_fee
-        if existing_metadata_obj.network_fee:
-            metadata_values["network_fee"] = existing_metadata_obj.network_fee
-        if existing_metadata_obj.total_hedge_funding_sats:
-            metadata_values["total_hedge_funding_sats"] = existing_metadata_obj.total_hedge_funding_sats
-        if existing_metadata_obj.total_long_funding_sats:
-            metadata_values["total_long_funding_sats"] = existing_metadata_obj.total_long_funding_sats
+        _keep_existing_metadata_values(metadata_values, existing_metadata_obj)
 
     metadata_obj, created = HedgePositionMetadata.objects.update_or_create(
         hedge_position=hedge_pos_obj,
@@ -313,3 +332,124 @@ def resolve_liquidity_fee(hedge_pos_obj, hard_update=False):
     )
 
     return metadata_obj
+
+
+def get_liquidity_fee_cursor():
+    cursor = REDIS_CLIENT.get(_REDIS_KEY_LIQUIDITY_FEE_CURSOR)
+    if cursor is None:
+        return 0
+    return int(cursor)
+
+
+def set_liquidity_fee_cursor(last_id):
+    REDIS_CLIENT.set(_REDIS_KEY_LIQUIDITY_FEE_CURSOR, last_id)
+
+
+@transaction.atomic
+def resolve_liquidity_fees(hedge_pos_objs, hard_update=False):
+    """
+    Batch variant of `resolve_liquidity_fee()`, funding transactions are fetched concurrently over a single connection
+    and the funding & metadata records are written in bulk
+
+    Parameters
+    ------------
+        hedge_pos_objs: list(models.HedgePosition)
+        hard_update: bool
+
+    Returns
+    ------------
+        metadata_objs: list(models.HedgePositionMetadata)
+            contracts whose funding transaction was not found or the fee could not be computed are omitted
+    """
+    hedge_pos_objs = [obj for obj in hedge_pos_objs if obj.funding_tx_hash]
+    if not hedge_pos_objs:
+        return []
+
+    bchd = get_bchd_instance()
+    tx_data_map = bchd.get_transactions([obj.funding_tx_hash for obj in hedge_pos_objs], parse_slp=False)
+
+    hedge_position_ids = [obj.id for obj in hedge_pos_objs]
+    existing_metadata_position_ids = set(
+        HedgePositionMetadata.objects.filter(hedge_position_id__in=hedge_position_ids).values_list("hedge_position_id", flat=True)
+    )
+    existing_funding_objs = {
+        (obj.hedge_position_id, obj.tx_hash): obj
+        for obj in HedgePositionFunding.objects.filter(hedge_position_id__in=hedge_position_ids)
+    }
+
+    metadata_values_map = {}
+    funding_to_create = []
+    funding_to_update = []
+    validated_hedge_position_ids = []
+    for hedge_pos_obj in hedge_pos_objs:
+        tx_data = tx_data_map.get(hedge_pos_obj.funding_tx_hash)
+        if not tx_data:
+            continue
+
+        try:
+            funding_output, funding_satoshis, metadata_values = _compute_liquidity_fee(hedge_pos_obj, tx_data)
+        except Exception as exception:
+            # fee is not computable, e.g. funding transaction does not have exactly 2 inputs or
+            # the node returned malformed tx data, other contracts in the batch still get resolved
+            LOGGER.exception(f"Unable to resolve liquidity fee of {hedge_pos_obj.address}: {exception}")
+            continue
+
+        if funding_output is not None and funding_satoshis is not None:
+            key = (hedge_pos_obj.id, hedge_pos_obj.funding_tx_hash)
+            funding_obj = existing_funding_objs.get(key)
+            if funding_obj:
+                funding_to_update.append(funding_obj)
+            else:
+                funding_obj = HedgePositionFunding(hedge_position=hedge_pos_obj, tx_hash=hedge_pos_obj.funding_tx_hash)
+                funding_to_create.append(funding_obj)
+            funding_obj.funding_output = funding_output
+            funding_obj.funding_satoshis = funding_satoshis
+            funding_obj.validated = True
+            validated_hedge_position_ids.append(hedge_pos_obj.id)
+
+        metadata_values_map[hedge_pos_obj.id] = metadata_values
+
+    if len(funding_to_create):
+        HedgePositionFunding.objects.bulk_create(funding_to_create)
+    if len(funding_to_update):
+        HedgePositionFunding.objects.bulk_update(funding_to_update, ["funding_output", "funding_satoshis", "validated"])
+    if len(validated_hedge_position_ids):
+        # the contracts' funding txs are already set so there's nothing for the post_save signals to do
+        HedgePosition.objects.filter(id__in=validated_hedge_position_ids).update(funding_tx_hash_validated=True)
+
+    if not len(metadata_values_map):
+        return []
+
+    # a concurrent `resolve_liquidity_fee()` may create the metadata between the read above and the insert,
+    # so conflicting rows are skipped then updated with the rest of the batch after re-reading
+    HedgePositionMetadata.objects.bulk_create(
+        [
+            HedgePositionMetadata(hedge_position_id=hedge_position_id, **metadata_values)
+            for hedge_position_id, metadata_values in metadata_values_map.items()
+            if hedge_position_id not in existing_metadata_position_ids
+        ],
+        ignore_conflicts=True,
+    )
+
+    metadata_objs = list(
+        HedgePositionMetadata.objects.select_for_update(of=("self",)).select_related("hedge_position").filter(
+            hedge_position_id__in=metadata_values_map.keys(),
+        )
+    )
+    for metadata_obj in metadata_objs:
+        metadata_values = metadata_values_map[metadata_obj.hedge_position_id]
+        if not hard_update:
+            _keep_existing_metadata_values(metadata_values, metadata_obj)
+
+        for field, value in metadata_values.items():
+            setattr(metadata_obj, field, value)
+
+    HedgePositionMetadata.objects.bulk_update(metadata_objs, [
+        "position_taker",
+        "liquidity_fee",
+        "network_fee",
+        "total_hedge_funding_sats",
+        "total_long_funding_sats",
+    ])
+
+    return metadata_objs
@@ -0,0 +1,124 @@
+import logging
+from django.conf import settings
+from django.utils import timezone
+
+from ..models import HedgePosition
+
+
+LOGGER = logging.getLogger(__name__)
+REDIS_CLIENT = settings.REDISKV
+
+# sorted set of contract addresses scored by the unix timestamp they are due for settlement
+_REDIS_KEY_MATURITY_SCHEDULE = "anyhedge:maturity-schedule"
+
+# seconds before a claimed contract is due again if it was not settled, e.g. the settlement task failed
+RETRY_INTERVAL = 60 * 5
+
+# Atomically takes the due members of the schedule and pushes them back by the retry interval,
+# so concurrent runs never dispatch the same contract twice within the interval
+# KEYS[1] - schedule key
+# ARGV[1] - current timestamp, ARGV[2] - retry timestamp, ARGV[3] - max number of members
+_CLAIM_DUE_SCRIPT = """
+local members = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[3]))
+for _, member in ipairs(members) do
+    redis.call('ZADD', KEYS[1], ARGV[2], member)
+end
+return members
+"""
+_claim_due_script = REDIS_CLIENT.register_script(_CLAIM_DUE_SCRIPT)
+
+
+def _decode(value):
+    if isinstance(value, bytes):
+        return value.decode()
+    return value
+
+
+def schedule_contract_maturity(*hedge_positions):
+    """
+        Add contracts to the maturity schedule, contracts already in the schedule are left as is
+        so it is safe to call on every save
+
+    Parameters
+    ------------
+        *hedge_positions: anyhedge.models.HedgePosition
+    """
+    mapping = {
+        hedge_position.address: hedge_position.maturity_timestamp.timestamp()
+        for hedge_position in hedge_positions
+    }
+    if not mapping:
+        return 0
+    # NX keeps the retry time of already claimed contracts
+    return REDIS_CLIENT.zadd(_REDIS_KEY_MATURITY_SCHEDULE, mapping, nx=True)
+
+
+def unschedule_contract_maturity(*addresses):
+    if not addresses:
+        return 0
+    return REDIS_CLIENT.zrem(_REDIS_KEY_MATURITY_SCHEDULE, *addresses)
+
+
+def claim_due_contract_maturities(now=None, retry_interval=RETRY_INTERVAL, limit=100):
+    """
+        Get contracts in the schedule that are due for settlement. Claimed contracts stay in the
+        schedule due again after `retry_interval` until they are unscheduled once settled
+
+    Returns
+    ------------
+        addresses: list(str)
+    """
+    if now is None:
+        now = timezone.now()
+
+    timestamp = now.timestamp()
+    members = _claim_due_script(
+        keys=[_REDIS_KEY_MATURITY_SCHEDULE],
+        args=[timestamp, timestamp + retry_interval, limit],
+    )
+    return [_decode(member) for member in members]
+
+
+def get_next_contract_maturity():
+    """
+    Returns
+    ------------
+        (address, timestamp): (str, float) | None
+    """
+    members = REDIS_CLIENT.zrange(_REDIS_KEY_MATURITY_SCHEDULE, 0, 0, withscores=True)
+    if not members:
+        return None
+    address, timestamp = members[0]
+    return _decode(address), timestamp
+
+
+def sync_maturity_schedule():
+    """
+        Reconcile the schedule with the db: adds funded & unsettled contracts missing in the schedule,
+        e.g. after redis data loss, and removes contracts that were settled
+    """
+    open_contracts = HedgePosition.objects.filter(
+        funding_tx_hash__isnull=False,
+        settlements__isnull=True,
+    ).exclude(
+        funding_tx_hash="",
+    ).only("address", "maturity_timestamp")
+    open_contracts = { hedge_position.address: hedge_position for hedge_position in open_contracts }
+
+    scheduled_addresses = set(
+        _decode(member) for member in REDIS_CLIENT.zrange(_REDIS_KEY_MATURITY_SCHEDULE, 0, -1)
+    )
+
+    to_schedule = [
+        hedge_position for address, hedge_position in open_contracts.items()
+        if address not in scheduled_addresses
+    ]
+    to_unschedule = [address for address in scheduled_addresses if address not in open_contracts]
+
+    schedule_contract_maturity(*to_schedule)
+    unschedule_contract_maturity(*to_unschedule)
+
+    if len(to_schedule) or len(to_unschedule):
+        LOGGER.info(f"Maturity schedule synced, added {len(to_schedule)} and removed {len(to_unschedule)} contract/s")
+
+    return to_schedule, to_unschedule
@@ -0,0 +1,316 @@
+import json
+import time
+import pytz
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from django.conf import settings
+
+from ..models import PriceOracleMessage
+
+
+LOGGER = logging.getLogger(__name__)
+REDIS_CLIENT = settings.REDISKV
+
+# per oracle sorted sets of the recent price messages, one scored by message sequence & one by message timestamp.
+# The sets also get older messages looked up by sequence or timestamp, so the latest message
+# of an oracle is kept in a separate key that only moves forward
+_REDIS_KEY_PREFIX = "anyhedge:price-messages"
+
+# number of recent price messages kept per oracle in redis, a day's worth as they are generated per minute
+RECENT_MESSAGES_COUNT = 60 * 24
+
+# cached messages are returned as PriceOracleMessage instances without an id
+# in-process layer on top of redis, price messages don't change once signed
+# so only the latest message per oracle needs to expire
+LOCAL_CACHE_SIZE = 1024
+LOCAL_LATEST_TTL = 5 # seconds
+
+_FIELD_NAMES = [
+    "id",
+    "pubkey",
+    "signature",
+    "message",
+    "message_timestamp",
+    "price_value",
+    "price_sequence",
+    "message_sequence",
+]
+
+_local_messages = OrderedDict() # Map<(pubkey, "sequence" | "timestamp", int), PriceOracleMessage>
+_local_latest = {} # Map<pubkey, (expires_at, PriceOracleMessage)>
+
+# Sets the latest message if its sequence is greater than the current one's.
+# A missing key is only set when ARGV[3] is "1", i.e. the message is read from the db,
+# a message saved while the key is missing may be an older one
+_SET_LATEST_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'message_sequence')
+if current then
+    if tonumber(current) >= tonumber(ARGV[1]) then
+        return 0
+    end
+elseif ARGV[3] ~= '1' then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'message_sequence', ARGV[1], 'value', ARGV[2])
+return 1
+"""
+_set_latest_script = REDIS_CLIENT.register_script(_SET_LATEST_SCRIPT)
+
+
+def _sequence_key(pubkey):
+    return f"{_REDIS_KEY_PREFIX}:{pubkey}:sequence"
+
+
+def _timestamp_key(pubkey):
+    return f"{_REDIS_KEY_PREFIX}:{pubkey}:timestamp"
+
+
+def _latest_key(pubkey):
+    return f"{_REDIS_KEY_PREFIX}:{pubkey}:latest"
+
+
+def _serialize(price_oracle_message):
+    # ids are left out so the same message always serializes to the same member
+    return json.dumps({
+        "pubkey": price_oracle_message.pubkey,
+        "signature": price_oracle_message.signature,
+        "message": price_oracle_message.message,
+        "message_timestamp": int(price_oracle_message.message_timestamp.timestamp()),
+        "price_value": price_oracle_message.price_value,
+        "price_sequence": price_oracle_message.price_sequence,
+        "message_sequence": price_oracle_message.message_sequence,
+    })
+
+
+def _deserialize(value):
+    data = json.loads(value)
+    data["id"] = None
+    data["message_timestamp"] = datetime.fromtimestamp(data["message_timestamp"], tz=pytz.UTC)
+    return PriceOracleMessage.from_db("default", _FIELD_NAMES, [data[field_name] for field_name in _FIELD_NAMES])
+
+
+def _local_get(key):
+    price_oracle_message = _local_messages.get(key)
+    if price_oracle_message is not None:
+        _local_messages.move_to_end(key)
+    return price_oracle_message
+
+
+def _local_set(price_oracle_message):
+    for key in [
+        (price_oracle_message.pubkey, "sequence", price_oracle_message.message_sequence),
+        (price_oracle_message.pubkey, "timestamp", int(price_oracle_message.message_timestamp.timestamp())),
+    ]:
+        _local_messages[key] = price_oracle_message
+        _local_messages.move_to_end(key)
+
+    while len(_local_messages) > LOCAL_CACHE_SIZE:
+        _local_messages.popitem(last=False)
+
+
+def _local_set_latest(price_oracle_message, set_missing=True):
+    cached = _local_latest.get(price_oracle_message.pubkey)
+    if not cached and not set_missing:
+        return
+    if cached and cached[1].message_sequence > price_oracle_message.message_sequence:
+        return
+    _local_latest[price_oracle_message.pubkey] = (time.monotonic() + LOCAL_LATEST_TTL, price_oracle_message)
+
+
+def clear_local_cache():
+    _local_messages.clear()
+    _local_latest.clear()
+
+
+def _set_latest(price_oracle_message, set_missing=False, client=None):
+    _set_latest_script(
+        keys=[_latest_key(price_oracle_message.pubkey)],
+        args=[
+            price_oracle_message.message_sequence,
+            _serialize(price_oracle_message),
+            "1" if set_missing else "0",
+        ],
+        client=client,
+    )
+
+
+def cache_price_oracle_messages(price_oracle_messages):
+    """
+        Add price messages to the cache, called on ingest so lookups of recent messages don't hit the db.
+        Only the most recent `RECENT_MESSAGES_COUNT` messages per oracle are kept in redis.
+        The cached latest message of an oracle is only replaced by a newer one
+
+    Parameters
+    ------------
+        price_oracle_messages: list(anyhedge.models.PriceOracleMessage)
+    """
+    messages_by_pubkey = {}
+    for price_oracle_message in price_oracle_messages:
+        if not price_oracle_message:
+            continue
+        messages_by_pubkey.setdefault(price_oracle_message.pubkey, []).append(price_oracle_message)
+
+    if not messages_by_pubkey:
+        return
+
+    pipeline = REDIS_CLIENT.pipeline(transaction=False)
+    for pubkey, messages in messages_by_pubkey.items():
+        sequence_mapping = {}
+        timestamp_mapping = {}
+        for price_oracle_message in messages:
+            value = _serialize(price_oracle_message)
+            sequence_mapping[value] = price_oracle_message.message_sequence
+            timestamp_mapping[value] = int(price_oracle_message.message_timestamp.timestamp())
+            _local_set(price_oracle_message)
+
+        pipeline.zadd(_sequence_key(pubkey), sequence_mapping)
+        pipeline.zadd(_timestamp_key(pubkey), timestamp_mapping)
+        pipeline.zremrangebyrank(_sequence_key(pubkey), 0, -(RECENT_MESSAGES_COUNT + 1))
+        pipeline.zremrangebyrank(_timestamp_key(pubkey), 0, -(RECENT_MESSAGES_COUNT + 1))
+
+        latest_price_oracle_message = max(messages, key=lambda msg: msg.message_sequence)
+        _set_latest(latest_price_oracle_message, client=pipeline)
+        _local_set_latest(latest_price_oracle_message, set_missing=False)
+
+    try:
+        pipeline.execute()
+    except Exception as exception:
+        # the cache is only an optimization, lookups fall back to the db
+        LOGGER.exception(exception)
+
+
+def _redis_get_by_score(key, min_score, max_score):
+    try:
+        values = REDIS_CLIENT.zrangebyscore(key, min_score, max_score)
+    except Exception as exception:
+        LOGGER.exception(exception)
+        return []
+    return [_deserialize(value) for value in values]
+
+
+def get_latest_price_oracle_message(pubkey):
+    """
+    Returns
+    ------------
+        price_oracle_message: anyhedge.models.PriceOracleMessage | None
+            latest price message of the oracle
+    """
+    cached = _local_latest.get(pubkey)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    price_oracle_message = None
+    try:
+        value = REDIS_CLIENT.hget(_latest_key(pubkey), "value")
+        if value:
+            price_oracle_message = _deserialize(value)
+    except Exception as exception:
+        LOGGER.exception(exception)
+
+    if not price_oracle_message:
+        price_oracle_message = PriceOracleMessage.objects.filter(pubkey=pubkey).order_by("-message_timestamp").first()
+        if price_oracle_message:
+            try:
+                _set_latest(price_oracle_message, set_missing=True)
+            except Exception as exception:
+                LOGGER.exception(exception)
+
+    if price_oracle_message:
+        _local_set_latest(price_oracle_message)
+    return price_oracle_message
+
+
+def get_latest_price_oracle_messages(pubkeys):
+    """
+    Returns
+    ------------
+        price_oracle_messages: Map<oracle_pubkey, PriceOracleMessage>
+    """
+    price_oracle_messages = {}
+    for pubkey in set(pubkeys):
+        price_oracle_message = get_latest_price_oracle_message(pubkey)
+        if price_oracle_message:
+            price_oracle_messages[pubkey] = price_oracle_message
+    return price_oracle_messages
+
+
+def get_price_oracle_message_by_sequence(pubkey, message_sequence):
+    """
+    Returns
+    ------------
+        price_oracle_message: anyhedge.models.PriceOracleMessage | None
+    """
+    if message_sequence is None:
+        return None
+
+    price_oracle_message = _local_get((pubkey, "sequence", message_sequence))
+    if price_oracle_message:
+        return price_oracle_message
+
+    results = _redis_get_by_score(_sequence_key(pubkey), message_sequence, message_sequence)
+    if results:
+        price_oracle_message = results[0]
+    else:
+        price_oracle_message = PriceOracleMessage.objects.filter(
+            pubkey=pubkey,
+            message_sequence=message_sequence,
+        ).first()
+
+    if price_oracle_message:
+        _local_set(price_oracle_message)
+    return price_oracle_message
+
+
+def get_price_oracle_message_at_timestamp(pubkey, timestamp):
+    """
+    Parameters
+    ------------
+        timestamp: datetime.datetime
+            exact message timestamp, e.g. a contract's start timestamp
+
+    Returns
+    ------------
+        price_oracle_message: anyhedge.models.PriceOracleMessage | None
+    """
+    unix_timestamp = int(timestamp.timestamp())
+    price_oracle_message = _local_get((pubkey, "timestamp", unix_timestamp))
+    if price_oracle_message:
+        return price_oracle_message
+
+    results = _redis_get_by_score(_timestamp_key(pubkey), unix_timestamp, unix_timestamp)
+    if results:
+        price_oracle_message = results[0]
+    else:
+        price_oracle_message = PriceOracleMessage.objects.filter(
+            pubkey=pubkey,
+            message_timestamp=timestamp,
+        ).first()
+
+    if price_oracle_message:
+        _local_set(price_oracle_message)
+    return price_oracle_message
+
+
+def get_closest_price_oracle_message(pubkeys, timestamp, margin=30):
+    """
+        Cached price message of any of the oracles closest to the timestamp, within +/- `margin` seconds (exclusive).
+        Only the recent messages in redis are looked up, callers fall back to the db when None is returned
+
+    Returns
+    ------------
+        price_oracle_message: anyhedge.models.PriceOracleMessage | None
+    """
+    unix_timestamp = timestamp.timestamp()
+    candidates = []
+    for pubkey in pubkeys:
+        candidates += _redis_get_by_score(
+            _timestamp_key(pubkey),
+            f"({unix_timestamp - margin}",
+            f"({unix_timestamp + margin}",
+        )
+
+    if candidates:
+        return min(candidates, key=lambda msg: abs(msg.message_timestamp.timestamp() - unix_timestamp))
+
+    return None
@@ -0,0 +1,349 @@
+import logging
+from datetime import datetime, timedelta
+from django.db import models, transaction
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.utils import timezone
+from psqlextra.types import ConflictAction
+
+from ..conf import settings as app_settings
+from ..models import (
+    HedgePosition,
+    HedgePositionOfferCounterParty,
+    Oracle,
+    PriceOracleMessage,
+    PriceOracleMessageOHLC,
+)
+
+
+LOGGER = logging.getLogger(__name__)
+
+# max range of price messages aggregated per run, so the first runs on a large history stay bounded
+MAX_DOWNSAMPLE_RANGE = timedelta(days=7)
+# max number of buckets of an oracle recomputed or pruned per run
+MAX_STALE_BUCKETS = 24 * 7
+MAX_PRUNED_BUCKETS = 24 * 7
+
+
+def _floor_to_bucket(timestamp, bucket_seconds):
+    bucket_timestamp = timestamp.timestamp() // bucket_seconds * bucket_seconds
+    return datetime.fromtimestamp(bucket_timestamp, tz=timezone.utc)
+
+
+def _get_bucket_start_epoch(bucket_seconds):
+    return models.ExpressionWrapper(
+        models.functions.Floor(
+            models.functions.Extract("message_timestamp", "epoch") / bucket_seconds
+        ) * bucket_seconds,
+        output_field=models.BigIntegerField(),
+    )
+
+
+def _aggregate_buckets(price_oracle_messages, bucket_seconds):
+    buckets = price_oracle_messages.annotate(
+        bucket_start_epoch=_get_bucket_start_epoch(bucket_seconds),
+    ).order_by().values("pubkey", "bucket_start_epoch").annotate(
+        high=models.Max("price_value"),
+        low=models.Min("price_value"),
+        open_sequence=models.Min("message_sequence"),
+        close_sequence=models.Max("message_sequence"),
+        message_count=models.Count("id"),
+        prices=ArrayAgg("price_value", ordering="message_sequence"),
+    )
+
+    rows = []
+    for bucket in buckets:
+        rows.append(dict(
+            pubkey=bucket["pubkey"],
+            bucket_start=datetime.fromtimestamp(bucket["bucket_start_epoch"], tz=timezone.utc),
+            bucket_seconds=bucket_seconds,
+            open=bucket["prices"][0],
+            high=bucket["high"],
+            low=bucket["low"],
+            close=bucket["prices"][-1],
+            open_sequence=bucket["open_sequence"],
+            close_sequence=bucket["close_sequence"],
+            message_count=bucket["message_count"],
+        ))
+
+    # pruned buckets are never recomputed, their messages are partially removed
+    if len(rows):
+        PriceOracleMessageOHLC.objects.on_conflict(
+            ["pubkey", "bucket_seconds", "bucket_start"], ConflictAction.UPDATE,
+        ).bulk_insert(rows)
+
+    return len(rows)
+
+
+def aggregate_price_oracle_messages(start, end, bucket_seconds=PriceOracleMessageOHLC.BUCKET_SECONDS_HOUR, pubkey=None):
+    """
+        Upsert OHLC buckets of price messages with `start <= message_timestamp < end`,
+        buckets partially covered by the range are recomputed on the next range so
+        start & end should be aligned to the bucket size
+
+    Returns
+    ------------
+        ohlc_count: int
+    """
+    price_oracle_messages = PriceOracleMessage.objects.filter(
+        message_timestamp__gte=start,
+        message_timestamp__lt=end,
+    )
+    if pubkey is not None:
+        price_oracle_messages = price_oracle_messages.filter(pubkey=pubkey)
+
+    return _aggregate_buckets(price_oracle_messages, bucket_seconds)
+
+
+def aggregate_stale_price_oracle_messages(pubkey, before, bucket_seconds=PriceOracleMessageOHLC.BUCKET_SECONDS_HOUR, max_buckets=MAX_STALE_BUCKETS):
+    """
+        Recompute the oracle's buckets before `before` that are missing messages, e.g. history
+        backfilled or saved late after the bucket was aggregated. Pruned buckets are skipped,
+        their late messages are kept at full resolution instead
+
+    Returns
+    ------------
+        ohlc_count: int
+    """
+    message_counts = PriceOracleMessage.objects.filter(
+        pubkey=pubkey,
+        message_timestamp__lt=before,
+    ).annotate(
+        bucket_start_epoch=_get_bucket_start_epoch(bucket_seconds),
+    ).order_by().values("bucket_start_epoch").annotate(
+        message_count=models.Count("id"),
+    ).values_list("bucket_start_epoch", "message_count")
+
+    bucket_message_counts = {
+        bucket_start_epoch: message_count for bucket_start_epoch, message_count in message_counts
+    }
+    if not bucket_message_counts:
+        return 0
+
+    aggregated_buckets = PriceOracleMessageOHLC.objects.filter(
+        pubkey=pubkey,
+        bucket_seconds=bucket_seconds,
+        bucket_start__lt=before,
+    ).values_list("bucket_start", "message_count", "pruned")
+    aggregated_buckets = {
+        int(bucket_start.timestamp()): (message_count, pruned)
+        for bucket_start, message_count, pruned in aggregated_buckets
+    }
+
+    stale_bucket_starts = []
+    for bucket_start_epoch, message_count in sorted(bucket_message_counts.items()):
+        aggregated_message_count, pruned = aggregated_buckets.get(bucket_start_epoch, (0, False))
+        if pruned or message_count <= aggregated_message_count:
+            continue
+        stale_bucket_starts.append(datetime.fromtimestamp(bucket_start_epoch, tz=timezone.utc))
+        if len(stale_bucket_starts) >= max_buckets:
+            break
+
+    if not stale_bucket_starts:
+        return 0
+
+    bucket_ranges = models.Q(pk__in=[])
+    for bucket_start in stale_bucket_starts:
+        bucket_ranges |= models.Q(
+            message_timestamp__gte=bucket_start,
+            message_timestamp__lt=bucket_start + timedelta(seconds=bucket_seconds),
+        )
+
+    LOGGER.info(f"Recomputing {len(stale_bucket_starts)} stale price message bucket/s of oracle {pubkey}")
+    return _aggregate_buckets(
+        PriceOracleMessage.objects.filter(bucket_ranges, pubkey=pubkey),
+        bucket_seconds,
+    )
+
+
+def get_price_message_retention_cutoff(now=None):
+    """
+        Price messages older than the cutoff are no longer kept at full resolution.
+        Open contracts keep every message from their start for liquidation & settlement
+
+    Returns
+    ------------
+        cutoff: datetime
+    """
+    if now is None:
+        now = timezone.now()
+
+    cutoff = now - timedelta(days=app_settings.ANYHEDGE_PRICE_MESSAGE_RETENTION_DAYS)
+
+    earliest_open_contract_start = HedgePosition.objects.filter(
+        funding_tx_hash__isnull=False,
+        settlements__isnull=True,
+    ).exclude(
+        funding_tx_hash="",
+    ).aggregate(
+        earliest_start = models.Min("start_timestamp"),
+    ).get("earliest_start")
+
+    if earliest_open_contract_start is not None:
+        cutoff = min(cutoff, earliest_open_contract_start)
+
+    return cutoff
+
+
+def _annotate_kept_price_oracle_messages(price_oracle_messages):
+    return price_oracle_messages.annotate(
+        is_contract_start_price=models.Exists(
+            HedgePosition.objects.filter(
+                oracle_pubkey=models.OuterRef("pubkey"),
+                start_timestamp=models.OuterRef("message_timestamp"),
+            )
+        ),
+        is_offer_price=models.Exists(
+            HedgePositionOfferCounterParty.objects.filter(
+                hedge_position_offer__oracle_pubkey=models.OuterRef("pubkey"),
+                oracle_message_sequence=models.OuterRef("message_sequence"),
+            )
+        ),
+    )
+
+
+def delete_price_oracle_messages(pubkey, cutoff, bucket_seconds=PriceOracleMessageOHLC.BUCKET_SECONDS_HOUR, max_buckets=MAX_PRUNED_BUCKETS):
+    """
+        Delete the oracle's price messages in aggregated buckets that end before the cutoff.
+        A bucket is pruned at once and only if none of its messages are missing in the bucket,
+        messages referenced by contracts (starting price) & offers (counter party's price) are kept
+
+    Returns
+    ------------
+        deleted_count: int
+    """
+    buckets = PriceOracleMessageOHLC.objects.filter(
+        pubkey=pubkey,
+        bucket_seconds=bucket_seconds,
+        pruned=False,
+        bucket_start__lte=cutoff - timedelta(seconds=bucket_seconds),
+    ).order_by("bucket_start")[:max_buckets]
+
+    deleted_count = 0
+    for bucket in buckets:
+        price_oracle_messages = _annotate_kept_price_oracle_messages(
+            PriceOracleMessage.objects.filter(
+                pubkey=pubkey,
+                message_timestamp__gte=bucket.bucket_start,
+                message_timestamp__lt=bucket.bucket_end,
+            )
+        ).values_list("id", "is_contract_start_price", "is_offer_price")
+        price_oracle_messages = list(price_oracle_messages)
+
+        # messages saved after the bucket was aggregated, it is recomputed first on the next run
+        if len(price_oracle_messages) > bucket.message_count:
+            continue
+
+        ids = [
+            id for id, is_contract_start_price, is_offer_price in price_oracle_messages
+            if not is_contract_start_price and not is_offer_price
+        ]
+        with transaction.atomic():
+            if ids:
+                # the timestamp filter limits the delete to the bucket's partition
+                count, _ = PriceOracleMessage.objects.filter(
+                    id__in=ids,
+                    message_timestamp__gte=bucket.bucket_start,
+                    message_timestamp__lt=bucket.bucket_end,
+                ).delete()
+                deleted_count += count
+            PriceOracleMessageOHLC.objects.filter(id=bucket.id).update(pruned=True)
+
+    return deleted_count
+
+
+def get_price_oracle_pubkeys():
+    return set(Oracle.objects.values_list("pubkey", flat=True)) | set(
+        PriceOracleMessageOHLC.objects.order_by().values_list("pubkey", flat=True).distinct()
+    )
+
+
+def downsample_oracle_price_messages(pubkey, end, retention_cutoff, bucket_seconds=PriceOracleMessageOHLC.BUCKET_SECONDS_HOUR):
+    """
+        Roll the oracle's complete buckets before `end` into OHLC buckets then remove
+        its full resolution messages past the retention cutoff that are already aggregated
+
+    Returns
+    ------------
+        (ohlc_count, deleted_count): (int, int)
+    """
+    # the latest bucket of the oracle is recomputed in case messages arrived after it was aggregated,
+    # unless it is pruned. Starting from the first message after it skips over gaps in the price messages
+    latest_bucket = PriceOracleMessageOHLC.objects.filter(
+        pubkey=pubkey,
+        bucket_seconds=bucket_seconds,
+    ).order_by("-bucket_start").first()
+
+    # messages before the oracle's watermark are all aggregated, except for stale buckets recomputed below
+    aggregated_until = None
+    if latest_bucket is not None:
+        aggregated_until = latest_bucket.bucket_end if latest_bucket.pruned else latest_bucket.bucket_start
+
+    price_oracle_messages = PriceOracleMessage.objects.filter(pubkey=pubkey)
+    if aggregated_until is not None:
+        price_oracle_messages = price_oracle_messages.filter(message_timestamp__gte=aggregated_until)
+
+    ohlc_count = 0
+
+    start = price_oracle_messages.aggregate(start = models.Min("message_timestamp")).get("start")
+    if start is not None:
+        start = _floor_to_bucket(start, bucket_seconds)
+        range_end = min(end, start + MAX_DOWNSAMPLE_RANGE)
+        if start < range_end:
+            ohlc_count += aggregate_price_oracle_messages(start, range_end, bucket_seconds=bucket_seconds, pubkey=pubkey)
+            aggregated_until = range_end
+
+    if aggregated_until is None:
+        return ohlc_count, 0
+
+    ohlc_count += aggregate_stale_price_oracle_messages(pubkey, aggregated_until, bucket_seconds=bucket_seconds)
+    deleted_count = delete_price_oracle_messages(
+        pubkey,
+        min(retention_cutoff, aggregated_until),
+        bucket_seconds=bucket_seconds,
+    )
+    return ohlc_count, deleted_count
+
+
+def downsample_price_oracle_messages(now=None):
+    """
+        Downsample the price messages of each oracle, see `downsample_oracle_price_messages`
+
+    Returns
+    ------------
+        (ohlc_count, deleted_count): (int, int)
+    """
+    if now is None:
+        now = timezone.now()
+
+    bucket_seconds = PriceOracleMessageOHLC.BUCKET_SECONDS_HOUR
+    end = _floor_to_bucket(now, bucket_seconds)
+    retention_cutoff = get_price_message_retention_cutoff(now=now)
+
+    ohlc_count = 0
+    deleted_count = 0
+    for pubkey in get_price_oracle_pubkeys():
+        oracle_ohlc_count, oracle_deleted_count = downsample_oracle_price_messages(
+            pubkey, end, retention_cutoff, bucket_seconds=bucket_seconds,
+        )
+        ohlc_count += oracle_ohlc_count
+        deleted_count += oracle_deleted_count
+
+    LOGGER.info(f"Price messages downsampled until {end}, {ohlc_count} bucket/s & {deleted_count} message/s removed before {retention_cutoff}")
+    return ohlc_count, deleted_count
+
+
+def get_price_oracle_message_ohlc(pubkeys, timestamp, bucket_seconds=PriceOracleMessageOHLC.BUCKET_SECONDS_HOUR):
+    """
+        Bucket of one of the oracles containing the timestamp, used to look up prices
+        of periods that are no longer kept at full resolution
+
+    Returns
+    ------------
+        ohlc: PriceOracleMessageOHLC | None
+    """
+    return PriceOracleMessageOHLC.objects.filter(
+        pubkey__in=pubkeys,
+        bucket_seconds=bucket_seconds,
+        bucket_start__lte=timestamp,
+        bucket_start__gt=timestamp - timedelta(seconds=bucket_seconds),
+    ).first()
@@ -1,7 +1,16 @@
 import pytz
+import hashlib
 from datetime import datetime
+from ecdsa import SECP256k1, VerifyingKey
+from ecdsa.ellipticcurve import INFINITY
 from ..models import PriceOracleMessage
 from ..js.runner import AnyhedgeFunctions
+from .price_cache import cache_price_oracle_messages
+
+
+# price messages are 4 little endian int32s:
+# message timestamp, message sequence, data(price) sequence, price value
+PRICE_MESSAGE_LENGTH = 16
 
 
 def save_price_oracle_message(oracle_pubkey, price_message):
@@ -26,9 +35,141 @@ def save_price_oracle_message(oracle_pubkey, price_message):
         queryset.update(**defaults)
         price_oracle_message = queryset.first()
 
+    cache_price_oracle_messages([price_oracle_message])
     return price_oracle_message
 
 
+def bulk_save_price_oracle_messages(oracle_pubkey, price_messages):
+    """
+        Bulk insert counterpart of `save_price_oracle_message`, messages that already exist
+        (same oracle pubkey & message sequence) are skipped
+
+    Parameters
+    ------------
+        oracle_pubkey: str
+        price_messages: list({ priceMessage: { message, signature }, priceData: { ... } })
+            same structure as the results of `get_price_messages`
+
+    Returns
+    ------------
+        price_oracle_messages: list(anyhedge.models.PriceOracleMessage)
+    """
+    objs = []
+    for price_message in price_messages:
+        if not isinstance(price_message, dict):
+            continue
+
+        objs.append(PriceOracleMessage(
+            pubkey=oracle_pubkey,
+            signature=price_message["priceMessage"]["signature"],
+            message=price_message["priceMessage"]["message"],
+            message_timestamp=datetime.fromtimestamp(price_message["priceData"]["messageTimestamp"]).replace(tzinfo=pytz.UTC),
+            price_value=price_message["priceData"]["priceValue"],
+            price_sequence=price_message["priceData"]["priceSequence"],
+            message_sequence=price_message["priceData"]["messageSequence"],
+        ))
+
+    if not len(objs):
+        return []
+
+    price_oracle_messages = PriceOracleMessage.objects.bulk_create(objs, ignore_conflicts=True)
+    cache_price_oracle_messages(price_oracle_messages)
+    return price_oracle_messages
+
+
+def decode_price_message(message):
+    """
+        In-process counterpart of js `OracleData.parsePriceMessage`
+
+    Parameters
+    ------------
+        message: str
+            hex string of the oracle message
+
+    Returns
+    ------------
+        price_data: dict | None
+            Same keys as `priceData` in results of `get_price_messages`,
+            None if the message is not a price message (e.g. oracle metadata messages)
+    """
+    try:
+        message_bytes = bytes.fromhex(message)
+    except (TypeError, ValueError):
+        return None
+
+    if len(message_bytes) != PRICE_MESSAGE_LENGTH:
+        return None
+
+    values = [
+        int.from_bytes(message_bytes[index:index+4], "little", signed=True)
+        for index in range(0, PRICE_MESSAGE_LENGTH, 4)
+    ]
+    message_timestamp, message_sequence, price_sequence, price_value = values
+
+    # metadata messages have a negative data sequence
+    if price_sequence <= 0:
+        return None
+
+    return {
+        "messageTimestamp": message_timestamp,
+        "messageSequence": message_sequence,
+        "priceSequence": price_sequence,
+        "priceValue": price_value,
+    }
+
+
+def verify_price_message_signature(message, signature, pubkey):
+    """
+        In-process counterpart of js `OracleData.verifyMessageSignature`,
+        verifies a BCH schnorr signature of the sha256 of the message
+
+    Parameters
+    ------------
+        message: str
+        signature: str
+        pubkey: str
+            hex strings
+
+    Returns
+    ------------
+        valid: boolean
+    """
+    try:
+        message_bytes = bytes.fromhex(message)
+        signature_bytes = bytes.fromhex(signature)
+        pubkey_bytes = bytes.fromhex(pubkey)
+        point = VerifyingKey.from_string(pubkey_bytes, curve=SECP256k1).pubkey.point
+    except Exception:
+        return False
+
+    if len(signature_bytes) != 64:
+        return False
+
+    curve_order = SECP256k1.order
+    field_size = SECP256k1.curve.p()
+    r = int.from_bytes(signature_bytes[:32], "big")
+    s = int.from_bytes(signature_bytes[32:], "big")
+    if r >= field_size or s >= curve_order:
+        return False
+
+    compressed_pubkey = bytes([2 + (point.y() & 1)]) + point.x().to_bytes(32, "big")
+    message_hash = hashlib.sha256(message_bytes).digest()
+    e = int.from_bytes(
+        hashlib.sha256(signature_bytes[:32] + compressed_pubkey + message_hash).digest(),
+        "big",
+    ) % curve_order
+
+    R = SECP256k1.generator * s + point * (curve_order - e)
+    if R == INFINITY:
+        return False
+
+    # R.y must be a quadratic residue
+    if pow(R.y(), (field_size - 1) // 2, field_size) != 1:
+        return False
+
+    return R.x() == r
+
+
 def get_price_messages(
     oracle_pubkey,
     relay:str=None,
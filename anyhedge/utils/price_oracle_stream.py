@@ -0,0 +1,196 @@
+import json
+import time
+import logging
+import zmq
+from django.db import close_old_connections
+
+from ..conf import settings as app_settings
+from ..models import Oracle
+from .price_oracle import (
+    bulk_save_price_oracle_messages,
+    decode_price_message,
+    verify_price_message_signature,
+)
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+class PriceOracleStream:
+    """
+        Long running ingester of oracle price messages.
+        Keeps a persistent zmq subscription to the relay of each active `Oracle`,
+        verifies & decodes the broadcasted messages in-process and bulk inserts them.
+    """
+
+    def __init__(self, flush_interval=1, flush_size=100, oracles_refresh_interval=60, on_save=None):
+        """
+        Parameters
+        ------------
+            flush_interval: int | float
+                Max seconds a received message waits in the buffer before being saved
+            flush_size: int
+                Max number of messages in the buffer before being saved
+            oracles_refresh_interval: int | float
+                Seconds between checks for added/deactivated oracles
+            on_save: callable(list(PriceOracleMessage))
+                Called with the newly saved messages after each flush
+        """
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.oracles_refresh_interval = oracles_refresh_interval
+        self.on_save = on_save
+
+        self.context = zmq.Context()
+        self.poller = zmq.Poller()
+        self.sockets = {} # Map<pubkey, zmq.Socket>
+        self.buffer = {} # Map<pubkey, list(price_message)>
+        self.last_flush = time.monotonic()
+        self.last_oracles_refresh = None
+
+    def get_relay_url(self, oracle):
+        """
+            Returns None if neither the oracle nor the settings have a relay
+        """
+        relay = oracle.relay or app_settings.ANYHEDGE_DEFAULT_ORACLE_RELAY
+        if not relay:
+            return None
+        return f"tcp://{relay}:{app_settings.ANYHEDGE_ORACLE_BROADCAST_PORT}"
+
+    def connect(self, oracle):
+        relay_url = self.get_relay_url(oracle)
+        if not relay_url:
+            # retried on the next oracles refresh
+            LOGGER.warning(f"No relay for oracle {oracle.pubkey}")
+            return
+
+        socket = self.context.socket(zmq.SUB)
+        socket.setsockopt_string(zmq.SUBSCRIBE, "")
+        socket.setsockopt(zmq.TCP_KEEPALIVE, 1)
+        socket.setsockopt(zmq.TCP_KEEPALIVE_IDLE, 30)
+        socket.setsockopt(zmq.TCP_KEEPALIVE_INTVL, 5)
+        socket.setsockopt(zmq.RECONNECT_IVL_MAX, 30 * 1000)
+        socket.connect(relay_url)
+        self.poller.register(socket, zmq.POLLIN)
+        self.sockets[oracle.pubkey] = socket
+        LOGGER.info(f"Subscribed to oracle {oracle.pubkey} at {relay_url}")
+
+    def disconnect(self, pubkey):
+        socket = self.sockets.pop(pubkey, None)
+        if socket is None:
+            return
+        self.poller.unregister(socket)
+        socket.close(linger=0)
+        LOGGER.info(f"Unsubscribed from oracle {pubkey}")
+
+    def refresh_oracles(self):
+        close_old_connections()
+        oracles = { oracle.pubkey: oracle for oracle in Oracle.objects.filter(active=True) }
+        for pubkey in list(self.sockets.keys()):
+            if pubkey not in oracles:
+                self.disconnect(pubkey)
+
+        for pubkey, oracle in oracles.items():
+            if pubkey not in self.sockets:
+                self.connect(oracle)
+
+        self.last_oracles_refresh = time.monotonic()
+
+    def parse_frames(self, frames):
+        """
+            The relay broadcasts signed messages as json `{ message, signature, publicKey }`,
+            the payload is the last frame in case it is sent with a topic frame
+        """
+        try:
+            data = json.loads(frames[-1])
+        except (IndexError, ValueError, UnicodeDecodeError):
+            return None
+
+        if not isinstance(data, dict):
+            return None
+
+        message = data.get("message")
+        signature = data.get("signature")
+        pubkey = data.get("publicKey")
+        if not message or not signature or not pubkey:
+            return None
+
+        return message, signature, pubkey
+
+    def handle_frames(self, expected_pubkey, frames):
+        parsed = self.parse_frames(frames)
+        if not parsed:
+            return
+
+        message, signature, pubkey = parsed
+        if pubkey != expected_pubkey:
+            return
+
+        price_data = decode_price_message(message)
+        if not price_data:
+            # not a price message, e.g. oracle metadata
+            return
+
+        if not verify_price_message_signature(message, signature, pubkey):
+            LOGGER.warning(f"Invalid signature for oracle {pubkey} message: {message}")
+            return
+
+        self.buffer.setdefault(pubkey, []).append({
+            "priceMessage": { "message": message, "signature": signature, "publicKey": pubkey },
+            "priceData": price_data,
+        })
+
+    def buffer_size(self):
+        return sum(len(messages) for messages in self.buffer.values())
+
+    def flush(self):
+        saved = []
+        for pubkey, price_messages in self.buffer.items():
+            if not len(price_messages):
+                continue
+            saved += bulk_save_price_oracle_messages(pubkey, price_messages)
+
+        self.buffer = {}
+        self.last_flush = time.monotonic()
+        if len(saved):
+            LOGGER.info(f"Saved {len(saved)} price message/s")
+            if callable(self.on_save):
+                try:
+                    self.on_save(saved)
+                except Exception as exception:
+                    LOGGER.exception(exception)
+
+        return saved
+
+    def run(self):
+        try:
+            while True:
+                # the process is long running, drop db connections that are broken or past CONN_MAX_AGE
+                close_old_connections()
+                now = time.monotonic()
+                if self.last_oracles_refresh is None or now - self.last_oracles_refresh >= self.oracles_refresh_interval:
+                    self.refresh_oracles()
+
+                timeout = max(0, self.flush_interval - (now - self.last_flush))
+                events = dict(self.poller.poll(timeout * 1000)) if self.sockets else {}
+                if not self.sockets:
+                    time.sleep(timeout)
+
+                for pubkey, socket in list(self.sockets.items()):
+                    if socket not in events:
+                        continue
+                    while True:
+                        try:
+                            frames = socket.recv_multipart(zmq.NOBLOCK)
+                        except zmq.Again:
+                            break
+                        self.handle_frames(pubkey, frames)
+
+                if self.buffer_size() >= self.flush_size or time.monotonic() - self.last_flush >= self.flush_interval:
+                    self.flush()
+        finally:
+            close_old_connections()
+            self.flush()
+            for pubkey in list(self.sockets.keys()):
+                self.disconnect(pubkey)
+            self.context.term()
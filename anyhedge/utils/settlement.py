@@ -5,11 +5,12 @@ from django.db import models
 from cashaddress import convert
 from .api import TransactionMetaAttribute
 from .contract import compile_contract_from_hedge_position
+from .price_cache import get_price_oracle_message_by_sequence
 from .price_oracle import (
     save_price_oracle_message,
     get_price_messages,
 )
-from ..js.runner import AnyhedgeFunctions
+from ..js.runner import AnyhedgeFunctions, run_batch
 from ..models import (
     HedgePosition,
     HedgeSettlement,
@@ -111,30 +112,139 @@ def search_settlement_tx(contract_address):
     return settlements
 
 
-def settle_hedge_position_maturity(hedge_position_obj):
-    contract_data = compile_contract_from_hedge_position(hedge_position_obj)
+def search_settlement_txs(contract_addresses):
+    """
+        Batch variant of `search_settlement_tx()`, uses a single bitdb query, raw transaction request
+        and node process for all contracts
 
-    oracle = Oracle.objects.filter(pubkey=hedge_position_obj.oracle_pubkey).first()
-    oracle_info = None
+    Returns
+    ------------
+        settlements_map: Map<contract_address, list(settlement)>
+    """
+    address_map = {}
+    for contract_address in contract_addresses:
+        cash_address = convert.to_cash_address(contract_address)
+        address_map[cash_address.replace("bitcoincash:", "")] = contract_address
+
+    settlements_map = { contract_address: [] for contract_address in contract_addresses }
+    if not address_map:
+        return settlements_map
+
+    query = {
+        "v": 3,
+        "q": {
+            "find": { "in.e.a": { "$in": list(address_map.keys()) } },
+            "limit": len(address_map) * 10,
+            "project": { "tx.h": 1, "in.e": 1 },
+        }
+    }
+
+    # get used utxos of contract addresses
+    query_string = json.dumps(query)
+    query_bytes = query_string.encode('ascii')
+    query_b64 = base64.b64encode(query_bytes)
+    url = f"https://bitdb.bch.sx/q/{query_b64.decode()}"
+
+    data = requests.get(url).json()
+
+    txs = [*data["c"], *data["u"]]
+    tx_hashes = []
+    funding_tx_map = {}
+    for tx in txs:
+        if tx["tx"]["h"] not in tx_hashes:
+            tx_hashes.append(tx["tx"]["h"])
+        for inp in tx["in"]:
+            if inp["e"].get("a") in address_map:
+                funding_tx_map[tx["tx"]["h"]] = inp["e"]["h"]
+
+    if len(tx_hashes) == 0:
+        return settlements_map
+
+    # get raw transactions of used utxos
+    response = requests.post(
+        "https://rest1.biggestfan.net/v2/rawtransactions/getRawTransaction",
+        data = json.dumps({ "txids": tx_hashes, "verbose": False }),
+        headers = {'Content-type': 'application/json', 'Accept': 'text/plain'},
+    )
+    raw_transactions = response.json()
+    if not isinstance(raw_transactions, list):
+        return settlements_map
+
+    # parse raw transactions to settlements
+    parse_settlement_txs_response = AnyhedgeFunctions.parseSettlementTransactions(raw_transactions)
+    if not parse_settlement_txs_response["success"]:
+        return settlements_map
+
+    for settlement in parse_settlement_txs_response["settlements"]:
+        if not settlement or settlement.get("address") not in settlements_map:
+            continue
+
+        settlement_data = settlement["settlement"]
+        settlement_txid = settlement_data.get("settlementTransactionHash") or settlement_data.get("spendingTransaction")
+        if settlement_txid and settlement_txid in funding_tx_map:
+            settlement["funding_tx_hash"] = funding_tx_map[settlement_txid]
+
+        settlements_map[settlement["address"]].append(settlement)
+
+    return settlements_map
+
+
+def _get_oracle_info(oracle):
     if oracle and oracle.relay and oracle.port:
-        oracle_info = {
+        return {
             "oracleRelay": oracle.relay,
             "oracleRelayPort": oracle.port,
         }
 
+
+def settle_hedge_position_maturity(hedge_position_obj):
+    contract_data = compile_contract_from_hedge_position(hedge_position_obj)
+
+    oracle = Oracle.objects.filter(pubkey=hedge_position_obj.oracle_pubkey).first()
+    oracle_info = _get_oracle_info(oracle)
+
     return AnyhedgeFunctions.settleContractMaturity(contract_data, oracle_info)
 
 
+def settle_hedge_positions_maturity(hedge_position_objs):
+    """
+        Batch variant of `settle_hedge_position_maturity()` using a single node process
+
+    Returns
+    ------------
+        results: Map<contract_address, { success, settlementData, error }>
+    """
+    oracles = {
+        oracle.pubkey: oracle
+        for oracle in Oracle.objects.filter(pubkey__in=set(obj.oracle_pubkey for obj in hedge_position_objs))
+    }
+
+    results = {}
+    calls = []
+    call_addresses = []
+    for hedge_position_obj in hedge_position_objs:
+        try:
+            contract_data = compile_contract_from_hedge_position(hedge_position_obj)
+        except Exception as exception:
+            results[hedge_position_obj.address] = { "success": False, "error": str(exception) }
+            continue
+
+        oracle_info = _get_oracle_info(oracles.get(hedge_position_obj.oracle_pubkey))
+        calls.append(("settleContractMaturity", (contract_data, oracle_info)))
+        call_addresses.append(hedge_position_obj.address)
+
+    for address, result in zip(call_addresses, run_batch(calls)):
+        if isinstance(result, Exception):
+            result = { "success": False, "error": str(result) }
+        results[address] = result
+
+    return results
+
+
 def liquidate_hedge_position(hedge_position_obj, message_sequence):
     contract_data = compile_contract_from_hedge_position(hedge_position_obj)
-    settlement_price_message = PriceOracleMessage.objects.filter(
-        pubkey=hedge_position_obj.oracle_pubkey,
-        message_sequence=message_sequence,
-    ).first()
-    previous_price_message = PriceOracleMessage.objects.filter(
-        pubkey=hedge_position_obj.oracle_pubkey,
-        message_sequence=message_sequence-1,
-    ).first()
+    settlement_price_message = get_price_oracle_message_by_sequence(hedge_position_obj.oracle_pubkey, message_sequence)
+    previous_price_message = get_price_oracle_message_by_sequence(hedge_position_obj.oracle_pubkey, message_sequence-1)
 
     if not settlement_price_message or not previous_price_message:
         oracle = Oracle.objects.filter(pubkey=hedge_position_obj.oracle_pubkey).first()
@@ -153,7 +263,7 @@ def liquidate_hedge_position(hedge_position_obj, message_sequence):
     return AnyhedgeFunctions.liquidateContract(contract_data, prevPriceMessage, settlementPriceMessage)
 
 
-def complete_mutual_redemption(mutual_redemption_obj):
+def get_mutual_redemption_params(mutual_redemption_obj):
     contract_data = compile_contract_from_hedge_position(mutual_redemption_obj.hedge_position)
 
     mutual_redemption_data = {
@@ -165,7 +275,38 @@ def complete_mutual_redemption(mutual_redemption_obj):
         "settlementPrice": mutual_redemption_obj.settlement_price,
     }
 
-    return AnyhedgeFunctions.completeMutualRedemption(contract_data, mutual_redemption_data)
+    return contract_data, mutual_redemption_data
+
+
+def complete_mutual_redemption(mutual_redemption_obj):
+    return AnyhedgeFunctions.completeMutualRedemption(*get_mutual_redemption_params(mutual_redemption_obj))
+
+
+def complete_mutual_redemptions(mutual_redemption_objs):
+    """
+        Batch variant of `complete_mutual_redemption()` using a single node process
+
+    Returns
+    ------------
+        results: Map<contract_address, { success, settlementTxid, fundingTxid, error }>
+    """
+    results = {}
+    calls = []
+    call_addresses = []
+    for mutual_redemption_obj in mutual_redemption_objs:
+        address = mutual_redemption_obj.hedge_position.address
+        try:
+            calls.append(("completeMutualRedemption", get_mutual_redemption_params(mutual_redemption_obj)))
+            call_addresses.append(address)
+        except Exception as exception:
+            results[address] = { "success": False, "error": str(exception) }
+
+    for address, result in zip(call_addresses, run_batch(calls)):
+        if isinstance(result, Exception):
+            result = { "success": False, "error": str(result) }
+        results[address] = result
+
+    return results
 
 
 def save_settlement_data_from_mutual_redemption(hedge_position_obj):
@@ -0,0 +1,163 @@
+import logging
+from django.db import models, transaction
+
+from ..models import (
+    HedgePosition,
+    WalletPositionSummary,
+)
+from .price_cache import get_latest_price_oracle_messages
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _aggregate_open_contracts(wallet_hashes, position):
+    if position == WalletPositionSummary.POSITION_HEDGE:
+        wallet_hash_field = "hedge_wallet_hash"
+    else:
+        wallet_hash_field = "long_wallet_hash"
+
+    queryset = HedgePosition.objects.filter(
+        funding_tx_hash__isnull=False,
+        settlements__isnull=True,
+        **{ f"{wallet_hash_field}__in": wallet_hashes },
+    ).exclude(
+        funding_tx_hash="",
+    ).exclude(
+        cancelled_at__isnull=False,
+    )
+
+    queryset = queryset.annotate(
+        _nominal_unit_sats = queryset.Annotations.nominal_unit_sats,
+        _total_sats = queryset.Annotations.total_sats,
+        _long_sats = queryset.Annotations.long_sats,
+    )
+
+    sats_field = "satoshis" if position == WalletPositionSummary.POSITION_HEDGE else "_long_sats"
+    return queryset.order_by().values(wallet_hash_field, "oracle_pubkey").annotate(
+        open_count=models.Count("id"),
+        total_nominal_unit_sats=models.Sum("_nominal_unit_sats"),
+        total_sats=models.Sum(sats_field),
+        total_payout_sats=models.Sum("_total_sats"),
+    ).values_list(
+        wallet_hash_field, "oracle_pubkey",
+        "open_count", "total_nominal_unit_sats", "total_sats", "total_payout_sats",
+    )
+
+
+@transaction.atomic
+def refresh_wallet_position_summaries(wallet_hashes):
+    """
+        Recompute the summaries of the wallets from their open contracts,
+        summaries of wallets with no open contracts left are removed
+
+    Parameters
+    ------------
+        wallet_hashes: list(str)
+
+    Returns
+    ------------
+        summaries: list(WalletPositionSummary)
+    """
+    wallet_hashes = list(set(wallet_hash for wallet_hash in wallet_hashes if wallet_hash))
+    if not wallet_hashes:
+        return []
+
+    aggregates = {}
+    for position, _ in WalletPositionSummary.POSITIONS:
+        for wallet_hash, oracle_pubkey, *totals in _aggregate_open_contracts(wallet_hashes, position):
+            aggregates[(wallet_hash, oracle_pubkey, position)] = totals
+
+    latest_price_oracle_messages = get_latest_price_oracle_messages(
+        set(oracle_pubkey for _, oracle_pubkey, _ in aggregates.keys())
+    )
+
+    existing_summaries = {
+        (obj.wallet_hash, obj.oracle_pubkey, obj.position): obj
+        for obj in WalletPositionSummary.objects.select_for_update().filter(wallet_hash__in=wallet_hashes)
+    }
+
+    to_create = []
+    to_update = []
+    for key, (open_count, total_nominal_unit_sats, total_sats, total_payout_sats) in aggregates.items():
+        summary = existing_summaries.pop(key, None)
+        if summary:
+            to_update.append(summary)
+        else:
+            wallet_hash, oracle_pubkey, position = key
+            summary = WalletPositionSummary(wallet_hash=wallet_hash, oracle_pubkey=oracle_pubkey, position=position)
+            to_create.append(summary)
+
+        summary.open_count = open_count
+        summary.total_nominal_unit_sats = total_nominal_unit_sats or 0
+        summary.total_sats = total_sats or 0
+        summary.total_payout_sats = total_payout_sats or 0
+
+        price_oracle_message = latest_price_oracle_messages.get(summary.oracle_pubkey)
+        if price_oracle_message and price_oracle_message.price_value:
+            summary.price_value = price_oracle_message.price_value
+            summary.price_message_sequence = price_oracle_message.message_sequence
+            summary.unrealized_pnl_sats = summary.calculate_unrealized_pnl(price_oracle_message.price_value)
+
+    if len(existing_summaries):
+        WalletPositionSummary.objects.filter(id__in=[obj.id for obj in existing_summaries.values()]).delete()
+    if len(to_create):
+        WalletPositionSummary.objects.bulk_create(to_create)
+    if len(to_update):
+        WalletPositionSummary.objects.bulk_update(to_update, [
+            "open_count",
+            "total_nominal_unit_sats",
+            "total_sats",
+            "total_payout_sats",
+            "price_value",
+            "price_message_sequence",
+            "unrealized_pnl_sats",
+        ])
+
+    return [*to_create, *to_update]
+
+
+def update_wallet_position_summaries_price(price_oracle_messages):
+    """
+        Update the price & unrealized P/L of summaries using the latest of the price messages per oracle,
+        a single update query per oracle regardless of the number of wallets
+
+    Parameters
+    ------------
+        price_oracle_messages: list(PriceOracleMessage)
+
+    Returns
+    ------------
+        updated_count: int
+    """
+    latest_price_oracle_messages = {}
+    for price_oracle_message in price_oracle_messages:
+        latest = latest_price_oracle_messages.get(price_oracle_message.pubkey)
+        if not latest or latest.message_sequence < price_oracle_message.message_sequence:
+            latest_price_oracle_messages[price_oracle_message.pubkey] = price_oracle_message
+
+    updated_count = 0
+    for pubkey, price_oracle_message in latest_price_oracle_messages.items():
+        if not price_oracle_message.price_value:
+            continue
+
+        updated_count += WalletPositionSummary.objects.filter(
+            models.Q(price_message_sequence__isnull=True) | models.Q(price_message_sequence__lt=price_oracle_message.message_sequence),
+            oracle_pubkey=pubkey,
+        ).update(
+            price_value=price_oracle_message.price_value,
+            price_message_sequence=price_oracle_message.message_sequence,
+            unrealized_pnl_sats=WalletPositionSummary.get_unrealized_pnl_expression(price_oracle_message.price_value),
+        )
+
+    return updated_count
+
+
+def get_hedge_position_wallet_hashes(*hedge_position_objs):
+    wallet_hashes = set()
+    for hedge_position_obj in hedge_position_objs:
+        wallet_hashes.add(hedge_position_obj.hedge_wallet_hash)
+        wallet_hashes.add(hedge_position_obj.long_wallet_hash)
+    wallet_hashes.discard("")
+    wallet_hashes.discard(None)
+    return list(wallet_hashes)
@@ -1,3 +1,6 @@
+import json
+import time
+from django.conf import settings
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
@@ -9,16 +12,81 @@ from asgiref.sync import async_to_sync
 #     "meta": { "arbitrary-data": "preferably-as-an-object" },
 # }
 
+REDIS_CLIENT = settings.REDISKV
 
-def send_long_account_update(wallet_hash:str, action:str=""):
-    room_name = f"updates_{wallet_hash}"
-    data = { "resource": "long_account", "action": action }
+# Updates are coalesced per room: updates are queued in a redis hash per room and sent together
+# in a single `group_send` after a short window, a newer update of the same resource & action replaces the queued one
+_REDIS_KEY_PREFIX = "anyhedge:ws-updates"
+UPDATES_COALESCE_WINDOW = 1 # seconds
+
+
+def _get_update_key(data):
+    meta = data.get("meta") if isinstance(data.get("meta"), dict) else {}
+    resource_id = meta.get("address", None) or meta.get("id", None) or ""
+    # only identical updates of a resource are merged, different actions are all sent
+    return f"{data.get('resource')}:{resource_id}:{data.get('action') or ''}"
 
+
+def queue_update(wallet_hash:str, data:dict):
+    """
+        Queue an update to the wallet's room, updates are sent by `flush_updates`
+    """
+    room_name = f"updates_{wallet_hash}"
+    updates_key = f"{_REDIS_KEY_PREFIX}:{room_name}"
+    scheduled_key = f"{updates_key}:scheduled"
+
+    value = json.dumps({ "queued_at": time.time(), "data": data })
+    pipeline = REDIS_CLIENT.pipeline()
+    pipeline.hset(updates_key, _get_update_key(data), value)
+    pipeline.expire(updates_key, 60)
+    # only the first update in the window schedules the flush
+    pipeline.set(scheduled_key, 1, nx=True, ex=UPDATES_COALESCE_WINDOW + 30)
+    _, _, scheduled = pipeline.execute()
+
+    if scheduled:
+        from ..tasks import flush_websocket_updates
+        flush_websocket_updates.apply_async((room_name,), countdown=UPDATES_COALESCE_WINDOW)
+
+
+def flush_updates(room_name:str):
+    """
+        Send the queued updates of a room in a single `group_send`
+
+    Returns
+    ------------
+        updates: list(dict)
+    """
+    updates_key = f"{_REDIS_KEY_PREFIX}:{room_name}"
+    scheduled_key = f"{updates_key}:scheduled"
+
+    pipeline = REDIS_CLIENT.pipeline(transaction=True)
+    pipeline.hgetall(updates_key)
+    pipeline.delete(updates_key)
+    pipeline.delete(scheduled_key)
+    queued_updates, _, _ = pipeline.execute()
+
+    updates = []
+    for value in queued_updates.values():
+        try:
+            updates.append(json.loads(value))
+        except (json.decoder.JSONDecodeError, TypeError):
+            pass
+
+    if not len(updates):
+        return []
+
+    updates = [update["data"] for update in sorted(updates, key=lambda update: update["queued_at"])]
     channel_layer = get_channel_layer()
     async_to_sync(channel_layer.group_send)(
-        room_name, 
-        { "type": "send_update", "data": data }
+        room_name,
+        { "type": "send_updates", "data": updates }
     )
+    return updates
+
+
+def send_long_account_update(wallet_hash:str, action:str=""):
+    data = { "resource": "long_account", "action": action }
+    queue_update(wallet_hash, data)
 
 
 def send_offer_settlement_update(hedge_position_offer_obj):
@@ -26,42 +94,31 @@ def send_offer_settlement_update(hedge_position_offer_obj):
     if not hedge_position_obj:
         return
 
-    channel_layer = get_channel_layer()
     data = {
         "resource": "hedge_position_offer",
         "action": "settlement",
         "meta": { "address": hedge_position_obj.address }
     }
     if hedge_position_obj.hedge_wallet_hash:
-        room_name = f"updates_{hedge_position_obj.hedge_wallet_hash}"
         data["meta"]["position"] = "hedge"
-        async_to_sync(channel_layer.group_send)(
-            room_name, 
-            { "type": "send_update", "data": data }
-        )
+        queue_update(hedge_position_obj.hedge_wallet_hash, data)
 
     if hedge_position_obj.long_wallet_hash:
-        room_name = f"updates_{hedge_position_obj.long_wallet_hash}"
         data["meta"]["position"] = "long"
-        async_to_sync(channel_layer.group_send)(
-            room_name, 
-            { "type": "send_update", "data": data }
-        )
+        queue_update(hedge_position_obj.long_wallet_hash, data)
 
 
 def send_hedge_position_offer_update(hedge_position_offer_obj, action:str="", metadata=None):
-    room_names = []
+    wallet_hashes = []
     if hedge_position_offer_obj.wallet_hash:
-        room_names.append(f"updates_{hedge_position_offer_obj.wallet_hash}")
+        wallet_hashes.append(hedge_position_offer_obj.wallet_hash)
 
     if hedge_position_offer_obj.get_counter_party_info():
-        counter_party_wallet_hash = hedge_position_offer_obj.get_counter_party_info().wallet_hash
-        room_names.append(f"updates_{counter_party_wallet_hash}")
+        wallet_hashes.append(hedge_position_offer_obj.get_counter_party_info().wallet_hash)
 
-    if not len(room_names):
+    if not len(wallet_hashes):
         return
 
-    channel_layer = get_channel_layer()
     data = {
         "resource": "hedge_position_offer",
         "action": action,
@@ -74,14 +131,10 @@ def send_hedge_position_offer_update(hedge_position_offer_obj, action:str="", me
     if isinstance(metadata, dict):
         data["meta"].update(metadata)
 
-    for room_name in room_names:
-        async_to_sync(channel_layer.group_send)(
-            room_name, 
-            { "type": "send_update", "data": data }
-        )
+    for wallet_hash in wallet_hashes:
+        queue_update(wallet_hash, data)
 
 def send_contract_cancelled_update(hedge_position_obj):
-    channel_layer = get_channel_layer()
     data = {
         "resource": "hedge_position",
         "action": "cancelled",
@@ -92,25 +145,16 @@ def send_contract_cancelled_update(hedge_position_obj):
     }
 
     if hedge_position_obj.hedge_wallet_hash:
-        room_name = f"updates_{hedge_position_obj.hedge_wallet_hash}"
         data["meta"]["position"] = "hedge"
-        async_to_sync(channel_layer.group_send)(
-            room_name, 
-            { "type": "send_update", "data": data }
-        )
+        queue_update(hedge_position_obj.hedge_wallet_hash, data)
 
     if hedge_position_obj.long_wallet_hash:
-        room_name = f"updates_{hedge_position_obj.long_wallet_hash}"
         data["meta"]["position"] = "long"
-        async_to_sync(channel_layer.group_send)(
-            room_name, 
-            { "type": "send_update", "data": data }
-        )
+        queue_update(hedge_position_obj.long_wallet_hash, data)
 
 
 
 def send_funding_tx_update(hedge_position_obj, position:str="", tx_hash:str=""):
-    channel_layer = get_channel_layer()
     data = {
         "resource": "hedge_position",
         "action": "funding_proposal",
@@ -124,23 +168,14 @@ def send_funding_tx_update(hedge_position_obj, position:str="", tx_hash:str=""):
         data["meta"]["new_tx_hash"] = tx_hash
 
     if hedge_position_obj.hedge_wallet_hash:
-        room_name = f"updates_{hedge_position_obj.hedge_wallet_hash}"
         data["meta"]["position"] = "hedge"
-        async_to_sync(channel_layer.group_send)(
-            room_name, 
-            { "type": "send_update", "data": data }
-        )
+        queue_update(hedge_position_obj.hedge_wallet_hash, data)
 
     if hedge_position_obj.long_wallet_hash:
-        room_name = f"updates_{hedge_position_obj.long_wallet_hash}"
         data["meta"]["position"] = "long"
-        async_to_sync(channel_layer.group_send)(
-            room_name, 
-            { "type": "send_update", "data": data }
-        )
+        queue_update(hedge_position_obj.long_wallet_hash, data)
 
 def send_settlement_update(hedge_position_obj):
-    channel_layer = get_channel_layer()
     data = {
         "resource": "hedge_position",
         "action": "settlement",
@@ -148,23 +183,14 @@ def send_settlement_update(hedge_position_obj):
     }
 
     if hedge_position_obj.hedge_wallet_hash:
-        room_name = f"updates_{hedge_position_obj.hedge_wallet_hash}"
         data["meta"]["position"] = "hedge"
-        async_to_sync(channel_layer.group_send)(
-            room_name, 
-            { "type": "send_update", "data": data }
-        )
+        queue_update(hedge_position_obj.hedge_wallet_hash, data)
 
     if hedge_position_obj.long_wallet_hash:
-        room_name = f"updates_{hedge_position_obj.long_wallet_hash}"
         data["meta"]["position"] = "long"
-        async_to_sync(channel_layer.group_send)(
-            room_name, 
-            { "type": "send_update", "data": data }
-        )
+        queue_update(hedge_position_obj.long_wallet_hash, data)
 
 def send_mutual_redemption_update(mutual_redemption_obj, action=""):
-    channel_layer = get_channel_layer()
     hedge_position_obj = mutual_redemption_obj.hedge_position
     data = {
         "resource": "mutual_redemption",
@@ -177,17 +203,9 @@ def send_mutual_redemption_update(mutual_redemption_obj, action=""):
     }
 
     if hedge_position_obj.hedge_wallet_hash:
-        room_name = f"updates_{hedge_position_obj.hedge_wallet_hash}"
         data["meta"]["position"] = "hedge"
-        async_to_sync(channel_layer.group_send)(
-            room_name, 
-            { "type": "send_update", "data": data }
-        )
+        queue_update(hedge_position_obj.hedge_wallet_hash, data)
 
     if hedge_position_obj.long_wallet_hash:
-        room_name = f"updates_{hedge_position_obj.long_wallet_hash}"
         data["meta"]["position"] = "long"
-        async_to_sync(channel_layer.group_send)(
-            room_name, 
-            { "type": "send_update", "data": data }
-        )
+        queue_update(hedge_position_obj.long_wallet_hash, data)
@@ -15,6 +15,8 @@ from drf_yasg.utils import swagger_auto_schema
 from .models import (
     HedgePositionOffer,
     HedgePosition,
+    PriceOracleMessageOHLC,
+    WalletPositionSummary,
 )
 from .serializers import (
     FundingProposalSerializer,
@@ -32,6 +34,8 @@ from .serializers import (
 
     OracleSerializer,
     PriceOracleMessageSerializer,
+    PriceOracleMessageOHLCSerializer,
+    WalletPositionSummarySerializer,
 )
 from .filters import (
     HedgePositionFilter,
@@ -39,6 +43,7 @@ from .filters import (
 
     OracleFilter,
     PriceOracleMessageFilter,
+    PriceOracleMessageOHLCFilter,
 )
 from .pagination import CustomLimitOffsetPagination
 from .utils.funding import (
@@ -105,6 +110,26 @@ class HedgePositionViewSet(
         data = queryset.values('oracle_pubkey', 'total_hedge_unit_sats', 'total_long_sats')
         return Response(data, status=status.HTTP_200_OK)
 
+    @swagger_auto_schema(
+        method="get",
+        manual_parameters=[
+            openapi.Parameter(name="wallet_hash", type=openapi.TYPE_STRING, in_=openapi.IN_QUERY, required=True),
+        ],
+        responses={200: WalletPositionSummarySerializer(many=True)},
+    )
+    @decorators.action(methods=["get"], detail=False)
+    def wallet_summary(self, request, *args, **kwargs):
+        """
+            Totals of the wallet's open contracts per oracle & position, read from precomputed summaries
+        """
+        wallet_hash = request.query_params.get("wallet_hash", None)
+        if not wallet_hash:
+            return Response({ "wallet_hash": ["This field is required."] }, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = WalletPositionSummary.objects.filter(wallet_hash=wallet_hash).order_by("oracle_pubkey", "position")
+        serializer = WalletPositionSummarySerializer(queryset, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
 
     @swagger_auto_schema(method="post", request_body=FundingProposalSerializer, responses={201: serializer_class})
     @decorators.action(methods=["post"], detail=False)
@@ -399,3 +424,44 @@ class PriceOracleMessageViewSet(
 
     def get_queryset(self):
         return PriceOracleMessageSerializer.Meta.model.objects.all()
+
+    def list(self, request, *args, **kwargs):
+        timestamp_filters = ["timestamp_after", "timestamp_before"]
+        sequence_filters = [
+            "price_sequence", "message_sequence",
+            "price_sequence_after", "price_sequence_before",
+            "message_sequence_after", "message_sequence_before",
+        ]
+        query_params = request.query_params
+        if not any(query_params.get(name) for name in timestamp_filters) or \
+            any(query_params.get(name) for name in sequence_filters):
+            return super().list(request, *args, **kwargs)
+
+        # price messages past the retention window are removed & only kept as hourly buckets,
+        # timestamp ranges list the messages then the pruned buckets as messages
+        queryset = self.filter_queryset(self.get_queryset())
+        ohlc_queryset = PriceOracleMessageOHLCFilter(
+            query_params,
+            queryset=PriceOracleMessageOHLC.objects.filter(
+                bucket_seconds=PriceOracleMessageOHLC.BUCKET_SECONDS_HOUR,
+                pruned=True,
+            ),
+        ).qs
+
+        paginator = self.paginator
+        paginator.request = request
+        paginator.limit = paginator.get_limit(request)
+        paginator.offset = paginator.get_offset(request)
+
+        messages_count = queryset.count()
+        paginator.count = messages_count + ohlc_queryset.count()
+
+        offset, limit = paginator.offset, paginator.limit
+        results = list(self.get_serializer(queryset[offset:offset + limit], many=True).data)
+        if len(results) < limit:
+            ohlc_offset = max(0, offset - messages_count)
+            ohlc_limit = limit - len(results)
+            ohlc_page = ohlc_queryset[ohlc_offset:ohlc_offset + ohlc_limit]
+            results += PriceOracleMessageOHLCSerializer(ohlc_page, many=True).data
+
+        return paginator.get_paginated_response(results)
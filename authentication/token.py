@@ -3,14 +3,36 @@ from rest_framework.exceptions import AuthenticationFailed
 # from main.models import Wallet
 from rampp2p.models import Peer as PeerWallet
 from rampp2p.models import Arbiter as ArbiterWallet
+from rampp2p.utils.cache import TTLCache
 from .models import AuthToken
 
 from cryptography.fernet import Fernet, InvalidToken
 from django.conf import settings
+import hashlib
+import hmac
 
 import logging
 logger = logging.getLogger(__name__)
 
+# digests of decrypted tokens keyed by the digest of the stored encrypted key,
+# a new key is issued on login so stale entries are never matched
+decrypted_tokens = TTLCache(maxsize=8192, ttl=60 * 10)
+
+def _digest(value):
+    return hashlib.sha256(value.encode()).hexdigest()
+
+def get_token_digest(encrypted_key):
+    '''
+    Returns the digest of the decrypted token, decrypting only on cache misses
+    '''
+    key_digest = _digest(encrypted_key)
+    token_digest = decrypted_tokens.get(key_digest)
+    if token_digest is None:
+        cipher_suite = Fernet(settings.FERNET_KEY)
+        token_digest = _digest(cipher_suite.decrypt(encrypted_key.encode()).decode())
+        decrypted_tokens.set(key_digest, token_digest)
+    return token_digest
+
 class TokenAuthentication(BaseAuthentication):
     '''
     P2P Ramp-specific token-based authentication
@@ -26,16 +48,14 @@ class TokenAuthentication(BaseAuthentication):
             raise AuthenticationFailed('No auth credentials provided')
 
         try:
-            peer_wallet = PeerWallet.objects.filter(wallet_hash=wallet_hash)
-            arbiter_wallet = ArbiterWallet.objects.filter(wallet_hash=wallet_hash)
+            peer_wallet = PeerWallet.objects.filter(wallet_hash=wallet_hash).first()
+            arbiter_wallet = ArbiterWallet.objects.filter(wallet_hash=wallet_hash).first()
 
             wallet=None
-            if peer_wallet.exists():
-                peer_wallet = peer_wallet.first()
+            if peer_wallet is not None:
                 if not peer_wallet.is_disabled:
                     wallet = peer_wallet
-            if arbiter_wallet.exists():
-                arbiter_wallet = arbiter_wallet.first()
+            if arbiter_wallet is not None:
                 if not arbiter_wallet.is_disabled:
                     wallet = arbiter_wallet
             if wallet is None:
@@ -43,10 +63,9 @@ class TokenAuthentication(BaseAuthentication):
             
             auth_token = AuthToken.objects.get(wallet_hash=wallet_hash)
 
-            cipher_suite = Fernet(settings.FERNET_KEY)
-            token = cipher_suite.decrypt(auth_token.key).decode()
+            token_digest = get_token_digest(auth_token.key)
 
-            if token != auth_header[1]:
+            if not hmac.compare_digest(token_digest, _digest(auth_header[1])):
                 raise InvalidToken
             
             if auth_token.is_key_expired():
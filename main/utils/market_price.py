@@ -50,18 +50,32 @@ def fetch_currency_value_for_timestamp(timestamp, currency="USD", relative_curre
 
         oracles = Oracle.objects.filter(asset_currency=currency, active=True)
         oracles_decimals_map = { oracle.pubkey: oracle.asset_decimals for oracle in oracles }
-        closest = PriceOracleMessage.objects.filter(
-            pubkey__in=oracles_decimals_map.keys(),
-            message_timestamp__gt = timestamp_range_low,
-            message_timestamp__lt = timestamp_range_high,
-        ).annotate(
-            diff=models.Func(models.F("message_timestamp"), timestamp, function="GREATEST") - models.Func(models.F("message_timestamp"), timestamp, function="LEAST")
-        ).order_by("diff").first()
+
+        # recent price messages are served from the anyhedge price cache
+        from anyhedge.utils.price_cache import get_closest_price_oracle_message
+        closest = get_closest_price_oracle_message(oracles_decimals_map.keys(), timestamp, margin=30)
+        if not closest:
+            closest = PriceOracleMessage.objects.filter(
+                pubkey__in=oracles_decimals_map.keys(),
+                message_timestamp__gt = timestamp_range_low,
+                message_timestamp__lt = timestamp_range_high,
+            ).annotate(
+                diff=models.Func(models.F("message_timestamp"), timestamp, function="GREATEST") - models.Func(models.F("message_timestamp"), timestamp, function="LEAST")
+            ).order_by("diff").first()
 
         if closest:
             asset_decimals = oracles_decimals_map[closest.pubkey]
             price_value = Decimal(closest.price_value) / 10 ** asset_decimals
             return (price_value, closest.message_timestamp, f"anyhedge:{closest.pubkey}")
+
+        # price messages past the retention window are only kept as hourly OHLC buckets
+        from anyhedge.utils.price_history import get_price_oracle_message_ohlc
+        ohlc = get_price_oracle_message_ohlc(oracles_decimals_map.keys(), timestamp)
+        if ohlc:
+            asset_decimals = oracles_decimals_map[ohlc.pubkey]
+            ohlc_price_value, ohlc_timestamp = ohlc.get_closest_price(timestamp)
+            price_value = Decimal(ohlc_price_value) / 10 ** asset_decimals
+            return (price_value, ohlc_timestamp, f"anyhedge-ohlc:{ohlc.pubkey}")
     except LookupError:
         pass
 
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import grpc
 import logging
+import concurrent.futures
 from main.utils.bchd import bchrpc_pb2 as pb
 from main.utils.bchd import bchrpc_pb2_grpc as bchrpc
 from grpc._channel import _InactiveRpcError
@@ -214,6 +215,43 @@ class BCHDQuery(object):
         if txn:
             return self._parse_transaction(txn, parse_slp=parse_slp)
 
+    def get_transactions(self, transaction_hashes, parse_slp=False, max_workers=10):
+        """
+            Fetch multiple transactions concurrently over a single channel
+            Returns a dict of transaction hash to parsed transaction, transactions not found are omitted
+        """
+        transactions = {}
+        if not transaction_hashes:
+            return transactions
+
+        cert = ssl.get_server_certificate(self.base_url.split(':'))
+        creds = grpc.ssl_channel_credentials(root_certificates=str.encode(cert))
+
+        with grpc.secure_channel(self.base_url, creds, options=(('grpc.enable_http_proxy', 0),)) as channel:
+            stub = bchrpc.bchrpcStub(channel)
+
+            def _get_transaction(transaction_hash):
+                req = pb.GetTransactionRequest()
+                req.hash = bytes.fromhex(transaction_hash)[::-1]
+                req.include_token_metadata = True
+                return stub.GetTransaction(req)
+
+            # grpc channels are thread safe, requests are multiplexed instead of waiting on each other
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                threads = {
+                    transaction_hash: executor.submit(_get_transaction, transaction_hash)
+                    for transaction_hash in set(transaction_hashes)
+                }
+
+                for transaction_hash, thread in threads.items():
+                    try:
+                        resp = thread.result()
+                        transactions[transaction_hash] = self._parse_transaction(resp.transaction, parse_slp=parse_slp)
+                    except _InactiveRpcError as exc:
+                        LOGGER.error(str(exc))
+
+        return transactions
+
     def get_utxos(self, address):
         cert = ssl.get_server_certificate(self.base_url.split(':'))
         creds = grpc.ssl_channel_credentials(root_certificates=str.encode(cert))
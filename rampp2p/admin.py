@@ -13,6 +13,7 @@ admin.site.register(Status)
 admin.site.register(PaymentType)
 admin.site.register(PaymentMethod)
 admin.site.register(Peer)
+admin.site.register(PeerStats)
 admin.site.register(MarketRate)
 admin.site.register(Arbiter)
 admin.site.register(Contract)
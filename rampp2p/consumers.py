@@ -49,3 +49,8 @@ class OrderUpdatesConsumer(AsyncWebsocketConsumer):
     async def send_message(self, event):
         data = event['data']
         await self.send(text_data=json.dumps(data))
+
+    async def send_messages(self, event):
+        # batched order updates, sent to the client one message at a time as before
+        for data in event['data']:
+            await self.send(text_data=json.dumps(data))
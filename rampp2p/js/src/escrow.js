@@ -4,10 +4,6 @@ const path = require('path');
 const BCHJS = require('@psf/bch-js');
 const CryptoJS = require('crypto-js');
 
-const ARBITER_PUBKEY = process.argv[2]
-const BUYER_PUBKEY = process.argv[3]
-const SELLER_PUBKEY = process.argv[4]
-const TIMESTAMP = process.argv[5]
 const SERVICER_PUBKEY = process.env.SERVICER_PK
 const SERVICE_FEE = parseInt(process.env.SERVICE_FEE)
 const ARBITRATION_FEE = parseInt(process.env.ARBITRATION_FEE)
@@ -19,30 +15,41 @@ const bchjs = new BCHJS({
 
 const NETWORK = process.env.BCH_NETWORK;
 
-(async () => {
+// compiled once per process, long-lived workers reuse it for every contract
+let artifact = null
+let provider = null
+
+if (require.main === module) {
+    const [arbiterPubkey, buyerPubkey, sellerPubkey, timestamp] = process.argv.slice(2, 6);
+    (async () => {
+        const result = await createContract({ arbiterPubkey, buyerPubkey, sellerPubkey, timestamp })
+        console.log(JSON.stringify(result))
+    })();
+}
+
+async function createContract({ arbiterPubkey, buyerPubkey, sellerPubkey, timestamp }) {
 
     // Compile the escrow contract to an artifact object
-    const artifact = compileFile(path.join(__dirname, 'escrow.cash'));
+    if (!artifact) artifact = compileFile(path.join(__dirname, 'escrow.cash'));
     // Initialise a network provider for network operations
-    const provider = new ElectrumNetworkProvider(NETWORK);
-    const [arbiterPkh, buyerPkh, sellerPkh, servicerPkh] = getPubKeyHash();
+    if (!provider) provider = new ElectrumNetworkProvider(NETWORK);
+    const [arbiterPkh, buyerPkh, sellerPkh, servicerPkh] = getPubKeyHash(arbiterPubkey, buyerPubkey, sellerPubkey);
     
     // Generate contract hash with timestamp
-    const contractHash = await calculateSHA256(arbiterPkh, buyerPkh, sellerPkh, servicerPkh, TIMESTAMP)
+    const contractHash = await calculateSHA256(arbiterPkh, buyerPkh, sellerPkh, servicerPkh, timestamp)
 
     // Instantiate a new contract providing the constructor parameters
     const contractParams = [arbiterPkh, buyerPkh, sellerPkh, servicerPkh, SERVICE_FEE, ARBITRATION_FEE, contractHash];
     const contract = new Contract(artifact, contractParams, provider);
 
-    data = `{"success": "true", "contract_address" : "${contract.address}"}`
-    console.log(data)
-})();
+    return { "success": "true", "contract_address": contract.address }
+}
 
-function getPubKeyHash() {  
+function getPubKeyHash(arbiterPubkey, buyerPubkey, sellerPubkey) {  
     // produce the public key hashes
-    const arbiterPkh = bchjs.Crypto.hash160(Buffer.from(ARBITER_PUBKEY, "hex"));
-    const buyerPkh = bchjs.Crypto.hash160(Buffer.from(BUYER_PUBKEY, "hex"));
-    const sellerPkh = bchjs.Crypto.hash160(Buffer.from(SELLER_PUBKEY, "hex"));
+    const arbiterPkh = bchjs.Crypto.hash160(Buffer.from(arbiterPubkey, "hex"));
+    const buyerPkh = bchjs.Crypto.hash160(Buffer.from(buyerPubkey, "hex"));
+    const sellerPkh = bchjs.Crypto.hash160(Buffer.from(sellerPubkey, "hex"));
     const servicerPkh = bchjs.Crypto.hash160(Buffer.from(SERVICER_PUBKEY, "hex"));
     return [arbiterPkh, buyerPkh, sellerPkh, servicerPkh];
 }
@@ -52,4 +59,6 @@ async function calculateSHA256(arbiterPkh, buyerPkh, sellerPkh, servicerPkh, tim
     const hash = CryptoJS.SHA256(message);
     const contractHash = hash.toString()
     return contractHash
-}
\ No newline at end of file
+}
+
+module.exports = { createContract }
@@ -0,0 +1,41 @@
+/**
+ * Long-lived escrow worker, started & restarted by rampp2p.utils.escrow_worker
+ *
+ * Protocol: one JSON object per line over stdin/stdout
+ *   request:  {"id": <int>, "method": <str>, "params": <object>}
+ *   response: {"id": <int>, "result": <object>} | {"id": <int>, "error": <str>}
+ * stdout is reserved for responses, logs go to stderr
+ */
+const readline = require('readline');
+const { createContract } = require('./escrow');
+
+const METHODS = {
+    'create_contract': createContract,
+}
+
+const rl = readline.createInterface({ input: process.stdin, terminal: false });
+
+rl.on('line', async (line) => {
+    if (!line.trim()) return
+
+    let request = null
+    try {
+        request = JSON.parse(line)
+    } catch (error) {
+        console.error(`Invalid request: ${line}`)
+        return
+    }
+
+    const response = { id: request.id }
+    try {
+        const method = METHODS[request.method]
+        if (!method) throw new Error(`Unknown method: ${request.method}`)
+        response.result = await method(request.params || {})
+    } catch (error) {
+        response.error = error.toString()
+    }
+    process.stdout.write(JSON.stringify(response) + '\n')
+});
+
+// exit with the parent instead of lingering as an orphan
+rl.on('close', () => process.exit(0));
@@ -0,0 +1,90 @@
+# Generated by Django 3.0.14 on 2026-10-19 12:10
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+import django.db.models.deletion
+
+
+STATUS_COUNT_FIELDS = {
+    'RLS': 'released_count',
+    'CNCL': 'canceled_count',
+    'RFN': 'refunded_count',
+}
+
+
+def populate_peer_stats(apps, schema_editor):
+    Peer = apps.get_model('rampp2p', 'Peer')
+    PeerStats = apps.get_model('rampp2p', 'PeerStats')
+    Order = apps.get_model('rampp2p', 'Order')
+    Status = apps.get_model('rampp2p', 'Status')
+    Feedback = apps.get_model('rampp2p', 'Feedback')
+
+    stats = {}
+    def get_stats(peer_id):
+        if peer_id not in stats:
+            stats[peer_id] = PeerStats(peer_id=peer_id)
+        return stats[peer_id]
+
+    ad_owner_orders = Order.objects.values('ad_snapshot__ad__owner_id').annotate(count=Count('id'))
+    for row in ad_owner_orders:
+        peer_stats = get_stats(row['ad_snapshot__ad__owner_id'])
+        peer_stats.ad_order_count = row['count']
+        peer_stats.order_count += row['count']
+
+    owner_orders = Order.objects.values('owner_id').annotate(count=Count('id'))
+    for row in owner_orders:
+        get_stats(row['owner_id']).order_count += row['count']
+
+    for status, field in STATUS_COUNT_FIELDS.items():
+        statuses = Status.objects.filter(status=status)
+        ad_owner_statuses = statuses.values('order__ad_snapshot__ad__owner_id').annotate(count=Count('order_id', distinct=True))
+        for row in ad_owner_statuses:
+            peer_stats = get_stats(row['order__ad_snapshot__ad__owner_id'])
+            setattr(peer_stats, f'ad_{field}', row['count'])
+            setattr(peer_stats, field, getattr(peer_stats, field) + row['count'])
+
+        owner_statuses = statuses.values('order__owner_id').annotate(count=Count('order_id', distinct=True))
+        for row in owner_statuses:
+            peer_stats = get_stats(row['order__owner_id'])
+            setattr(peer_stats, field, getattr(peer_stats, field) + row['count'])
+
+    ratings = Feedback.objects.values('to_peer_id').annotate(rating_sum=Sum('rating'), rating_count=Count('id'))
+    for row in ratings:
+        peer_stats = get_stats(row['to_peer_id'])
+        peer_stats.rating_sum = row['rating_sum'] or 0
+        peer_stats.rating_count = row['rating_count']
+
+    existing_peer_ids = set(Peer.objects.filter(id__in=stats.keys()).values_list('id', flat=True))
+    PeerStats.objects.bulk_create(
+        [peer_stats for peer_id, peer_stats in stats.items() if peer_id in existing_peer_ids],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rampp2p', '0096_auto_20240104_0959'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PeerStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ad_order_count', models.IntegerField(default=0)),
+                ('ad_released_count', models.IntegerField(default=0)),
+                ('ad_canceled_count', models.IntegerField(default=0)),
+                ('ad_refunded_count', models.IntegerField(default=0)),
+                ('order_count', models.IntegerField(default=0)),
+                ('released_count', models.IntegerField(default=0)),
+                ('canceled_count', models.IntegerField(default=0)),
+                ('refunded_count', models.IntegerField(default=0)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('rating_count', models.IntegerField(default=0)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+                ('peer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='rampp2p.Peer')),
+            ],
+        ),
+        migrations.RunPython(populate_peer_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 3.0.14 on 2026-10-19 12:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+POPULATE_SQL = """
+UPDATE rampp2p_order o
+SET ad_owner_id = a.owner_id
+FROM rampp2p_adsnapshot s
+JOIN rampp2p_ad a ON a.id = s.ad_id
+WHERE s.id = o.ad_snapshot_id;
+
+UPDATE rampp2p_order o
+SET current_status = latest.status, last_modified_at = latest.created_at
+FROM (
+    SELECT DISTINCT ON (order_id) order_id, status, created_at
+    FROM rampp2p_status
+    ORDER BY order_id, created_at DESC, id DESC
+) latest
+WHERE latest.order_id = o.id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rampp2p', '0097_peerstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='ad_owner',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='ad_orders', to='rampp2p.Peer'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='current_status',
+            field=models.CharField(blank=True, editable=False, max_length=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='last_modified_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunSQL(POPULATE_SQL, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['owner', 'current_status', 'last_modified_at'], name='order_owner_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['ad_owner', 'current_status', 'last_modified_at'], name='order_ad_owner_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['owner', 'created_at'], name='order_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['ad_owner', 'created_at'], name='order_ad_owner_created_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.0.14 on 2026-10-19 13:20
+
+from django.db import migrations, models
+
+
+POPULATE_SQL = """
+UPDATE rampp2p_ad
+SET effective_price = fixed_price
+WHERE price_type = 'FIXED';
+
+UPDATE rampp2p_ad a
+SET effective_price = m.price * (a.floating_price / 100)
+FROM rampp2p_fiatcurrency c
+JOIN rampp2p_marketrate m ON m.currency = c.symbol
+WHERE a.price_type = 'FLOATING' AND c.id = a.fiat_currency_id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rampp2p', '0098_order_current_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ad',
+            name='effective_price',
+            field=models.DecimalField(blank=True, decimal_places=8, editable=False, max_digits=18, null=True),
+        ),
+        migrations.RunSQL(POPULATE_SQL, reverse_sql=migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='ad',
+            index=models.Index(fields=['fiat_currency', 'trade_type', 'effective_price'], name='ad_currency_type_price_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.0.14 on 2026-10-19 14:10
+
+from django.db import migrations, models
+
+
+POPULATE_SQL = """
+UPDATE rampp2p_order
+SET is_expired = TRUE
+WHERE expires_at IS NOT NULL AND expires_at < now();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rampp2p', '0099_ad_effective_price'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='is_expired',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunSQL(POPULATE_SQL, reverse_sql=migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(is_expired=False), fields=['expires_at'], name='order_pending_expiry_idx'),
+        ),
+    ]
@@ -4,6 +4,7 @@ from datetime import timedelta
 from .peer import Peer
 from .currency import FiatCurrency, CryptoCurrency
 from .payment import PaymentMethod
+from .market_rate import MarketRate
 
 class DurationChoices(models.IntegerChoices):
     FIVE_MINUTES    =   5, '5 minutes'
@@ -37,13 +38,37 @@ class Ad(models.Model):
     payment_methods = models.ManyToManyField(PaymentMethod, related_name='ads')
     is_public = models.BooleanField(default=True)
 
+    # fixed price or floating price applied to the currency's market rate,
+    # recomputed when the ad is saved or the market rate changes
+    effective_price = models.DecimalField(max_digits=18, decimal_places=8, null=True, blank=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     modified_at = models.DateTimeField(auto_now=True)
     deleted_at = models.DateTimeField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['fiat_currency', 'trade_type', 'effective_price'], name='ad_currency_type_price_idx'),
+        ]
+
     def __str__(self):
         return str(self.id)
 
+    def save(self, *args, **kwargs):
+        self.effective_price = self.compute_effective_price()
+        super().save(*args, **kwargs)
+
+    def compute_effective_price(self):
+        if self.price_type == PriceType.FIXED:
+            return self.fixed_price
+
+        market_price = MarketRate.objects.filter(
+            currency=self.fiat_currency.symbol
+        ).values_list('price', flat=True).first()
+        if market_price is None:
+            return None
+        return market_price * (self.floating_price/100)
+
     # modified for soft deletion
     def delete(self):
         self.deleted_at = timezone.now()
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from .ad import Ad, AdSnapshot, DurationChoices
 from .peer import Peer
 from .arbiter import Arbiter
@@ -18,6 +19,14 @@ class Order(models.Model):
         editable=False, 
         related_name="created_orders"
     )
+    # owner of the ad at the time of the order, copied from ad_snapshot so order lists can filter on it directly
+    ad_owner = models.ForeignKey(
+        Peer,
+        on_delete=models.PROTECT,
+        editable=False,
+        null=True,
+        related_name="ad_orders"
+    )
     
     crypto_currency = models.ForeignKey(CryptoCurrency, on_delete=models.PROTECT, editable=False)
     fiat_currency = models.ForeignKey(FiatCurrency, on_delete=models.PROTECT, editable=False)
@@ -33,10 +42,33 @@ class Order(models.Model):
     payment_methods = models.ManyToManyField(PaymentMethod)
     created_at = models.DateTimeField(auto_now_add=True, editable=False)
     expires_at = models.DateTimeField(null=True)
+    # set once expires_at passes by the order deadline task, see rampp2p.tasks.order_tasks
+    is_expired = models.BooleanField(default=False, editable=False)
+
+    # status & created_at of the order's latest Status, updated by Status.save()
+    current_status = models.CharField(max_length=10, null=True, blank=True, editable=False)
+    last_modified_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'current_status', 'last_modified_at'], name='order_owner_status_idx'),
+            models.Index(fields=['ad_owner', 'current_status', 'last_modified_at'], name='order_ad_owner_status_idx'),
+            models.Index(fields=['owner', 'created_at'], name='order_owner_created_idx'),
+            models.Index(fields=['ad_owner', 'created_at'], name='order_ad_owner_created_idx'),
+            models.Index(fields=['expires_at'], name='order_pending_expiry_idx', condition=models.Q(is_expired=False)),
+        ]
 
     def __str__(self):
         return str(self.id)
 
+    def save(self, *args, **kwargs):
+        if self.ad_owner_id is None and self.ad_snapshot_id is not None:
+            self.ad_owner_id = self.ad_snapshot.ad.owner_id
+        # an extended deadline makes the order unexpired again
+        if self.is_expired and (self.expires_at is None or self.expires_at > timezone.now()):
+            self.is_expired = False
+        super().save(*args, **kwargs)
+
     @property
     def time_duration(self):
         # convert the duration choice to a timedelta object
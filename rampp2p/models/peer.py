@@ -1,6 +1,5 @@
 from django.db import models
 from .currency import FiatCurrency
-from django.apps import apps
 
 import logging
 logger = logging.getLogger(__name__)
@@ -29,6 +28,65 @@ class Peer(models.Model):
         return self.name
 
     def average_rating(self):
-        Feedback = apps.get_model('rampp2p', 'Feedback')
-        avg_rating = Feedback.objects.filter(to_peer=self).aggregate(models.Avg('rating'))['rating__avg']
-        return avg_rating
\ No newline at end of file
+        return self.get_stats().average_rating
+
+    def get_stats(self):
+        '''
+        Returns the peer's stats, or an unsaved empty one if the peer has no orders or feedbacks yet.
+        '''
+        try:
+            return self.stats
+        except PeerStats.DoesNotExist:
+            return PeerStats(peer=self)
+
+class PeerStats(models.Model):
+    '''
+    Reputation counters of a peer, updated as orders, statuses and feedbacks are created
+    (see rampp2p/signals.py) so listings read them with a join instead of aggregating per peer.
+    '''
+    peer = models.OneToOneField(Peer, on_delete=models.CASCADE, related_name='stats')
+
+    # orders placed on the peer's ads
+    ad_order_count = models.IntegerField(default=0)
+    ad_released_count = models.IntegerField(default=0)
+    ad_canceled_count = models.IntegerField(default=0)
+    ad_refunded_count = models.IntegerField(default=0)
+
+    # orders the peer is part of, either as the ad owner or the order creator
+    order_count = models.IntegerField(default=0)
+    released_count = models.IntegerField(default=0)
+    canceled_count = models.IntegerField(default=0)
+    refunded_count = models.IntegerField(default=0)
+
+    rating_sum = models.IntegerField(default=0)
+    rating_count = models.IntegerField(default=0)
+
+    modified_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return str(self.peer_id)
+
+    @property
+    def average_rating(self):
+        if self.rating_count == 0:
+            return None
+        return self.rating_sum / self.rating_count
+
+    @staticmethod
+    def _completion_rate(released_count, canceled_count, refunded_count):
+        '''
+        completion_rate = released_count / (released_count + canceled_count + refunded_count)
+        '''
+        completion_rate = 0
+        denum = released_count + canceled_count + refunded_count
+        if denum > 0:
+            completion_rate = released_count / denum * 100
+        return completion_rate
+
+    @property
+    def ad_completion_rate(self):
+        return self._completion_rate(self.ad_released_count, self.ad_canceled_count, self.ad_refunded_count)
+
+    @property
+    def completion_rate(self):
+        return self._completion_rate(self.released_count, self.canceled_count, self.refunded_count)
\ No newline at end of file
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 from .order import Order
 
@@ -24,4 +25,15 @@ class Status(models.Model):
   created_at = models.DateTimeField(auto_now_add=True, editable=False)
 
   def __str__(self):
-    return str(self.id)
\ No newline at end of file
+    return str(self.id)
+
+  def save(self, *args, **kwargs):
+    with transaction.atomic():
+      created = self._state.adding
+      super().save(*args, **kwargs)
+      if created:
+        # keep the order's current status pointer, a status older than the current one is not applied
+        Order.objects.filter(
+          Q(last_modified_at__isnull=True) | Q(last_modified_at__lte=self.created_at),
+          pk=self.order_id
+        ).update(current_status=self.status, last_modified_at=self.created_at)
\ No newline at end of file
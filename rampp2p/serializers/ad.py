@@ -1,6 +1,5 @@
 from rest_framework import serializers
 from rampp2p.utils.utils import get_trading_fees
-from django.db.models import Q, Subquery, OuterRef, F
 from rampp2p.models import (
     Ad, 
     AdSnapshot,
@@ -9,9 +8,6 @@ from rampp2p.models import (
     Peer,
     FiatCurrency, 
     CryptoCurrency,
-    Order, 
-    Status, 
-    StatusType,
     PaymentMethod,
     MarketRate
 )
@@ -86,7 +82,7 @@ class AdListSerializer(serializers.ModelSerializer):
     def get_owner(self, instance: Ad):
         return {
             'name': instance.owner.name,
-            'rating':  instance.owner.average_rating()
+            'rating':  instance.owner.get_stats().average_rating
         }
     
     def get_is_owned(self, instance: Ad):
@@ -103,51 +99,33 @@ class AdListSerializer(serializers.ModelSerializer):
         if instance.price_type == PriceType.FIXED:
             return instance.fixed_price
         
+        # stored on the ad, recomputed when the market rate changes
+        if instance.effective_price is not None:
+            return instance.effective_price
+
         currency = instance.fiat_currency.symbol
-        market_price = MarketRate.objects.filter(currency=currency)
-        if market_price.exists():
-            market_price = market_price.first().price
+        market_price = self.get_market_price(currency)
+        if market_price is not None:
             price = market_price * (instance.floating_price/100)
         else:
             price = None
         return price
+
+    def get_market_price(self, currency):
+        # cached per serializer so a page of ads looks up each currency's rate once
+        if not hasattr(self, '_market_prices'):
+            self._market_prices = {}
+        if currency not in self._market_prices:
+            market_rate = MarketRate.objects.filter(currency=currency).first()
+            self._market_prices[currency] = market_rate.price if market_rate else None
+        return self._market_prices[currency]
     
     def get_trade_count(self, instance: Ad):
         # Count the number of trades (orders) related to ad owner
-        query = Q(ad_snapshot__ad__owner__id=instance.owner.id)
-        trade_count = Order.objects.filter(query).count()
-        return trade_count
+        return instance.owner.get_stats().ad_order_count
 
     def get_completion_rate(self, instance: Ad):
-        ''' 
-        completion_rate = released_count / (released_count + canceled_count + refunded_count)
-        '''
-        
-        owner_id = instance.owner.id
-        released_count = self.get_orders_status_count(owner_id, StatusType.RELEASED)
-        canceled_count = self.get_orders_status_count(owner_id, StatusType.CANCELED)
-        refunded_count = self.get_orders_status_count(owner_id, StatusType.REFUNDED)
-        
-        completion_rate = 0
-        denum = released_count + canceled_count + refunded_count        
-        if denum > 0:
-            completion_rate = released_count / denum * 100
-        
-        return completion_rate
-    
-    def get_orders_status_count(self, owner_id: int, status: StatusType):
-        # Subquery to get the latest status for each order
-        query = Q(order_id=OuterRef('id')) & Q(status=status)
-        latest_status_subquery = Status.objects.filter(query).order_by('-created_at').values('id')[:1]
-        
-        # Retrieve the latest statuses for each order
-        user_orders = Order.objects.filter(Q(ad_snapshot__ad__owner__id=owner_id)).annotate(
-            latest_status_id = Subquery(latest_status_subquery)
-        )
-
-        # Filter only the orders with their latest status
-        filtered_orders_count = user_orders.filter(status__id=F('latest_status_id')).count()
-        return filtered_orders_count
+        return instance.owner.get_stats().ad_completion_rate
 
 class AdDetailSerializer(AdListSerializer):
     time_duration = serializers.SerializerMethodField()
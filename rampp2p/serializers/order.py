@@ -128,6 +128,11 @@ class OrderSerializer(serializers.ModelSerializer):
         return order_trade_type
     
     def get_status(self, instance: Order):
+        if instance.current_status is not None:
+            return {
+                'label': StatusType(instance.current_status).label,
+                'value': instance.current_status
+            }
         latest_status = self.get_latest_order_status(instance)
         if latest_status is not None:
             latest_status = {
@@ -137,6 +142,8 @@ class OrderSerializer(serializers.ModelSerializer):
         return latest_status
     
     def get_last_modified_at(self, instance: Order):
+        if instance.last_modified_at is not None:
+            return instance.last_modified_at
         last_modified_at = None
         latest_status = Status.objects.values('created_at').filter(order__id=instance.id).order_by('-created_at').first()
         if latest_status is not None:
@@ -0,0 +1,37 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from rampp2p.models import Order, Status, Feedback, Contract, Transaction
+from rampp2p.utils.pending_contracts import sync_pending_contract_address
+from rampp2p.utils.peer_stats import (
+    record_order_created,
+    record_order_status,
+    refresh_peer_rating
+)
+
+@receiver(post_save, sender=Order)
+def order_post_save(sender, instance=None, created=False, **kwargs):
+    if created:
+        record_order_created(instance.id)
+
+@receiver(post_save, sender=Status)
+def status_post_save(sender, instance=None, created=False, **kwargs):
+    if created:
+        record_order_status(instance.order_id, instance.status, instance.created_at)
+
+@receiver(post_save, sender=Feedback)
+@receiver(post_delete, sender=Feedback)
+def feedback_changed(sender, instance=None, **kwargs):
+    refresh_peer_rating(instance.to_peer_id)
+
+@receiver(post_save, sender=Contract)
+def contract_post_save(sender, instance=None, **kwargs):
+    address = instance.address
+    transaction.on_commit(lambda: sync_pending_contract_address(address))
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+def transaction_changed(sender, instance=None, **kwargs):
+    address = Contract.objects.filter(id=instance.contract_id).values_list('address', flat=True).first()
+    transaction.on_commit(lambda: sync_pending_contract_address(address))
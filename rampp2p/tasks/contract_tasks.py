@@ -1,36 +1,25 @@
 from celery import shared_task
 from typing import Dict
 from rampp2p.utils.websocket import send_order_update
+from rampp2p.utils.escrow_worker import get_escrow_worker, EscrowWorkerError
 from rampp2p.models import Contract
-import subprocess
-import json
-import re
 
 import logging
 logger = logging.getLogger(__name__)
 
 @shared_task(queue='rampp2p__contract_execution')
-def execute_subprocess(command, **kwargs):
-    # execute subprocess
-    logger.warning(f'executing: {command}')
-    process = subprocess.Popen(command.split(), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    stdout, stderr = process.communicate() 
-
-    stderr = stderr.decode("utf-8")
-    stdout = stdout.decode('utf-8')
-
-    if stdout is not None:
-        # Define the pattern for matching control characters
-        control_char_pattern = re.compile('[\x00-\x1f\x7f-\x9f]')
-        
-        # Remove all control characters from the JSON string
-        clean_stdout = control_char_pattern.sub('', stdout)
-
-        stdout = json.loads(clean_stdout)
-    
-    response = {'result': stdout, 'error': stderr}
-
-    return response
+def generate_contract(order_id: int, params: Dict):
+    '''
+    Generates the contract address with the escrow worker
+    '''
+    try:
+        result = get_escrow_worker().call('create_contract', params)
+        response = {'result': result, 'error': ''}
+    except EscrowWorkerError as err:
+        logger.error(f'Failed to generate contract of order {order_id}: {err}')
+        response = {'result': {'success': False}, 'error': str(err)}
+
+    return contract_handler(response, order_id=order_id)
 
 @shared_task(queue='rampp2p__contract_execution')
 def contract_handler(response: Dict, **kwargs):
@@ -48,4 +37,4 @@ def contract_handler(response: Dict, **kwargs):
         contract.address = address
         contract.save()
     
-    return send_order_update(data, contract.order.id)
\ No newline at end of file
+    return send_order_update(data, order_id)
@@ -0,0 +1,15 @@
+from celery import shared_task
+
+from rampp2p.utils.websocket import flush_messages
+from rampp2p.utils.notifications import flush_push_notifications as _flush_push_notifications
+
+import logging
+logger = logging.getLogger(__name__)
+
+@shared_task(queue='rampp2p__notifications')
+def flush_websocket_messages(room_name):
+    return len(flush_messages(room_name))
+
+@shared_task(queue='rampp2p__notifications')
+def flush_push_notifications():
+    return _flush_push_notifications()
@@ -0,0 +1,36 @@
+from celery import shared_task
+from django.utils import timezone
+
+from rampp2p.models import Order
+
+import logging
+logger = logging.getLogger(__name__)
+
+EXPIRE_BATCH_SIZE = 1000
+
+@shared_task(queue='rampp2p__order_deadlines')
+def expire_orders():
+    '''
+    Marks the orders past their expires_at as expired in bulk, runs every minute.
+    Not scheduled per order with an eta: deadlines are up to a day away, past the redis
+    broker's visibility timeout, so the tasks would be redelivered & held in worker memory
+    '''
+    now = timezone.now()
+    expired_count = 0
+    while True:
+        order_ids = list(
+            Order.objects.filter(
+                is_expired=False,
+                expires_at__isnull=False,
+                expires_at__lte=now
+            ).values_list('id', flat=True)[:EXPIRE_BATCH_SIZE]
+        )
+        if not order_ids:
+            break
+
+        # is_expired=False keeps concurrent runs from transitioning an order twice
+        expired_count += Order.objects.filter(id__in=order_ids, is_expired=False).update(is_expired=True)
+
+    if expired_count:
+        logger.info(f'Expired {expired_count} order/s')
+    return expired_count
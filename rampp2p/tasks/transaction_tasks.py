@@ -8,6 +8,7 @@ from django.core.exceptions import ValidationError
 from rampp2p.utils.handler import update_order_status
 from rampp2p.utils.notifications import send_push_notification
 from rampp2p.utils.utils import get_order_peer_addresses, get_trading_fees
+from rampp2p.utils.pending_contracts import rebuild_pending_contract_addresses
 import rampp2p.utils.websocket as websocket
 
 from rampp2p.serializers import RecipientSerializer
@@ -339,4 +340,11 @@ def remove_subscription(address, subscriber_id):
     if subscription.exists():
         subscription.delete()
         return True
-    return False
\ No newline at end of file
+    return False
+
+@shared_task(queue='rampp2p__contract_execution')
+def refresh_pending_contract_addresses():
+    '''
+    Rebuilds the set of pending contract addresses checked on transaction ingest
+    '''
+    return len(rebuild_pending_contract_addresses())
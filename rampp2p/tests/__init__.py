@@ -0,0 +1,5 @@
+from .cache import *
+from .market_rate import *
+from .notifications import *
+from .pagination import *
+from .peer_stats import *
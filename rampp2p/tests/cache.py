@@ -0,0 +1,74 @@
+from unittest import mock
+from django.test import SimpleTestCase, tag
+
+from rampp2p.utils.cache import TTLCache
+
+
+class TTLCacheTestCase(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch("rampp2p.utils.cache.time")
+        self.time = patcher.start()
+        self.time.monotonic.return_value = 0
+        self.addCleanup(patcher.stop)
+
+    @tag("unit")
+    def test_get_set(self):
+        cache = TTLCache(maxsize=10, ttl=10)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("a", "default"), "default")
+
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+
+        cache.set("a", 2)
+        self.assertEqual(cache.get("a"), 2)
+
+    @tag("unit")
+    def test_expiry(self):
+        cache = TTLCache(maxsize=10, ttl=10)
+        cache.set("a", 1)
+
+        self.time.monotonic.return_value = 9.9
+        self.assertEqual(cache.get("a"), 1)
+
+        self.time.monotonic.return_value = 10
+        self.assertIsNone(cache.get("a"))
+        self.assertNotIn("a", cache._data)
+
+    @tag("unit")
+    def test_set_resets_expiry(self):
+        cache = TTLCache(maxsize=10, ttl=10)
+        cache.set("a", 1)
+
+        self.time.monotonic.return_value = 5
+        cache.set("a", 2)
+
+        self.time.monotonic.return_value = 12
+        self.assertEqual(cache.get("a"), 2)
+
+    @tag("unit")
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2, ttl=10)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        # reading "a" makes "b" the least recently used
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    @tag("unit")
+    def test_delete_clear(self):
+        cache = TTLCache(maxsize=10, ttl=10)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        cache.delete("a")
+        cache.delete("missing")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), 2)
+
+        cache.clear()
+        self.assertIsNone(cache.get("b"))
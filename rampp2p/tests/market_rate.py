@@ -0,0 +1,42 @@
+from decimal import Decimal
+from django.test import SimpleTestCase, tag
+
+from rampp2p.utils.market_rate import aggregate_rate
+
+
+class AggregateRateTestCase(SimpleTestCase):
+    @tag("unit")
+    def test_no_values(self):
+        self.assertIsNone(aggregate_rate([]))
+        self.assertIsNone(aggregate_rate(None))
+        self.assertIsNone(aggregate_rate([], previous_rate=Decimal("100")))
+
+    @tag("unit")
+    def test_median(self):
+        values = [Decimal("100"), Decimal("300"), Decimal("102")]
+        self.assertEqual(aggregate_rate(values), Decimal("102.00"))
+
+        values = [Decimal("100"), Decimal("101")]
+        self.assertEqual(aggregate_rate(values), Decimal("100.50"))
+
+    @tag("unit")
+    def test_quantized(self):
+        self.assertEqual(aggregate_rate([Decimal("123.456")]), Decimal("123.46"))
+        self.assertIsNone(aggregate_rate([Decimal("0.001")]))
+
+    @tag("unit")
+    def test_max_rate_change(self):
+        previous_rate = Decimal("100")
+        self.assertEqual(aggregate_rate([Decimal("150")], previous_rate=previous_rate), Decimal("150.00"))
+        self.assertEqual(aggregate_rate([Decimal("50")], previous_rate=previous_rate), Decimal("50.00"))
+        self.assertIsNone(aggregate_rate([Decimal("151")], previous_rate=previous_rate))
+        self.assertIsNone(aggregate_rate([Decimal("49")], previous_rate=previous_rate))
+
+        # without a recent rate there is nothing to compare against
+        self.assertEqual(aggregate_rate([Decimal("1000")]), Decimal("1000.00"))
+
+    @tag("unit")
+    def test_outlier_source(self):
+        # a single bad source doesn't move the median
+        values = [Decimal("100"), Decimal("101"), Decimal("10000")]
+        self.assertEqual(aggregate_rate(values, previous_rate=Decimal("100")), Decimal("101.00"))
@@ -0,0 +1,131 @@
+import json
+from unittest import mock
+from django.test import SimpleTestCase, tag
+
+from rampp2p.utils import notifications, websocket
+
+
+class FlushMessagesTestCase(SimpleTestCase):
+    def setUp(self):
+        self.room_name = 'ramp-p2p-subscribe-order-1'
+        self.messages_key = f'{websocket._REDIS_KEY_PREFIX}:{self.room_name}'
+
+        for name, patcher in [
+            ('redis_client', mock.patch.object(websocket, 'REDIS_CLIENT')),
+            ('get_channel_layer', mock.patch.object(websocket, 'get_channel_layer')),
+            ('schedule_flush', mock.patch.object(websocket, 'schedule_flush')),
+        ]:
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+
+        self.lock = self.redis_client.lock.return_value
+        self.lock.acquire.return_value = True
+        self.pipeline = self.redis_client.pipeline.return_value
+        self.redis_client.lrange.return_value = [json.dumps({ 'status': status }).encode() for status in ['SBM', 'CNF']]
+        self.group_send = self.get_channel_layer.return_value.group_send = mock.AsyncMock()
+
+    @tag('unit')
+    def test_flush(self):
+        messages = websocket.flush_messages(self.room_name)
+        self.assertEqual(messages, [{ 'status': 'SBM' }, { 'status': 'CNF' }])
+        self.group_send.assert_awaited_once_with(self.room_name, { 'type': 'send_messages', 'data': messages })
+
+        # only the messages sent are removed from the queue
+        self.pipeline.ltrim.assert_called_once_with(self.messages_key, 2, -1)
+        self.lock.release.assert_called_once()
+
+    @tag('unit')
+    def test_failed_send_keeps_messages(self):
+        self.group_send.side_effect = Exception('channel layer error')
+        self.redis_client.incr.return_value = 1
+
+        self.assertEqual(websocket.flush_messages(self.room_name), [])
+        self.pipeline.ltrim.assert_not_called()
+        self.schedule_flush.assert_called_once_with(self.room_name)
+        self.lock.release.assert_called_once()
+
+    @tag('unit')
+    def test_failed_send_drops_messages_after_max_attempts(self):
+        self.group_send.side_effect = Exception('channel layer error')
+        self.redis_client.incr.return_value = websocket.MAX_FLUSH_ATTEMPTS
+
+        self.assertEqual(websocket.flush_messages(self.room_name), [])
+        self.pipeline.ltrim.assert_called_once_with(self.messages_key, 2, -1)
+        self.schedule_flush.assert_not_called()
+
+    @tag('unit')
+    def test_locked_room_is_flushed_later(self):
+        self.lock.acquire.return_value = False
+
+        self.assertEqual(websocket.flush_messages(self.room_name), [])
+        self.redis_client.lrange.assert_not_called()
+        self.group_send.assert_not_awaited()
+        self.schedule_flush.assert_called_once_with(self.room_name)
+
+
+class FlushPushNotificationsTestCase(SimpleTestCase):
+    def setUp(self):
+        for name, patcher in [
+            ('redis_client', mock.patch.object(notifications, 'REDIS_CLIENT')),
+            ('send', mock.patch.object(notifications, 'send_push_notification_to_wallet_hashes')),
+            ('schedule_flush', mock.patch.object(notifications, 'schedule_flush')),
+        ]:
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+
+        self.lock = self.redis_client.lock.return_value
+        self.lock.acquire.return_value = True
+        self.pipeline = self.redis_client.pipeline.return_value
+        self.redis_client.lrange.return_value = [
+            json.dumps({ 'recipients': recipients, 'message': message, 'extra': { 'order_id': 1 } }).encode()
+            for recipients, message in [(['a', 'b'], 'Order confirmed'), (['a'], 'Order paid')]
+        ]
+
+    @tag('unit')
+    def test_flush(self):
+        self.assertEqual(notifications.flush_push_notifications(), 2)
+        self.send.assert_any_call(['a', 'b'], 'Order confirmed', title=notifications.NOTIFICATION_TITLE, extra={ 'order_id': 1 })
+        self.send.assert_any_call(['a'], 'Order paid', title=notifications.NOTIFICATION_TITLE, extra={ 'order_id': 1 })
+
+        self.pipeline.ltrim.assert_called_once_with(notifications._QUEUE_KEY, 2, -1)
+        self.pipeline.lpush.assert_not_called()
+        self.schedule_flush.assert_not_called()
+        self.lock.release.assert_called_once()
+
+    @tag('unit')
+    def test_failed_send_is_queued_again(self):
+        self.send.side_effect = [Exception('push service error'), None]
+
+        self.assertEqual(notifications.flush_push_notifications(), 1)
+        self.pipeline.ltrim.assert_called_once_with(notifications._QUEUE_KEY, 2, -1)
+
+        requeued = json.loads(self.pipeline.lpush.call_args.args[1])
+        self.assertEqual(requeued['recipients'], ['a', 'b'])
+        self.assertEqual(requeued['message'], 'Order confirmed')
+        self.assertEqual(requeued['attempts'], 1)
+        self.schedule_flush.assert_called_once_with()
+
+    @tag('unit')
+    def test_failed_send_is_dropped_after_max_attempts(self):
+        self.redis_client.lrange.return_value = [
+            json.dumps({
+                'recipients': ['a'],
+                'message': 'Order confirmed',
+                'extra': { 'order_id': 1 },
+                'attempts': notifications.MAX_SEND_ATTEMPTS - 1,
+            }).encode()
+        ]
+        self.send.side_effect = Exception('push service error')
+
+        self.assertEqual(notifications.flush_push_notifications(), 0)
+        self.pipeline.lpush.assert_not_called()
+        self.schedule_flush.assert_not_called()
+
+    @tag('unit')
+    def test_locked_queue_is_flushed_later(self):
+        self.lock.acquire.return_value = False
+
+        self.assertEqual(notifications.flush_push_notifications(), 0)
+        self.redis_client.lrange.assert_not_called()
+        self.send.assert_not_called()
+        self.schedule_flush.assert_called_once_with()
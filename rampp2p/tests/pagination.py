@@ -0,0 +1,159 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from django.test import SimpleTestCase, TestCase, tag
+
+from rampp2p.models import (
+    Ad,
+    AdSnapshot,
+    CryptoCurrency,
+    FiatCurrency,
+    Order,
+    Peer,
+)
+from rampp2p.utils.pagination import (
+    decode_cursor,
+    encode_cursor,
+    paginate_by_keyset,
+)
+
+
+class CursorTestCase(SimpleTestCase):
+    @tag("unit")
+    def test_round_trip(self):
+        timestamp = datetime(2023, 1, 1, 12, 30, tzinfo=timezone.utc)
+        values = [Decimal("10.50000000"), timestamp, None, 3]
+
+        # values are decoded as their string forms, which the orm parses back in lookups
+        self.assertEqual(
+            decode_cursor(encode_cursor(values)),
+            ["10.50000000", str(timestamp), None, 3]
+        )
+
+    @tag("unit")
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            decode_cursor("not a cursor")
+        with self.assertRaises(ValueError):
+            decode_cursor(encode_cursor({ "id": 1 }))
+
+
+class KeysetPaginationTestCase(TestCase):
+    def setUp(self):
+        self.fiat_currency = FiatCurrency.objects.create(name="Philippine Peso", symbol="PHP")
+        self.crypto_currency = CryptoCurrency.objects.create(name="Bitcoin Cash", symbol="BCH")
+        self.peer = Peer.objects.create(name="peer", public_key="pubkey", address="address", wallet_hash="wallet-hash")
+
+    def create_ads(self, effective_prices):
+        # bulk_create skips Ad.save(), which would recompute effective_price
+        return Ad.objects.bulk_create([
+            Ad(
+                owner=self.peer,
+                trade_type="SELL",
+                price_type="FIXED",
+                fiat_currency=self.fiat_currency,
+                crypto_currency=self.crypto_currency,
+                time_duration_choice=60,
+                effective_price=effective_price,
+            )
+            for effective_price in effective_prices
+        ])
+
+    def create_orders(self, last_modified_ats):
+        ad = self.create_ads([Decimal("1")])[0]
+        ad_snapshot = AdSnapshot.objects.create(
+            ad=ad,
+            trade_type=ad.trade_type,
+            price_type=ad.price_type,
+            fiat_currency=self.fiat_currency,
+            crypto_currency=self.crypto_currency,
+            time_duration_choice=60,
+        )
+        return Order.objects.bulk_create([
+            Order(
+                ad_snapshot=ad_snapshot,
+                owner=self.peer,
+                ad_owner=self.peer,
+                fiat_currency=self.fiat_currency,
+                crypto_currency=self.crypto_currency,
+                time_duration_choice=60,
+                last_modified_at=last_modified_at,
+            )
+            for last_modified_at in last_modified_ats
+        ])
+
+    def paginate_all(self, queryset, ordering, limit=2):
+        ids = []
+        cursor = None
+        while True:
+            results, cursor = paginate_by_keyset(queryset, ordering, cursor=cursor, limit=limit)
+            ids += [obj.id for obj in results]
+            if cursor is None:
+                return ids
+
+    def assert_pages(self, queryset, ordering, expected_ids):
+        # every page size puts page boundaries on ties & nulls at some point
+        for limit in range(1, len(expected_ids) + 1):
+            self.assertEqual(self.paginate_all(queryset, ordering, limit=limit), expected_ids, f"limit={limit}")
+
+    @tag("unit")
+    def test_nullable_decimal_ascending(self):
+        ads = self.create_ads([
+            Decimal("10"), None, Decimal("5"), Decimal("10"), None, Decimal("20"), Decimal("10"),
+        ])
+        ids = [ad.id for ad in ads]
+
+        # nulls sort last when ascending
+        expected_ids = [ids[2], ids[0], ids[3], ids[6], ids[5], ids[1], ids[4]]
+        self.assert_pages(Ad.objects.all(), ["effective_price", "id"], expected_ids)
+
+    @tag("unit")
+    def test_nullable_decimal_descending(self):
+        ads = self.create_ads([
+            Decimal("10"), None, Decimal("5"), Decimal("10"), None, Decimal("20"), Decimal("10"),
+        ])
+        ids = [ad.id for ad in ads]
+
+        # nulls sort first when descending
+        expected_ids = [ids[4], ids[1], ids[5], ids[6], ids[3], ids[0], ids[2]]
+        self.assert_pages(Ad.objects.all(), ["-effective_price", "-id"], expected_ids)
+
+    @tag("unit")
+    def test_nullable_datetime_ascending(self):
+        start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+        orders = self.create_orders([
+            start + timedelta(minutes=1), None, start, start + timedelta(minutes=1), start, None,
+        ])
+        ids = [order.id for order in orders]
+
+        expected_ids = [ids[2], ids[4], ids[0], ids[3], ids[1], ids[5]]
+        self.assert_pages(Order.objects.all(), ["last_modified_at", "id"], expected_ids)
+
+    @tag("unit")
+    def test_nullable_datetime_descending(self):
+        start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+        orders = self.create_orders([
+            start + timedelta(minutes=1), None, start, start + timedelta(minutes=1), start, None,
+        ])
+        ids = [order.id for order in orders]
+
+        expected_ids = [ids[5], ids[1], ids[3], ids[0], ids[4], ids[2]]
+        self.assert_pages(Order.objects.all(), ["-last_modified_at", "-id"], expected_ids)
+
+    @tag("unit")
+    def test_matches_order_by(self):
+        self.create_ads([None, Decimal("3"), Decimal("3"), None, Decimal("1")])
+        for ordering in (["effective_price", "id"], ["-effective_price", "-id"]):
+            expected_ids = list(Ad.objects.order_by(*ordering).values_list("id", flat=True))
+            self.assert_pages(Ad.objects.all(), ordering, expected_ids)
+
+    @tag("unit")
+    def test_last_page(self):
+        self.create_ads([Decimal("1"), Decimal("2")])
+        results, next_cursor = paginate_by_keyset(Ad.objects.all(), ["effective_price", "id"], limit=2)
+        self.assertEqual(len(results), 2)
+        self.assertIsNone(next_cursor)
+
+    @tag("unit")
+    def test_cursor_length_mismatch(self):
+        with self.assertRaises(ValueError):
+            paginate_by_keyset(Ad.objects.all(), ["effective_price", "id"], cursor=encode_cursor([1]))
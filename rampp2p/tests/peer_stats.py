@@ -0,0 +1,91 @@
+from datetime import timedelta
+from django.test import TestCase, tag
+from django.utils import timezone
+
+from rampp2p.models import (
+    Ad,
+    AdSnapshot,
+    CryptoCurrency,
+    FiatCurrency,
+    Order,
+    Peer,
+    PeerStats,
+    Status,
+    StatusType,
+)
+
+
+class PeerStatsSignalsTestCase(TestCase):
+    def setUp(self):
+        fiat_currency = FiatCurrency.objects.create(name="Philippine Peso", symbol="PHP")
+        crypto_currency = CryptoCurrency.objects.create(name="Bitcoin Cash", symbol="BCH")
+        self.owner = Peer.objects.create(name="owner", public_key="pubkey-1", address="address-1", wallet_hash="wallet-hash-1")
+        self.ad_owner = Peer.objects.create(name="ad-owner", public_key="pubkey-2", address="address-2", wallet_hash="wallet-hash-2")
+
+        # bulk_create skips Ad.save(), which would recompute effective_price
+        ad = Ad.objects.bulk_create([
+            Ad(
+                owner=self.ad_owner,
+                trade_type="SELL",
+                price_type="FIXED",
+                fiat_currency=fiat_currency,
+                crypto_currency=crypto_currency,
+                time_duration_choice=60,
+            )
+        ])[0]
+        ad_snapshot = AdSnapshot.objects.create(
+            ad=ad,
+            trade_type=ad.trade_type,
+            price_type=ad.price_type,
+            fiat_currency=fiat_currency,
+            crypto_currency=crypto_currency,
+            time_duration_choice=60,
+        )
+        self.order = Order.objects.create(
+            ad_snapshot=ad_snapshot,
+            owner=self.owner,
+            fiat_currency=fiat_currency,
+            crypto_currency=crypto_currency,
+            time_duration_choice=60,
+        )
+
+    def get_stats(self, peer):
+        return PeerStats.objects.get(peer=peer)
+
+    @tag("unit")
+    def test_order_created(self):
+        self.assertEqual(self.get_stats(self.owner).order_count, 1)
+        self.assertEqual(self.get_stats(self.owner).ad_order_count, 0)
+        self.assertEqual(self.get_stats(self.ad_owner).order_count, 1)
+        self.assertEqual(self.get_stats(self.ad_owner).ad_order_count, 1)
+
+    @tag("unit")
+    def test_order_status(self):
+        Status.objects.create(order=self.order, status=StatusType.SUBMITTED)
+        Status.objects.create(order=self.order, status=StatusType.RELEASED)
+
+        owner_stats = self.get_stats(self.owner)
+        self.assertEqual((owner_stats.released_count, owner_stats.ad_released_count), (1, 0))
+        ad_owner_stats = self.get_stats(self.ad_owner)
+        self.assertEqual((ad_owner_stats.released_count, ad_owner_stats.ad_released_count), (1, 1))
+        self.assertEqual(ad_owner_stats.canceled_count, 0)
+
+    @tag("unit")
+    def test_duplicate_status_counted_once(self):
+        Status.objects.create(order=self.order, status=StatusType.CANCELED)
+        Status.objects.create(order=self.order, status=StatusType.CANCELED)
+
+        self.assertEqual(self.get_stats(self.owner).canceled_count, 1)
+        self.assertEqual(self.get_stats(self.ad_owner).ad_canceled_count, 1)
+
+    @tag("unit")
+    def test_older_status_not_counted(self):
+        # the order already has a newer status, so the refund does not become its current status
+        Order.objects.filter(id=self.order.id).update(
+            current_status=StatusType.PAID,
+            last_modified_at=timezone.now() + timedelta(hours=1),
+        )
+        Status.objects.create(order=self.order, status=StatusType.REFUNDED)
+
+        self.assertEqual(self.get_stats(self.owner).refunded_count, 0)
+        self.assertEqual(self.get_stats(self.ad_owner).ad_refunded_count, 0)
@@ -1,23 +1,18 @@
-from rampp2p.tasks.contract_tasks import execute_subprocess, contract_handler
+from rampp2p.tasks.contract_tasks import generate_contract
 
 import logging
 logger = logging.getLogger(__name__)
 
 def create_contract(**kwargs):
     '''
-    Executes a subprocess task to generate the contract address
+    Executes a task to generate the contract address
     '''
-    path = './rampp2p/js/src/'
-    command = 'node {}escrow.js {} {} {} {}'.format(
-        path,        
-        kwargs.get('arbiter_pubkey'), 
-        kwargs.get('buyer_pubkey'), 
-        kwargs.get('seller_pubkey'),
-        kwargs.get('timestamp'),
-    )
-    return execute_subprocess.apply_async(
-        (command,), 
-        link=contract_handler.s(
-            order_id=kwargs.get('order_id')
-        )
+    params = {
+        'arbiterPubkey': kwargs.get('arbiter_pubkey'),
+        'buyerPubkey': kwargs.get('buyer_pubkey'),
+        'sellerPubkey': kwargs.get('seller_pubkey'),
+        'timestamp': str(kwargs.get('timestamp')),
+    }
+    return generate_contract.apply_async(
+        (kwargs.get('order_id'), params)
     )
@@ -0,0 +1,120 @@
+import os
+import json
+import itertools
+import threading
+import subprocess
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+import logging
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = './rampp2p/js/src/worker.js'
+REQUEST_TIMEOUT = 60 # seconds
+MAX_CONCURRENT_REQUESTS = 4
+
+class EscrowWorkerError(Exception):
+    pass
+
+class EscrowWorker:
+    '''
+    Client of a long-lived node process running the escrow scripts, so requests
+    don't pay for node startup & module loading.
+    Requests & responses are newline-delimited JSON matched by request id,
+    the process is restarted on the next request if it exits.
+    '''
+
+    def __init__(self, script=WORKER_SCRIPT, timeout=REQUEST_TIMEOUT, max_concurrent_requests=MAX_CONCURRENT_REQUESTS):
+        self.script = script
+        self.timeout = timeout
+        self._semaphore = threading.BoundedSemaphore(max_concurrent_requests)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._pending = {} # Map<request_id, Future>
+        self._process = None
+        self._pid = None
+
+    def _is_running(self):
+        # a forked child can't share the parent's pipes, it starts its own process
+        return self._process is not None and self._process.poll() is None and self._pid == os.getpid()
+
+    def _start(self):
+        logger.info(f'Starting escrow worker: {self.script}')
+        self._process = subprocess.Popen(
+            ['node', self.script],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            bufsize=0,
+        )
+        self._pid = os.getpid()
+        self._pending = {}
+        reader = threading.Thread(target=self._read_responses, args=(self._process,), daemon=True)
+        reader.start()
+
+    def _read_responses(self, process):
+        for line in iter(process.stdout.readline, b''):
+            try:
+                response = json.loads(line)
+            except ValueError:
+                logger.error(f'Invalid escrow worker response: {line}')
+                continue
+
+            with self._lock:
+                future = self._pending.pop(response.get('id'), None)
+            if future is None:
+                # response to a timed out request
+                continue
+
+            if response.get('error') is not None:
+                future.set_exception(EscrowWorkerError(response['error']))
+            else:
+                future.set_result(response.get('result'))
+
+        # the process exited, fail the requests still waiting on it
+        logger.error(f'Escrow worker exited with code {process.wait()}')
+        with self._lock:
+            if self._process is process:
+                pending, self._pending = self._pending, {}
+            else:
+                pending = {}
+        for future in pending.values():
+            future.set_exception(EscrowWorkerError('escrow worker exited'))
+
+    def call(self, method, params, timeout=None):
+        '''
+        Sends a request to the worker and waits for its result, raises EscrowWorkerError
+        on errors returned by the worker, crashes & timeouts
+        '''
+        timeout = timeout or self.timeout
+        if not self._semaphore.acquire(timeout=timeout):
+            raise EscrowWorkerError('escrow worker is busy')
+
+        try:
+            future = Future()
+            with self._lock:
+                if not self._is_running():
+                    self._start()
+                request_id = next(self._ids)
+                self._pending[request_id] = future
+                request = json.dumps({ 'id': request_id, 'method': method, 'params': params })
+                try:
+                    self._process.stdin.write(request.encode() + b'\n')
+                except (BrokenPipeError, OSError) as err:
+                    self._pending.pop(request_id, None)
+                    raise EscrowWorkerError(f'escrow worker is not available: {err}')
+
+            try:
+                return future.result(timeout=timeout)
+            except FutureTimeoutError:
+                with self._lock:
+                    self._pending.pop(request_id, None)
+                raise EscrowWorkerError(f'escrow worker request {request_id} timed out')
+        finally:
+            self._semaphore.release()
+
+_escrow_worker = None
+
+def get_escrow_worker():
+    global _escrow_worker
+    if _escrow_worker is None:
+        _escrow_worker = EscrowWorker()
+    return _escrow_worker
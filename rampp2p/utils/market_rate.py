@@ -0,0 +1,150 @@
+from django.conf import settings
+from django.utils import timezone
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+import concurrent.futures
+import statistics
+import requests
+
+from rampp2p.models import MarketRate, FiatCurrency
+from rampp2p.utils.utils import update_ad_effective_prices
+from rampp2p.utils.websocket import send_market_price
+
+import logging
+logger = logging.getLogger(__name__)
+
+REQUEST_TIMEOUT = 15 # seconds
+
+# a new rate further than this from a recent stored rate is treated as a bad source value
+MAX_RATE_CHANGE = Decimal('0.5')
+RECENT_RATE_AGE = timedelta(hours=1)
+
+def fetch_coinbase_rates(currencies):
+    '''
+    Returns a dict of currency symbol to BCH rate from coinbase
+    '''
+    response = requests.get('https://api.coinbase.com/v2/exchange-rates?currency=BCH', timeout=REQUEST_TIMEOUT)
+    rates = response.json()['data']['rates']
+    return { currency: rates.get(currency) for currency in currencies }
+
+def fetch_coingecko_rates(currencies):
+    '''
+    Returns a dict of currency symbol to BCH rate from coingecko
+    '''
+    vs_currencies = ','.join(currency.lower() for currency in currencies)
+    response = requests.get(
+        f'https://pro-api.coingecko.com/api/v3/simple/price/?ids=bitcoin-cash&vs_currencies={vs_currencies}',
+        timeout=REQUEST_TIMEOUT,
+        headers={ 'x-cg-pro-api-key': settings.COINGECKO_API_KEY }
+    )
+    rates = response.json()['bitcoin-cash']
+    return { currency: rates.get(currency.lower()) for currency in currencies }
+
+RATE_SOURCES = {
+    'coinbase': fetch_coinbase_rates,
+    'coingecko': fetch_coingecko_rates,
+}
+
+def _to_rate(value):
+    '''
+    Returns the value as a positive finite Decimal, None if it is not a sane rate
+    '''
+    if value is None:
+        return None
+    try:
+        rate = Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        return None
+    if not rate.is_finite() or rate <= 0:
+        return None
+    return rate
+
+def fetch_rates(currencies):
+    '''
+    Fetches the BCH rates of the currencies from all sources concurrently.
+    Returns a dict of currency symbol to the list of sane rates reported by the sources
+    '''
+    source_rates = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(RATE_SOURCES)) as executor:
+        futures = {
+            source: executor.submit(fetch, currencies)
+            for source, fetch in RATE_SOURCES.items()
+        }
+        for source, future in futures.items():
+            try:
+                source_rates[source] = future.result()
+            except Exception as err:
+                logger.error(f'Failed to fetch market rates from {source}: {err}')
+
+    rates = {}
+    for currency in currencies:
+        values = [_to_rate(result.get(currency)) for result in source_rates.values()]
+        rates[currency] = [value for value in values if value is not None]
+    return rates
+
+def aggregate_rate(values, previous_rate=None):
+    '''
+    Median of the source rates, None if no source reported a rate or the median
+    moved more than MAX_RATE_CHANGE away from a recent previous rate
+    '''
+    if not values:
+        return None
+
+    rate = Decimal(statistics.median(values)).quantize(Decimal('0.01'))
+    if rate <= 0:
+        return None
+
+    if previous_rate:
+        change = abs(rate - previous_rate) / previous_rate
+        if change > MAX_RATE_CHANGE:
+            return None
+    return rate
+
+def refresh_market_rates():
+    '''
+    Fetches the rates of all fiat currencies and writes the changed rates in bulk,
+    ads and websocket subscribers are only updated for the changed rates.
+    Returns a dict of currency symbol to the new rate of the changed rates
+    '''
+    currencies = list(FiatCurrency.objects.values_list('symbol', flat=True))
+    if not currencies:
+        return {}
+
+    source_rates = fetch_rates(currencies)
+    market_rates = { obj.currency: obj for obj in MarketRate.objects.filter(currency__in=currencies) }
+    recent = timezone.now() - RECENT_RATE_AGE
+
+    new_market_rates = []
+    changed_market_rates = []
+    for currency in currencies:
+        market_rate = market_rates.get(currency)
+        previous_rate = None
+        if market_rate and market_rate.modified_at and market_rate.modified_at > recent:
+            previous_rate = market_rate.price
+
+        rate = aggregate_rate(source_rates.get(currency), previous_rate=previous_rate)
+        if rate is None:
+            if source_rates.get(currency):
+                logger.warning(f'Rejected market rate of {currency}: {source_rates[currency]}, previous {previous_rate}')
+            continue
+
+        if market_rate is None:
+            new_market_rates.append(MarketRate(currency=currency, price=rate))
+        elif market_rate.price != rate:
+            market_rate.price = rate
+            market_rate.modified_at = timezone.now()
+            changed_market_rates.append(market_rate)
+
+    if new_market_rates:
+        MarketRate.objects.bulk_create(new_market_rates, ignore_conflicts=True)
+    if changed_market_rates:
+        MarketRate.objects.bulk_update(changed_market_rates, ['price', 'modified_at'])
+
+    changed = {}
+    for market_rate in new_market_rates + changed_market_rates:
+        update_ad_effective_prices(market_rate.currency, market_rate.price)
+        data = { 'currency': market_rate.currency, 'price': market_rate.price }
+        send_market_price(data, { 'symbol': market_rate.currency })
+        changed[market_rate.currency] = str(market_rate.price)
+
+    return changed
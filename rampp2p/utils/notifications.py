@@ -1,14 +1,129 @@
+from django.conf import settings
 from notifications.utils.send import send_push_notification_to_wallet_hashes
+from redis.exceptions import LockError
+import json
 
 import logging
 logger = logging.getLogger(__name__)
 
+REDIS_CLIENT = settings.REDISKV
+
+NOTIFICATION_TITLE = "Peer-to-Peer Ramp"
+
+# Push notifications are queued & sent by a task after a short window, only exact duplicates
+# (same recipient, order & message) queued in the window are merged
+_QUEUE_KEY = 'rampp2p:push-notifications'
+_SCHEDULED_KEY = f'{_QUEUE_KEY}:scheduled'
+_LOCK_KEY = f'{_QUEUE_KEY}:lock'
+NOTIFICATIONS_BATCH_WINDOW = 1 # seconds
+FLUSH_LOCK_TIMEOUT = 60 # seconds
+# failed sends of a notification before it is dropped
+MAX_SEND_ATTEMPTS = 3
+
 def send_push_notification(recipients: [], message: str, extra: []):
     logger.warn(f'Sending push notifications | recipients: {recipients} | message: {message} | extra: {extra}')
-    notif_title = "Peer-to-Peer Ramp"
-    send_push_notification_to_wallet_hashes(
-        recipients,
-        message,
-        title=notif_title,
-        extra=extra
-    )
\ No newline at end of file
+    value = json.dumps({ 'recipients': list(recipients), 'message': message, 'extra': extra }, default=str)
+    try:
+        pipeline = REDIS_CLIENT.pipeline()
+        pipeline.rpush(_QUEUE_KEY, value)
+        pipeline.expire(_QUEUE_KEY, 60 * 5)
+        # only the first notification in the window schedules the flush
+        pipeline.set(_SCHEDULED_KEY, 1, nx=True, ex=60)
+        _, _, scheduled = pipeline.execute()
+    except Exception as err:
+        logger.exception(err)
+        send_push_notification_to_wallet_hashes(
+            recipients,
+            message,
+            title=NOTIFICATION_TITLE,
+            extra=extra
+        )
+        return
+
+    if scheduled:
+        schedule_flush()
+
+def schedule_flush():
+    from rampp2p.tasks.notification_tasks import flush_push_notifications
+    flush_push_notifications.apply_async(countdown=NOTIFICATIONS_BATCH_WINDOW)
+
+def flush_push_notifications():
+    '''
+    Sends the queued push notifications, one send per distinct message to all of its recipients.
+    Notifications are removed from the queue only after the sends and failed sends are queued again,
+    flushes hold a lock so they don't send the same notifications.
+    Returns the number of successful sends
+    '''
+    lock = REDIS_CLIENT.lock(_LOCK_KEY, timeout=FLUSH_LOCK_TIMEOUT)
+    if not lock.acquire(blocking=False):
+        # notifications queued after the running flush read the queue are sent by a later one
+        schedule_flush()
+        return 0
+
+    try:
+        return _flush_push_notifications()
+    finally:
+        try:
+            lock.release()
+        except LockError:
+            pass
+
+def _flush_push_notifications():
+    # notifications queued from here on schedule another flush
+    REDIS_CLIENT.delete(_SCHEDULED_KEY)
+    queued_notifications = REDIS_CLIENT.lrange(_QUEUE_KEY, 0, -1)
+    if not len(queued_notifications):
+        return 0
+
+    # latest notification per (recipient, order, message), insertion order keeps the queue order
+    latest = {}
+    for value in queued_notifications:
+        try:
+            notification = json.loads(value)
+        except (json.decoder.JSONDecodeError, TypeError):
+            continue
+        extra = notification.get('extra') or {}
+        order_id = extra.get('order_id') if isinstance(extra, dict) else None
+        for recipient in notification.get('recipients') or []:
+            key = (recipient, order_id, notification.get('message'))
+            latest.pop(key, None)
+            latest[key] = notification
+
+    batches = {} # Map<(message, extra), { recipients: [recipient], attempts: int }>
+    for (recipient, _, _), notification in latest.items():
+        batch_key = (notification['message'], json.dumps(notification.get('extra'), sort_keys=True))
+        batch = batches.setdefault(batch_key, { 'recipients': [], 'attempts': 0 })
+        batch['recipients'].append(recipient)
+        batch['attempts'] = max(batch['attempts'], notification.get('attempts') or 0)
+
+    sent = 0
+    failed = []
+    for (message, extra), batch in batches.items():
+        recipients = batch['recipients']
+        try:
+            send_push_notification_to_wallet_hashes(
+                recipients,
+                message,
+                title=NOTIFICATION_TITLE,
+                extra=json.loads(extra)
+            )
+            sent += 1
+        except Exception as err:
+            # one failed send must not drop the rest of the batch
+            attempts = batch['attempts'] + 1
+            logger.exception(f'Failed to send push notification | recipients: {recipients} | message: {message} | attempts: {attempts} | error: {err}')
+            if attempts < MAX_SEND_ATTEMPTS:
+                failed.append(json.dumps({ 'recipients': recipients, 'message': message, 'extra': json.loads(extra), 'attempts': attempts }))
+
+    # only the notifications read are removed, failed ones go back to the front of the queue
+    # ahead of the ones queued during the sends
+    pipeline = REDIS_CLIENT.pipeline()
+    pipeline.ltrim(_QUEUE_KEY, len(queued_notifications), -1)
+    if len(failed):
+        pipeline.lpush(_QUEUE_KEY, *reversed(failed))
+        pipeline.expire(_QUEUE_KEY, 60 * 5)
+    pipeline.execute()
+
+    if len(failed):
+        schedule_flush()
+    return sent
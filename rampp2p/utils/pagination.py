@@ -0,0 +1,113 @@
+from django.conf import settings
+from django.db.models import Q
+
+import json
+import base64
+import hashlib
+import logging
+logger = logging.getLogger(__name__)
+
+REDIS_CLIENT = settings.REDISKV
+
+DEFAULT_PAGE_SIZE = 20
+COUNT_CACHE_TTL = 30 # seconds
+_COUNT_CACHE_KEY_PREFIX = 'rampp2p:count'
+
+def encode_cursor(values):
+    data = json.dumps(values, default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+def decode_cursor(cursor):
+    '''
+    Returns the sort key values encoded in the cursor, raises ValueError on malformed cursors
+    '''
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except Exception:
+        raise ValueError('invalid cursor')
+    if not isinstance(values, list):
+        raise ValueError('invalid cursor')
+    return values
+
+def _after_value(field, descending, value):
+    '''
+    Q of rows strictly after `value` in the field's sort order.
+    Postgres sorts nulls last when ascending and first when descending
+    '''
+    if value is None:
+        if descending:
+            return Q(**{f'{field}__isnull': False})
+        return Q(pk__in=[])
+
+    if descending:
+        return Q(**{f'{field}__lt': value})
+    return Q(**{f'{field}__gt': value}) | Q(**{f'{field}__isnull': True})
+
+def _equal_value(field, value):
+    if value is None:
+        return Q(**{f'{field}__isnull': True})
+    return Q(**{field: value})
+
+def _keyset_filter(ordering, values):
+    '''
+    Q of rows after the cursor row for a lexicographic ordering, e.g. for ('price', 'id'):
+    price > p OR (price = p AND id > i)
+    '''
+    condition = Q(pk__in=[])
+    equal = Q()
+    for order_field, value in zip(ordering, values):
+        descending = order_field.startswith('-')
+        field = order_field.lstrip('-')
+        condition |= equal & _after_value(field, descending, value)
+        equal &= _equal_value(field, value)
+    return condition
+
+def paginate_by_keyset(queryset, ordering, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    '''
+    Pages through the queryset by the values of the last row instead of an offset,
+    so every page costs the same index range scan regardless of its depth.
+    `ordering` must end with a unique field (e.g. 'id') for the order to be stable.
+
+    Returns (results, next_cursor), next_cursor is None on the last page
+    '''
+    if limit <= 0:
+        limit = DEFAULT_PAGE_SIZE
+
+    fields = [order_field.lstrip('-') for order_field in ordering]
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(ordering):
+            raise ValueError('invalid cursor')
+        queryset = queryset.filter(_keyset_filter(ordering, values))
+
+    results = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(results) > limit:
+        results = results[:limit]
+        last = results[-1]
+        next_cursor = encode_cursor([getattr(last, field) for field in fields])
+    return results, next_cursor
+
+def get_cached_count(queryset):
+    '''
+    Row count of the queryset cached briefly in redis, shared by all
+    requests with the same filters so scrolling doesn't recount the table
+    '''
+    sql, params = queryset.order_by().query.sql_with_params()
+    key_hash = hashlib.sha256(f'{sql}{params}'.encode()).hexdigest()
+    cache_key = f'{_COUNT_CACHE_KEY_PREFIX}:{queryset.model._meta.model_name}:{key_hash}'
+
+    try:
+        count = REDIS_CLIENT.get(cache_key)
+        if count is not None:
+            return int(count)
+    except Exception as err:
+        logger.exception(err)
+
+    count = queryset.count()
+    try:
+        REDIS_CLIENT.set(cache_key, count, ex=COUNT_CACHE_TTL)
+    except Exception as err:
+        logger.exception(err)
+    return count
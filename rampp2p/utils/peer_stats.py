@@ -0,0 +1,73 @@
+from django.db.models import F, Sum, Count
+from rampp2p.models import Order, Feedback, PeerStats, StatusType
+
+import logging
+logger = logging.getLogger(__name__)
+
+# terminal statuses counted for the completion rate
+STATUS_COUNT_FIELDS = {
+    StatusType.RELEASED: 'released_count',
+    StatusType.CANCELED: 'canceled_count',
+    StatusType.REFUNDED: 'refunded_count',
+}
+
+def _increment(peer_ids, fields):
+    peer_ids = set(peer_id for peer_id in peer_ids if peer_id is not None)
+    if not peer_ids or not fields:
+        return
+
+    PeerStats.objects.bulk_create([PeerStats(peer_id=peer_id) for peer_id in peer_ids], ignore_conflicts=True)
+    PeerStats.objects.filter(peer_id__in=peer_ids).update(**{ field: F(field) + 1 for field in fields })
+
+def _get_order_peer_ids(order_id):
+    '''
+    Returns the (order creator id, ad owner id) of the order
+    '''
+    return Order.objects.filter(id=order_id).values_list('owner_id', 'ad_snapshot__ad__owner_id').first() or (None, None)
+
+def record_order_created(order_id):
+    owner_id, ad_owner_id = _get_order_peer_ids(order_id)
+    _increment([ad_owner_id], ['ad_order_count'])
+    _increment([owner_id, ad_owner_id], ['order_count'])
+
+def record_order_status(order_id, status, created_at):
+    '''
+    Counts the order reaching a terminal status. Called by the status post_save signal before the
+    status is applied to the order, so only a change of the order's current status is counted,
+    e.g. a duplicate status or one older than the current status is not.
+    '''
+    field = STATUS_COUNT_FIELDS.get(status)
+    if field is None:
+        return
+
+    # the order row is locked so concurrent duplicate statuses are counted once
+    order = Order.objects.select_for_update(of=('self',)).filter(id=order_id).values(
+        'owner_id',
+        'ad_snapshot__ad__owner_id',
+        'current_status',
+        'last_modified_at'
+    ).first()
+    if order is None or order['current_status'] == status:
+        return
+    if order['last_modified_at'] is not None and order['last_modified_at'] > created_at:
+        return
+
+    owner_id, ad_owner_id = order['owner_id'], order['ad_snapshot__ad__owner_id']
+    _increment([ad_owner_id], [f'ad_{field}'])
+    _increment([owner_id, ad_owner_id], [field])
+
+def refresh_peer_rating(peer_id):
+    '''
+    Ratings are recomputed instead of incremented since feedbacks can be edited.
+    '''
+    rating = Feedback.objects.filter(to_peer_id=peer_id).aggregate(
+        rating_sum=Sum('rating'),
+        rating_count=Count('id')
+    )
+    PeerStats.objects.update_or_create(
+        peer_id=peer_id,
+        defaults={
+            'rating_sum': rating['rating_sum'] or 0,
+            'rating_count': rating['rating_count'] or 0,
+        }
+    )
@@ -0,0 +1,100 @@
+from django.conf import settings
+from rampp2p.models import Transaction
+
+import logging
+logger = logging.getLogger(__name__)
+
+REDIS_CLIENT = settings.REDISKV
+
+# set of the addresses of contracts with pending (txid=null) transactions,
+# an empty set is never stored in redis so a separate key marks the set as built
+PENDING_CONTRACT_ADDRESSES_KEY = 'rampp2p:pending-contract-addresses'
+PENDING_CONTRACT_ADDRESSES_BUILT_KEY = 'rampp2p:pending-contract-addresses:built'
+
+def _get_pending_contract_addresses():
+    return set(
+        Transaction.objects.filter(
+            txid__isnull=True,
+            contract__address__isnull=False
+        ).values_list('contract__address', flat=True)
+    )
+
+def _get_pending_addresses_of(addresses):
+    return set(
+        Transaction.objects.filter(
+            txid__isnull=True,
+            contract__address__in=addresses
+        ).values_list('contract__address', flat=True)
+    )
+
+def rebuild_pending_contract_addresses():
+    '''
+    Reconciles the redis set with the pending contract addresses in the db, returns the addresses.
+    The live set is never cleared: addresses added by `sync_pending_contract_address` after the
+    db read are kept, members missing from the snapshot are only removed after checking the db again
+    '''
+    addresses = _get_pending_contract_addresses()
+    if addresses:
+        REDIS_CLIENT.sadd(PENDING_CONTRACT_ADDRESSES_KEY, *addresses)
+
+    members = set(
+        member.decode() if isinstance(member, bytes) else member
+        for member in REDIS_CLIENT.smembers(PENDING_CONTRACT_ADDRESSES_KEY)
+    )
+    stale_addresses = members - addresses
+    if stale_addresses:
+        still_pending = _get_pending_addresses_of(stale_addresses)
+        stale_addresses -= still_pending
+        addresses |= still_pending
+    if stale_addresses:
+        REDIS_CLIENT.srem(PENDING_CONTRACT_ADDRESSES_KEY, *stale_addresses)
+
+        # a transaction committed between the check & the SREM had its SADD removed, add it back
+        readded = _get_pending_addresses_of(stale_addresses)
+        if readded:
+            REDIS_CLIENT.sadd(PENDING_CONTRACT_ADDRESSES_KEY, *readded)
+            addresses |= readded
+
+    REDIS_CLIENT.set(PENDING_CONTRACT_ADDRESSES_BUILT_KEY, 1)
+    return addresses
+
+def sync_pending_contract_address(address):
+    '''
+    Adds or removes the contract address from the set depending on whether it has pending transactions
+    '''
+    if not address:
+        return
+
+    is_pending = Transaction.objects.filter(txid__isnull=True, contract__address=address).exists()
+    try:
+        if is_pending:
+            REDIS_CLIENT.sadd(PENDING_CONTRACT_ADDRESSES_KEY, address)
+        else:
+            REDIS_CLIENT.srem(PENDING_CONTRACT_ADDRESSES_KEY, address)
+    except Exception as err:
+        # the set is rebuilt periodically, a missed update is corrected there
+        logger.exception(err)
+
+def has_pending_contract_address(addresses):
+    '''
+    Returns True if any of the addresses is of a contract with pending transactions.
+    Also True when the set can't be checked, so callers fall back to the db lookup
+    '''
+    addresses = [address for address in addresses if address]
+    if not addresses:
+        return False
+
+    try:
+        pipeline = REDIS_CLIENT.pipeline(transaction=False)
+        pipeline.exists(PENDING_CONTRACT_ADDRESSES_BUILT_KEY)
+        for address in addresses:
+            pipeline.sismember(PENDING_CONTRACT_ADDRESSES_KEY, address)
+        built, *is_members = pipeline.execute()
+
+        if not built:
+            pending_addresses = rebuild_pending_contract_addresses()
+            return any(address in pending_addresses for address in addresses)
+        return any(is_members)
+    except Exception as err:
+        logger.exception(err)
+        return True
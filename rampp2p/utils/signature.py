@@ -7,6 +7,37 @@ import logging
 logger = logging.getLogger(__name__)
 
 from rampp2p.exceptions import InvalidSignature
+from rampp2p.utils.cache import TTLCache
+
+# valid signatures keyed by (public key, message digest, signature),
+# repeat callers skip the pure-python curve math
+verified_signatures = TTLCache(maxsize=8192, ttl=60 * 10)
+
+def _verification_key(public_key_hex, signature_hex, message):
+    message_digest = hashlib.sha256(message.encode('utf-8')).hexdigest()
+    return (public_key_hex.lower(), message_digest, signature_hex.lower())
+
+def _verify(public_key_hex, signature_hex, message):
+    '''
+    Returns True if the signature is valid, raises an error otherwise
+    '''
+    key = _verification_key(public_key_hex, signature_hex, message)
+    if verified_signatures.get(key):
+        return True
+
+    # Convert the signature and public key to bytes
+    der_signature_bytes = bytearray.fromhex(signature_hex)
+    public_key_bytes = bytearray.fromhex(public_key_hex)
+
+    # Create an ECDSA public key object
+    vk = ecdsa.VerifyingKey.from_string(public_key_bytes, curve=ecdsa.SECP256k1)
+
+    # Verify the signature
+    is_valid = vk.verify(der_signature_bytes, message.encode('utf-8'), hashlib.sha256, sigdecode=ecdsa.util.sigdecode_der)
+
+    if is_valid:
+        verified_signatures.set(key, True)
+    return is_valid
 
 def verify_signature(wallet_hash, signature_hex, message, **kwargs):
     try:
@@ -20,21 +51,28 @@ def verify_signature(wallet_hash, signature_hex, message, **kwargs):
             user = user.first()
             public_key_hex = user.public_key
 
-        # Convert the signature and public key to bytes
-        der_signature_bytes = bytearray.fromhex(signature_hex)
-        public_key_bytes = bytearray.fromhex(public_key_hex)
-
-        # Create an ECDSA public key object
-        vk = ecdsa.VerifyingKey.from_string(public_key_bytes, curve=ecdsa.SECP256k1)
-
-        # Verify the signature
-        is_valid = vk.verify(der_signature_bytes, message.encode('utf-8'), hashlib.sha256, sigdecode=ecdsa.util.sigdecode_der)
-
-        return is_valid
+        return _verify(public_key_hex, signature_hex, message)
 
     except Exception as err:
         raise InvalidSignature(error=err.args[0])
 
+def verify_signatures(signatures):
+    '''
+    Batch verification for websocket & bulk endpoints.
+    `signatures` is a list of (public_key_hex, signature_hex, message) tuples,
+    returns a list of booleans in the same order, duplicates are only verified once
+    '''
+    results = {}
+    for public_key_hex, signature_hex, message in signatures:
+        key = (public_key_hex, signature_hex, message)
+        if key in results:
+            continue
+        try:
+            results[key] = bool(_verify(public_key_hex, signature_hex, message))
+        except Exception:
+            results[key] = False
+    return [results[(public_key_hex, signature_hex, message)] for public_key_hex, signature_hex, message in signatures]
+
 def get_verification_headers(request):
     signature = request.headers.get('signature', None)
     timestamp = request.headers.get('timestamp', None)
@@ -1,12 +1,20 @@
 from rampp2p.tasks.transaction_tasks import execute_subprocess, handle_transaction_validation
 from django.conf import settings
 from rampp2p.models import Transaction
+from rampp2p.utils.pending_contracts import has_pending_contract_address
 from main.utils.queries.node import Node
 
 import logging
 logger = logging.getLogger(__name__)
 
 def process_transaction(txid, output_address, inputs=None):
+    # skip transactions that don't involve a contract with pending transactions
+    addresses = [output_address]
+    if inputs is not None:
+        addresses += [tx_input.get("address") for tx_input in inputs]
+    if not has_pending_contract_address(addresses):
+        return
+
     logger.warn(f'RampP2P processing tx {txid}')
     try:
         pending_transactions = Transaction.objects.filter(txid__isnull=True)
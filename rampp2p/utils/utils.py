@@ -1,6 +1,6 @@
 
-from rampp2p.models import Order, TradeType, Status, StatusType
-from django.db.models import Q
+from rampp2p.models import Order, TradeType, Status, StatusType, Ad, PriceType
+from django.db.models import Q, F
 from django.conf import settings
 from datetime import datetime
 from django.utils import timezone
@@ -66,4 +66,14 @@ def get_latest_status(order_id: int):
     latest_status = Status.objects.filter(order__pk=order_id)
     if latest_status.exists():
         return latest_status.last()
-    return None
\ No newline at end of file
+    return None
+
+def update_ad_effective_prices(currency: str, market_price):
+    '''
+    Recomputes the stored price of the floating price ads of the currency in one update
+    '''
+    queryset = Ad.objects.filter(fiat_currency__symbol=currency, price_type=PriceType.FLOATING)
+    if market_price is None:
+        return queryset.update(effective_price=None)
+    market_price = Decimal(str(market_price))
+    return queryset.update(effective_price=market_price * F('floating_price') / 100)
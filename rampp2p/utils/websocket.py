@@ -1,12 +1,26 @@
+from django.conf import settings
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
+from redis.exceptions import LockError
+import json
 
 import logging
 logger = logging.getLogger(__name__)
 
+REDIS_CLIENT = settings.REDISKV
+
+# Order updates are batched per room: messages are queued in a redis list per room and sent
+# together in a single `group_send` after a short window, callers don't wait on the channel layer.
+# Every queued message is delivered in order since each one is an order event
+_REDIS_KEY_PREFIX = 'rampp2p:ws-updates'
+UPDATES_BATCH_WINDOW = 0.5 # seconds
+FLUSH_LOCK_TIMEOUT = 30 # seconds
+# failed sends of a room's messages before they are dropped
+MAX_FLUSH_ATTEMPTS = 3
+
 def send_order_update(data, order_id):
     room_name = f'ramp-p2p-subscribe-order-{order_id}'
-    send_message(data, room_name)
+    queue_message(data, room_name)
 
 def send_market_price(data, currency):
     room_name = f'ramp-p2p-subscribe-market-price-{currency.get("symbol")}'
@@ -20,4 +34,96 @@ def send_message(data, room_name):
             'type': 'send_message',
             'data': data
         }
-    )
\ No newline at end of file
+    )
+
+def queue_message(data, room_name):
+    '''
+    Queues a message to the room, messages are sent by `flush_messages`
+    '''
+    messages_key = f'{_REDIS_KEY_PREFIX}:{room_name}'
+    scheduled_key = f'{messages_key}:scheduled'
+
+    try:
+        pipeline = REDIS_CLIENT.pipeline()
+        pipeline.rpush(messages_key, json.dumps(data, default=str))
+        pipeline.expire(messages_key, 60)
+        # only the first message in the window schedules the flush
+        pipeline.set(scheduled_key, 1, nx=True, ex=30)
+        _, _, scheduled = pipeline.execute()
+    except Exception as err:
+        logger.exception(err)
+        return send_message(data, room_name)
+
+    if scheduled:
+        schedule_flush(room_name)
+
+def schedule_flush(room_name):
+    from rampp2p.tasks.notification_tasks import flush_websocket_messages
+    flush_websocket_messages.apply_async((room_name,), countdown=UPDATES_BATCH_WINDOW)
+
+def flush_messages(room_name):
+    '''
+    Sends the queued messages of a room in a single `group_send`, returns the messages sent.
+    Messages are removed from the queue only after they are sent and flushes of a room hold
+    a lock, so a failed send is retried by the next flush and messages are sent in queue order
+    '''
+    messages_key = f'{_REDIS_KEY_PREFIX}:{room_name}'
+
+    lock = REDIS_CLIENT.lock(f'{messages_key}:lock', timeout=FLUSH_LOCK_TIMEOUT)
+    if not lock.acquire(blocking=False):
+        # messages queued after the running flush read the queue are sent by a later one
+        schedule_flush(room_name)
+        return []
+
+    try:
+        return _flush_messages(room_name, messages_key)
+    finally:
+        try:
+            lock.release()
+        except LockError:
+            pass
+
+def _flush_messages(room_name, messages_key):
+    scheduled_key = f'{messages_key}:scheduled'
+    attempts_key = f'{messages_key}:attempts'
+
+    # messages queued from here on schedule another flush
+    REDIS_CLIENT.delete(scheduled_key)
+    queued_messages = REDIS_CLIENT.lrange(messages_key, 0, -1)
+    if not len(queued_messages):
+        return []
+
+    messages = []
+    for value in queued_messages:
+        try:
+            messages.append(json.loads(value))
+        except (json.decoder.JSONDecodeError, TypeError):
+            pass
+
+    if len(messages):
+        try:
+            channel_layer = get_channel_layer()
+            async_to_sync(channel_layer.group_send)(
+                room_name,
+                {
+                    'type': 'send_messages',
+                    'data': messages
+                }
+            )
+        except Exception as err:
+            attempts = REDIS_CLIENT.incr(attempts_key)
+            REDIS_CLIENT.expire(attempts_key, 60)
+            if attempts < MAX_FLUSH_ATTEMPTS:
+                logger.exception(f'Failed to send messages to {room_name}, retrying | attempts: {attempts} | error: {err}')
+                schedule_flush(room_name)
+                return []
+
+            logger.exception(f'Dropping messages to {room_name} | attempts: {attempts} | error: {err}')
+            messages = []
+
+    # only the messages read are removed, the ones queued during the send are kept for the next flush
+    pipeline = REDIS_CLIENT.pipeline()
+    pipeline.ltrim(messages_key, len(queued_messages), -1)
+    pipeline.delete(attempts_key)
+    pipeline.execute()
+    return messages
@@ -5,10 +5,10 @@ from rest_framework.response import Response
 from django.db.models import Q
 from django.http import Http404
 from django.core.exceptions import ValidationError
-from django.db.models import F, ExpressionWrapper, DecimalField, Case, When
 
 import math
 from authentication.token import TokenAuthentication
+from rampp2p.utils.pagination import paginate_by_keyset, get_cached_count
 
 from rampp2p.serializers import (
     AdListSerializer, 
@@ -23,9 +23,7 @@ from rampp2p.models import (
     PaymentMethod,
     FiatCurrency,
     CryptoCurrency,
-    TradeType,
-    PriceType,
-    MarketRate
+    TradeType
 )
 
 import logging
@@ -47,6 +45,8 @@ class AdListCreate(APIView):
         price_order = request.query_params.get('price_order')
         owned = request.query_params.get('owned', False)
         owned = owned == 'true'
+        cursor = request.query_params.get('cursor')
+        include_count = request.query_params.get('include_count') == 'true'
 
         try:
             limit = int(request.query_params.get('limit', 0))
@@ -87,33 +87,46 @@ class AdListCreate(APIView):
             time_limits = list(map(int, time_limits))
             queryset = queryset.filter(time_duration_choice__in=time_limits).distinct()
 
-        market_rate = MarketRate.objects.filter(currency=currency)
-
-        # Annotate to compute ad price based on price type (FIXED vs FLOATING)
-        queryset = queryset.annotate(
-            price=ExpressionWrapper(
-                Case(
-                    When(price_type=PriceType.FLOATING, then=(F('floating_price')/100 * market_rate.values('price'))),
-                    default=F('fixed_price'),
-                    output_field=DecimalField()
-                ),
-                output_field=DecimalField()
-            )
-        )
-
         # Order ads by price (if store listings) or created_at (if owned ads)
         # Default order: ascending, descending if trade type is BUY, 
         # `price_order` filter overrides this order
         if not owned:            
-            order_field = 'price'
+            order_field = 'effective_price'
             if trade_type == TradeType.BUY: 
-                order_field = '-price'
+                order_field = '-effective_price'
             if price_order is not None:
-                order_field = 'price' if price_order == 'ascending' else '-price'
-            queryset = queryset.order_by(order_field, 'created_at')
+                order_field = 'effective_price' if price_order == 'ascending' else '-effective_price'
+            ordering = [order_field, 'created_at', 'id']
         else:
-            queryset = queryset.filter(Q(owner__wallet_hash=wallet_hash)).order_by('-created_at')
+            queryset = queryset.filter(Q(owner__wallet_hash=wallet_hash))
+            ordering = ['-created_at', '-id']
+
+        queryset = queryset.select_related(
+            'owner__stats',
+            'fiat_currency',
+            'crypto_currency'
+        ).prefetch_related(
+            'payment_methods__payment_type'
+        )
+        context = { 'wallet_hash': wallet_hash }
 
+        # cursor pagination: pages by the sort keys of the last ad, counts are opt-in
+        if cursor is not None:
+            try:
+                paged_ads, next_cursor = paginate_by_keyset(queryset, ordering, cursor=cursor, limit=limit)
+            except ValueError as err:
+                return Response({'error': err.args[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+            serializer = AdListSerializer(paged_ads, many=True, context=context)
+            data = {
+                'ads': serializer.data,
+                'next_cursor': next_cursor
+            }
+            if include_count:
+                data['count'] = get_cached_count(queryset)
+            return Response(data, status.HTTP_200_OK)
+
+        queryset = queryset.order_by(*ordering)
         count = queryset.count()
         total_pages = page
         if limit > 0:
@@ -122,7 +135,6 @@ class AdListCreate(APIView):
         offset = (page - 1) * limit
         paged_queryset = queryset[offset:offset + limit]
 
-        context = { 'wallet_hash': wallet_hash }
         serializer = AdListSerializer(paged_queryset, many=True, context=context)
         data = {
             'ads': serializer.data,
@@ -116,7 +116,7 @@ class CreateContract(APIView):
                 # unsubscribe to contract address
             contract.address = None
             contract.save()
-            # Execute subprocess
+            # Generate the contract address
             create_contract(
                 order_id=contract.order.id,
                 arbiter_pubkey=params['arbiter_pubkey'], 
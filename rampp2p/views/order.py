@@ -4,13 +4,12 @@ from rest_framework.response import Response
 
 from django.http import Http404
 from django.db import IntegrityError
-from django.db.models import Q, OuterRef, Subquery
+from django.db.models import Q
 from django.core.exceptions import ValidationError
 
 import math
 from typing import List
 from decimal import Decimal, ROUND_HALF_UP
-from django.utils import timezone
 
 from authentication.token import TokenAuthentication
 from main.utils.subscription import save_subscription
@@ -19,6 +18,7 @@ import rampp2p.utils.websocket as websocket
 from rampp2p.utils.utils import get_trading_fees, get_latest_status
 from rampp2p.utils.transaction import validate_transaction
 from rampp2p.utils.notifications import send_push_notification
+from rampp2p.utils.pagination import paginate_by_keyset, get_cached_count
 from rampp2p.validators import *
 import rampp2p.serializers as serializers
 from rampp2p.serializers import (
@@ -65,6 +65,8 @@ class OrderListCreate(APIView):
         sort_type = request.query_params.get('sort_type')
         owned = request.query_params.get('owned')
         expired_only = request.query_params.get('expired_only')
+        cursor = request.query_params.get('cursor')
+        include_count = request.query_params.get('include_count') == 'true'
         if owned is not None:
             owned = owned == 'true'
         if expired_only is not None:
@@ -82,7 +84,9 @@ class OrderListCreate(APIView):
             'sort_by': sort_by,
             'sort_type': sort_type,
             'owned': owned,
-            'expired_only': expired_only
+            'expired_only': expired_only,
+            'cursor': cursor,
+            'include_count': include_count
         }
 
     def get(self, request):
@@ -107,17 +111,23 @@ class OrderListCreate(APIView):
 
         queryset = Order.objects.all()
 
+        peer_id = Peer.objects.filter(wallet_hash=wallet_hash).values_list('id', flat=True).first()
+        if peer_id is None:
+            # Q(owner_id=None) would match the orders with no owner instead of none
+            if params['cursor'] is not None:
+                data = { 'orders': [], 'next_cursor': None }
+                if params['include_count']:
+                    data['count'] = 0
+            else:
+                data = { 'orders': [], 'count': 0, 'total_pages': 0 if limit > 0 else page }
+            return Response(data, status.HTTP_200_OK)
+
         # fetches orders created by user
-        owned_orders = Q(owner__wallet_hash=wallet_hash)
-
-        # fetches the orders that have ad ids owned by user
-        ad_orders = Q(ad_snapshot__ad__pk__in=list(
-                        # fetches the flat ids of ads owned by user
-                        Ad.objects.filter(
-                            owner__wallet_hash=wallet_hash
-                        ).values_list('id', flat=True)
-                    ))
-                    
+        owned_orders = Q(owner_id=peer_id)
+
+        # fetches the orders of ads owned by user
+        ad_orders = Q(ad_owner_id=peer_id)
+
         if params['owned'] == True:
             queryset = queryset.filter(owned_orders)
         elif params['owned'] == False:
@@ -131,22 +141,14 @@ class OrderListCreate(APIView):
             StatusType.RELEASED,
             StatusType.REFUNDED
         ]
-        last_status = Status.objects.filter(
-            order=OuterRef('pk'),
-            status__in=completed_status
-        ).order_by('-created_at').values('order')[:1]
 
         if params['status_type'] == 'COMPLETED':            
-            queryset = queryset.filter(pk__in=Subquery(last_status))
+            queryset = queryset.filter(current_status__in=completed_status)
         elif params['status_type'] == 'ONGOING':
-            queryset = queryset.exclude(pk__in=Subquery(last_status))
+            queryset = queryset.exclude(current_status__in=completed_status)
         
         if len(params['filtered_status']) > 0:
-            filtered_status = Status.objects.filter(
-                order=OuterRef('pk'),
-                status__in=list(map(str, params['filtered_status']))
-            ).order_by('-created_at').values('order')[:1]
-            queryset = queryset.filter(pk__in=Subquery(filtered_status))
+            queryset = queryset.filter(current_status__in=list(map(str, params['filtered_status'])))
 
         # filters by ad payment types
         if len(params['payment_types']) > 0:
@@ -164,17 +166,13 @@ class OrderListCreate(APIView):
 
         # filters expired orders only
         if params['expired_only'] is True:
-            queryset = queryset.filter(Q(expires_at__isnull=False) & Q(expires_at__lt=timezone.now()))
+            queryset = queryset.filter(is_expired=True)
 
         if params['sort_by'] == 'last_modified_at':
             sort_field = 'last_modified_at'
             if params['sort_type'] == 'descending':
                 sort_field = f'-{sort_field}'
-            last_status_created_at = Status.objects.filter(
-                order=OuterRef('pk')).order_by('-created_at').values('created_at')[:1]
-            queryset = queryset.annotate(
-                last_modified_at=Subquery(last_status_created_at)
-            ).order_by(sort_field)
+            queryset = queryset.order_by(sort_field)
         else:
             sort_field = 'created_at'
             if (params['sort_type'] == 'descending'):
@@ -183,7 +181,31 @@ class OrderListCreate(APIView):
                 queryset = queryset.order_by(sort_field)
             if params['status_type'] == 'COMPLETED':
                 queryset = queryset.order_by(sort_field)
-        
+
+        context = { 'wallet_hash': wallet_hash }
+
+        # cursor pagination: pages by the sort key & id of the last order, counts are opt-in
+        if params['cursor'] is not None:
+            id_field = '-id' if sort_field.startswith('-') else 'id'
+            try:
+                page_results, next_cursor = paginate_by_keyset(
+                    queryset,
+                    [sort_field, id_field],
+                    cursor=params['cursor'],
+                    limit=limit
+                )
+            except ValueError as err:
+                return Response({'error': err.args[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+            serializer = OrderSerializer(page_results, many=True, context=context)
+            data = {
+                'orders': serializer.data,
+                'next_cursor': next_cursor
+            }
+            if params['include_count']:
+                data['count'] = get_cached_count(queryset)
+            return Response(data, status.HTTP_200_OK)
+
         # Count total pages
         count = queryset.count()
         total_pages = page
@@ -194,7 +216,6 @@ class OrderListCreate(APIView):
         offset = (page - 1) * limit
         page_results = queryset[offset:offset + limit]
 
-        context = { 'wallet_hash': wallet_hash }
         serializer = OrderSerializer(page_results, many=True, context=context)
         data = {
             'orders': serializer.data,
@@ -26,6 +26,8 @@ default_settings = {
     "START_BLOCK": None,
     "BLOCK_TO_PRELOAD": None,
     "BLOCKS_PER_TASK": 25,
+    "NOTIFICATION_MAX_WORKERS": 8,
+    "NOTIFICATION_TIMEOUT": 10,
     "JSON_RPC_PROVIDER_URL": "https://rpc.smartbch.org"
     # "JSON_RPC_PROVIDER_URL": "https://smartbch.fountainhead.cash/mainnet",
 }
@@ -5,6 +5,7 @@ from rest_framework.compat import coreapi, coreschema
 from rest_framework.filters import BaseFilterBackend
 
 from smartbch.exceptions import InvalidQueryParameterException
+from smartbch.models import AddressTransactionTransfer
 
 class FilterBackendUtils:
     def _case_insensitive_list_filter(self, name="", values=[]):
@@ -43,17 +44,23 @@ class TransactionTransferViewsetFilter(BaseFilterBackend, FilterBackendUtils):
         addresses = self._parse_query_param(request, self.ADDRESSES_QUERY_NAME)
 
         if len(addresses):
-            from_addr__iin = self._case_insensitive_list_filter(name="from_addr", values=addresses)
-            to_addr__iin = self._case_insensitive_list_filter(name="to_addr", values=addresses)
+            # participation records have lowercased addresses and are indexed by (address, block_number)
+            address_records = AddressTransactionTransfer.objects.filter(
+                address__in=[address.lower() for address in addresses],
+            )
 
-            if record_type == "incoming":
-                queryset = queryset.filter(to_addr__iin)
-            elif record_type == "outgoing":
-                queryset = queryset.filter(from_addr__iin)
-            else:
-                queryset = queryset.filter(
-                    models.Q(from_addr__iin) | models.Q(to_addr__iin)
-                )
+            if record_type in [AddressTransactionTransfer.INCOMING, AddressTransactionTransfer.OUTGOING]:
+                address_records = address_records.filter(record_type=record_type)
+
+            before_block, after_block = self._parse_block_range(request)
+            if before_block is not None:
+                address_records = address_records.filter(block_number__lte=before_block)
+            if after_block is not None:
+                address_records = address_records.filter(block_number__gte=after_block)
+
+            queryset = queryset.filter(
+                id__in=address_records.values("transaction_transfer_id"),
+            )
         return queryset
 
     def filter_queryset_by_token_addresses(self, request, queryset, view):
@@ -86,24 +93,35 @@ class TransactionTransferViewsetFilter(BaseFilterBackend, FilterBackendUtils):
 
         return queryset
 
-    def filter_queryset_by_block_range(self, request, queryset, view):
+    def _parse_block_range(self, request):
         before_block = self._parse_query_param(request, self.BEFORE_BLOCK_QUERY_NAME, is_list=False)
         after_block = self._parse_query_param(request, self.AFTER_BLOCK_QUERY_NAME, is_list=False)
 
+        parsed_before_block = None
+        parsed_after_block = None
         if before_block:
             try:
                 parsed_before_block = Decimal(before_block)
-                queryset = queryset.filter(transaction__block__block_number__lte=parsed_before_block)
             except InvalidOperation:
                 raise InvalidQueryParameterException(f"Invalid value for {self.BEFORE_BLOCK_QUERY_NAME}: {before_block}")
 
         if after_block:
             try:
                 parsed_after_block = Decimal(after_block)
-                queryset = queryset.filter(transaction__block__block_number__gte=parsed_after_block)
             except InvalidOperation:
                 raise InvalidQueryParameterException(f"Invalid value for {self.AFTER_BLOCK_QUERY_NAME}: {after_block}")
 
+        return parsed_before_block, parsed_after_block
+
+    def filter_queryset_by_block_range(self, request, queryset, view):
+        before_block, after_block = self._parse_block_range(request)
+
+        if before_block is not None:
+            queryset = queryset.filter(transaction__block__block_number__lte=before_block)
+
+        if after_block is not None:
+            queryset = queryset.filter(transaction__block__block_number__gte=after_block)
+
         return queryset
 
     def filter_queryset(self, request, queryset, view):
@@ -250,9 +268,12 @@ class TokenContractViewSetFilter(BaseFilterBackend, FilterBackendUtils):
     def filter_queryset_by_wallet_address(self, request, queryset, view):
         addresses = self._parse_query_param(request, self.WALLET_ADDRESSES_QUERY_NAME)
         if addresses:
-            from_addr_filter = self._case_insensitive_list_filter(name="transfers__from_addr", values=addresses)
-            to_addr_filter = self._case_insensitive_list_filter(name="transfers__to_addr", values=addresses)
-            queryset = queryset.filter(models.Q(from_addr_filter | to_addr_filter)).distinct()
+            address_records = AddressTransactionTransfer.objects.filter(
+                address__in=[address.lower() for address in addresses],
+            )
+            queryset = queryset.filter(
+                id__in=address_records.values("transaction_transfer__token_contract_id"),
+            )
         return queryset
 
     def get_schema_fields(self, view):
@@ -0,0 +1,29 @@
+import logging
+from django.core.management.base import BaseCommand
+
+from smartbch.models import AddressTransactionTransfer, TransactionTransfer
+
+LOGGER = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Populate address participation records of transaction transfers saved before they were tracked"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        queryset = TransactionTransfer.objects.filter(
+            address_records__isnull=True,
+        ).select_related("transaction__block").order_by("id")
+
+        last_id = 0
+        while True:
+            transfers = list(queryset.filter(id__gt=last_id)[:batch_size])
+            if not len(transfers):
+                break
+
+            AddressTransactionTransfer.save_from_transaction_transfers(transfers)
+            last_id = transfers[-1].id
+            LOGGER.info(f"Saved address records of transaction transfers up to id {last_id}")
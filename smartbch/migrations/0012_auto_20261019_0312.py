@@ -0,0 +1,17 @@
+# Generated by Django 3.0.14 on 2026-10-19 03:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smartbch', '0011_auto_20220705_1054'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='transactiontransfer',
+            unique_together={('transaction', 'log_index')},
+        ),
+    ]
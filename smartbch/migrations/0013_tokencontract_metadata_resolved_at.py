@@ -0,0 +1,18 @@
+# Generated by Django 3.0.14 on 2026-10-19 05:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smartbch', '0012_auto_20261019_0312'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tokencontract',
+            name='metadata_resolved_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
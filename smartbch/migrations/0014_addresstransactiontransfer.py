@@ -0,0 +1,31 @@
+# Generated by Django 3.0.14 on 2026-10-19 07:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('smartbch', '0013_tokencontract_metadata_resolved_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AddressTransactionTransfer',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('address', models.CharField(max_length=64)),
+                ('record_type', models.CharField(choices=[('incoming', 'incoming'), ('outgoing', 'outgoing')], max_length=10)),
+                ('block_number', models.DecimalField(blank=True, decimal_places=0, max_digits=78, null=True)),
+                ('transaction_transfer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='address_records', to='smartbch.TransactionTransfer')),
+            ],
+            options={
+                'unique_together': {('address', 'transaction_transfer', 'record_type')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='addresstransactiontransfer',
+            index=models.Index(fields=['address', '-block_number'], name='smartbch_address_block_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 3.0.14 on 2026-10-19 16:40
+
+from django.db import migrations
+
+
+BATCH_SIZE = 10000
+
+# one record per side of a transfer, same as `AddressTransactionTransfer.save_from_transaction_transfers`
+BACKFILL_SQL = """
+INSERT INTO smartbch_addresstransactiontransfer (address, record_type, transaction_transfer_id, block_number)
+SELECT LOWER(participant.address), participant.record_type, transfer.id, block.block_number
+FROM smartbch_transactiontransfer transfer
+INNER JOIN smartbch_transaction tx ON tx.id = transfer.transaction_id
+LEFT JOIN smartbch_block block ON block.id = tx.block_id
+CROSS JOIN LATERAL (
+    VALUES (transfer.to_addr, 'incoming'), (transfer.from_addr, 'outgoing')
+) AS participant(address, record_type)
+WHERE transfer.id >= %s AND transfer.id < %s
+    AND COALESCE(participant.address, '') <> ''
+ON CONFLICT (address, transaction_transfer_id, record_type) DO NOTHING
+"""
+
+
+def backfill_address_transaction_transfers(apps, schema_editor):
+    TransactionTransfer = apps.get_model('smartbch', 'TransactionTransfer')
+    max_id = TransactionTransfer.objects.order_by('-id').values_list('id', flat=True).first()
+    if max_id is None:
+        return
+
+    # the migration is not atomic, so each batch is committed on its own instead of
+    # holding a single transaction over the whole transfers table
+    with schema_editor.connection.cursor() as cursor:
+        for start_id in range(0, max_id + 1, BATCH_SIZE):
+            cursor.execute(BACKFILL_SQL, [start_id, start_id + BATCH_SIZE])
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('smartbch', '0014_addresstransactiontransfer'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_address_transaction_transfers, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 import web3
 from decimal import Decimal
 from psqlextra.models import PostgresModel
+from psqlextra.types import ConflictAction
 from django.db import models
 from django.db import connection
 
@@ -82,6 +83,10 @@ class TokenContract(PostgresModel):
     image_url = models.URLField(null=True, blank=True)
     image_url_source = models.CharField(max_length=20, null=True, blank=True)
 
+    # set once name, symbol & decimals are fetched from the contract,
+    # null name/symbol with this set means the contract is not a token
+    metadata_resolved_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
     def __str__(self):
         string = f"{self.__class__.__name__}:{self.address}"
         if self.name:
@@ -167,6 +172,12 @@ class TransactionTransfer(PostgresModel):
     amount = models.DecimalField(max_digits=36, decimal_places=18, null=True, blank=True)
     token_id = models.IntegerField(null=True, blank=True) # will be applicable to erc721
 
+    class Meta:
+        unique_together = (
+            # natural key of a log, bch value transfers have null log_index
+            ("transaction", "log_index"),
+        )
+
     @property
     def normalized_amount(self):
         # https://stackoverflow.com/questions/11227620/drop-trailing-zeros-from-decimal
@@ -262,6 +273,71 @@ class TransactionTransfer(PostgresModel):
         return data    
 
 
+class AddressTransactionTransfer(PostgresModel):
+    """
+        Normalized (address, transaction transfer) participation records for address history lookups,
+        one record per side of a transfer the address appears in
+    """
+    INCOMING = "incoming"
+    OUTGOING = "outgoing"
+    RECORD_TYPE_CHOICES = [
+        (INCOMING, INCOMING),
+        (OUTGOING, OUTGOING),
+    ]
+
+    address = models.CharField(max_length=64) # lowercase
+    record_type = models.CharField(max_length=10, choices=RECORD_TYPE_CHOICES)
+    transaction_transfer = models.ForeignKey(
+        TransactionTransfer,
+        on_delete=models.CASCADE,
+        related_name="address_records",
+    )
+    # denormalized from the transfer's block for range scans without joins
+    block_number = models.DecimalField(max_digits=78, decimal_places=0, null=True, blank=True)
+
+    class Meta:
+        unique_together = (
+            ("address", "transaction_transfer", "record_type"),
+        )
+        indexes = [
+            models.Index(fields=["address", "-block_number"], name="smartbch_address_block_idx"),
+        ]
+
+    @classmethod
+    def save_from_transaction_transfers(cls, transaction_transfers):
+        """
+            Bulk insert participation records for the transaction transfers, existing records are skipped
+
+        Parameters
+        ------------
+            transaction_transfers: QuerySet(TransactionTransfer) | list(TransactionTransfer)
+        """
+        rows = []
+        for transaction_transfer in transaction_transfers:
+            block_number = transaction_transfer.transaction.block.block_number \
+                if transaction_transfer.transaction.block else None
+
+            for address, record_type in [
+                (transaction_transfer.to_addr, cls.INCOMING),
+                (transaction_transfer.from_addr, cls.OUTGOING),
+            ]:
+                if not address:
+                    continue
+                rows.append(dict(
+                    address=address.lower(),
+                    record_type=record_type,
+                    transaction_transfer=transaction_transfer,
+                    block_number=block_number,
+                ))
+
+        if not len(rows):
+            return
+
+        cls.objects.on_conflict(
+            ["address", "transaction_transfer", "record_type"], ConflictAction.NOTHING,
+        ).bulk_insert(rows)
+
+
 class TransactionTransferReceipientLog(PostgresModel):
     transaction_transfer = models.ForeignKey(
         TransactionTransfer,
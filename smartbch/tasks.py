@@ -19,6 +19,8 @@ from smartbch.utils import block as block_utils
 from smartbch.utils import subscription as subscription_utils
 from smartbch.utils import transaction as transaction_utils
 from smartbch.utils import contract as contract_utils
+from smartbch.utils.contract import metadata as contract_metadata_utils
+from smartbch.utils import notification_delivery as notification_delivery_utils
 from smartbch.utils import push_notification as push_notification_utils
 from main.tasks import download_image
 
@@ -30,6 +32,7 @@ _REDIS_KEY_TTL = 300 # 5 minutes
 _REDIS_NAME__BLOCKS_BEING_PARSED = 'smartbch:blocks-being-parsed'
 _REDIS_NAME__TXS_BEING_PARSED = 'smartbch:txs-being-parsed'
 _REDIS_NAME__TXS_TRANSFERS_BEING_PARSED = 'smartbch:tx-transfers-being-parsed'
+_REDIS_NAME__BLOCK_TRANSFERS_BEING_PARSED = 'smartbch:block-transfers-being-parsed'
 _REDIS_NAME__ADDRESS_BEING_CRAWLED = 'smartbch:address-being-crawled'
 
 ## CELERY QUEUES
@@ -162,9 +165,8 @@ def parse_block_task(block_number, send_notifications=False):
         block_obj = block_utils.parse_block(block_number, save_transactions=True)
         LOGGER.info(f"Parsed block successfully: {block_obj}")
 
-        LOGGER.info(f"Parsing transaction transfers under block: {block_obj}")
-        for tx_obj in block_obj.transactions.all():
-            save_transaction_transfers_task.delay(tx_obj.txid, send_notifications=send_notifications)
+        LOGGER.info(f"Queueing parsing of transaction transfers under block: {block_obj}")
+        save_block_transaction_transfers_task.delay(block_number, send_notifications=send_notifications)
 
     except Exception as e:
         return f"parse_block_task({block_number}) error: {str(e)}"
@@ -203,6 +205,31 @@ def save_transaction_transfers_task(txid, send_notifications=False):
         REDIS_CLIENT.srem(_REDIS_NAME__TXS_TRANSFERS_BEING_PARSED, str(txid))
 
 
+@shared_task(queue=_QUEUE_TRANSACTIONS_PARSER, time_limit=_TASK_TIME_LIMIT)
+def save_block_transaction_transfers_task(block_number, send_notifications=False):
+    LOGGER.info(f"Parsing transaction transfers of block: {block_number}")
+
+    if REDIS_CLIENT.sismember(_REDIS_NAME__BLOCK_TRANSFERS_BEING_PARSED, str(block_number)):
+        LOGGER.info(f"Transfers of block ({block_number}) are being parsed by another task, will stop task")
+        return f"block_transfers_is_being_parsed: {block_number}"
+
+    REDIS_CLIENT.sadd(_REDIS_NAME__BLOCK_TRANSFERS_BEING_PARSED, str(block_number))
+    REDIS_CLIENT.expire(_REDIS_NAME__BLOCK_TRANSFERS_BEING_PARSED, _REDIS_KEY_TTL)
+
+    try:
+        tx_objs = transaction_utils.save_block_transaction_transfers(block_number, parse_block_timestamp=True)
+        LOGGER.info(f"Parsed transfers of {len(tx_objs)} transaction/s under block: {block_number}")
+        if send_notifications:
+            for tx_obj in tx_objs:
+                send_transaction_notification_task.delay(tx_obj.txid)
+
+        return f"parsed transfers of {len(tx_objs)} transaction/s under block: {block_number}"
+    except Exception as e:
+        return f"save_block_transaction_transfers_task({block_number}) error: {str(e)}"
+    finally:
+        REDIS_CLIENT.srem(_REDIS_NAME__BLOCK_TRANSFERS_BEING_PARSED, str(block_number))
+
+
 @shared_task(queue=_QUEUE_TRANSACTIONS_PARSER, time_limit=_TASK_TIME_LIMIT)
 def save_transaction_task(txid):
     LOGGER.info(f"Parsing transaction: {txid}")
@@ -284,21 +311,46 @@ def send_transaction_notification_task(txid):
     if not tx_obj:
         return f"transaction with id {txid} does not exist"
 
-    for transfer_tx in tx_obj.transfers.all():
-        send_transaction_transfer_notification_task.delay(transfer_tx.id)
+    tx_transfer_objs = list(tx_obj.transfers.select_related("transaction__block", "token_contract"))
+    for tx_transfer_obj in tx_transfer_objs:
+        try:
+            push_notification_utils.send_transaction_transfer_push_notification(tx_transfer_obj)
+        except Exception as exception:
+            LOGGER.exception(exception)
+
+    token_contract_addresses = {
+        tx_transfer_obj.token_contract.address
+        for tx_transfer_obj in tx_transfer_objs if tx_transfer_obj.token_contract
+    }
+    for address in token_contract_addresses:
+        contract_utils.get_or_save_token_contract_metadata(address, force=False)
+
+    logs, errors = notification_delivery_utils.send_transaction_transfer_notifications(tx_transfer_objs)
+
+    # failed notifications are retried individually
+    failed_tx_transfer_ids = { tx_transfer_obj.id for _, tx_transfer_obj, _ in errors }
+    for tx_transfer_id in failed_tx_transfer_ids:
+        send_transaction_transfer_notification_task.apply_async(
+            (tx_transfer_id,),
+            { "send_push_notification": False },
+            countdown=3,
+        )
+
+    return f"sent {len(logs)} transaction_transfer notifications, {len(errors)} failed"
 
 
 @shared_task(queue=_QUEUE_TRANSACTION_TRANSFER_NOTIFICATION, max_retries=3, time_limit=_TASK_TIME_LIMIT)
-def send_transaction_transfer_notification_task(tx_transfer_id):
+def send_transaction_transfer_notification_task(tx_transfer_id, send_push_notification=True):
     tx_transfer_obj = TransactionTransfer.objects.filter(id=tx_transfer_id).first()
 
     if not tx_transfer_obj:
         return f"transaction_transfer with id {tx_transfer_id} does not exist"
 
-    try:
-        push_notification_utils.send_transaction_transfer_push_notification(tx_transfer_obj)
-    except Exception as exception:
-        LOGGER.exception(exception)
+    if send_push_notification:
+        try:
+            push_notification_utils.send_transaction_transfer_push_notification(tx_transfer_obj)
+        except Exception as exception:
+            LOGGER.exception(exception)
 
     subscriptions = tx_transfer_obj.get_unsent_valid_subscriptions()
 
@@ -342,25 +394,28 @@ def send_transaction_transfer_notification_task(tx_transfer_id):
 @shared_task(queue=_QUEUE_ADDRESS_PARSER, time_limit=_TASK_TIME_LIMIT)
 def parse_token_contract_metadata_task():
     LOGGER.info(f"Checking for token contracts without metadata")
-    MAX_CONTRACTS_PER_TASK = 10
+    # metadata is fetched in batched json-rpc calls so a run can go through a much larger backlog
+    MAX_CONTRACTS_PER_TASK = 500
     token_contract_addresses = TokenContract.objects.filter(
-        name__isnull=True,
-        symbol__isnull=True,
+        metadata_resolved_at__isnull=True,
     )[:MAX_CONTRACTS_PER_TASK].values_list("address", flat=True)
+    token_contract_addresses = list(token_contract_addresses)
 
     if not len(token_contract_addresses):
         LOGGER.info(f"No token contracts without metadata found")
         return "no_token_contract_found"
 
     LOGGER.info(f"Found {len(token_contract_addresses)} token contract/s without metadata: {token_contract_addresses}")
+    address_metadata_map = contract_metadata_utils.resolve_token_contracts_metadata(token_contract_addresses)
+
     results = []
     for address in token_contract_addresses:
-        instance, updated = contract_utils.get_or_save_token_contract_metadata(address, force=False)
-        instance_id = instance.id if instance else None
+        name, symbol, decimals = address_metadata_map.get(address, (None, None, None))
         results.append({
-            "id": instance_id,
             "address": address,
-            "updated": updated,
+            "name": name,
+            "symbol": symbol,
+            "decimals": decimals,
         })
 
     return results
@@ -1,6 +1,9 @@
 from .block import BlockUtilsTestCase
+from .contract_metadata import ContractMetadataUtilsTestCase
 from .subscription import (
+    NotificationDeliveryUtilsTestCase,
     SubscriptionUtilsTestCase,
     TransactionTransferSubscriptionTestCase,
 )
 from .transaction import TransactionUtilsTestCase
+from .transfer_log import TransferLogUtilsTestCase
@@ -0,0 +1,55 @@
+from unittest import mock
+from django.test import TestCase, tag
+
+from smartbch.models import TokenContract
+from smartbch.utils.contract import metadata as metadata_utils
+
+
+TOKEN_ADDRESS = "0x265bd28d79400d55a1665707fa14a72978fa6043"
+RATE_LIMITED_ADDRESS = "0x7b2b3c5308ab5b2a1d9a94d20d35ccdf61e05b72"
+
+# "TKN" as a bytes32 value, decoded by the bytes32 fallback
+TKN_BYTES32 = "0x" + b"TKN".hex().ljust(64, "0")
+DECIMALS_18 = "0x" + "12".rjust(64, "0")
+
+
+def _mock_batch_response(payload):
+    replies = []
+    for item in payload:
+        address = item["params"][0]["to"]
+        selector = item["params"][0]["data"]
+        if address == RATE_LIMITED_ADDRESS and selector == metadata_utils._FUNCTION_SELECTORS["symbol"]:
+            replies.append({ "jsonrpc": "2.0", "id": item["id"], "error": { "code": -32005, "message": "rate limited" } })
+        elif selector == metadata_utils._FUNCTION_SELECTORS["decimals"]:
+            replies.append({ "jsonrpc": "2.0", "id": item["id"], "result": DECIMALS_18 })
+        elif address == TOKEN_ADDRESS:
+            replies.append({ "jsonrpc": "2.0", "id": item["id"], "result": TKN_BYTES32 })
+        else:
+            # reverted call
+            replies.append({ "jsonrpc": "2.0", "id": item["id"], "result": "0x" })
+
+    response = mock.Mock()
+    response.json.return_value = replies
+    return response
+
+
+class ContractMetadataUtilsTestCase(TestCase):
+    @tag("unit")
+    @mock.patch("smartbch.utils.contract.metadata.requests.post")
+    def test_fetch_skips_contracts_with_errored_calls(self, mock_post):
+        mock_post.side_effect = lambda url, json=None, timeout=None: _mock_batch_response(json)
+
+        results = metadata_utils.fetch_token_contracts_metadata([TOKEN_ADDRESS, RATE_LIMITED_ADDRESS])
+        self.assertEqual(results, { TOKEN_ADDRESS: ("TKN", "TKN", 18) })
+
+    @tag("unit")
+    def test_save_keeps_known_name_and_symbol(self):
+        TokenContract.objects.create(address=TOKEN_ADDRESS, name="Token", symbol="TKN", token_type=20)
+
+        metadata_utils.save_token_contracts_metadata({ TOKEN_ADDRESS: (None, None, 18) })
+
+        token_contract = TokenContract.objects.get(address=TOKEN_ADDRESS)
+        self.assertEqual(token_contract.name, "Token")
+        self.assertEqual(token_contract.symbol, "TKN")
+        self.assertEqual(token_contract.decimals, 18)
+        self.assertIsNotNone(token_contract.metadata_resolved_at)
@@ -10,6 +10,7 @@ from main.models import Subscription
 from main.utils import subscription as subscription_utils_main
 
 from smartbch.models import TransactionTransferReceipientLog
+from smartbch.utils import notification_delivery as notification_delivery_utils
 from smartbch.utils import subscription as subscription_utils
 from smartbch.utils import transaction as transaction_utils
 
@@ -122,6 +123,73 @@ class SubscriptionUtilsTestCase(TestCase):
         self.assertEqual(log2.sent_at, log.sent_at, "Expected to share timestamp")
 
 
+class NotificationDeliveryUtilsTestCase(TestCase):
+    @mock.patch("web3.eth.Eth.get_transaction_receipt", return_value=mock_responses.test_sep20_transfer_tx_receipt)
+    @mock.patch("web3.eth.Eth.get_transaction", return_value=mock_responses.test_sep20_transfer_tx)
+    def setUp(self, mock_tx, mock_tx_receipt):
+        txid = mock_tx.return_value.hash.hex()
+
+        tx_obj = transaction_utils.save_transaction(txid)
+        tx_obj = transaction_utils.save_transaction_transfers(txid)
+        self.tx_transfer_obj = tx_obj.transfers.first()
+        subscription_utils_main.save_subscription(self.tx_transfer_obj.from_addr, 12312)
+
+    @tag("unit")
+    @mock.patch("requests.Session.post")
+    def test_send_notifications_telegram(self, mock_session_post):
+        logs, errors = notification_delivery_utils.send_transaction_transfer_notifications([self.tx_transfer_obj])
+
+        self.assertEqual(len(errors), 0)
+        self.assertEqual(len(logs), 1)
+        self.assertIsNotNone(logs[0].sent_at)
+        self.assertEqual(mock_session_post.call_count, 1)
+        self.assertFalse(self.tx_transfer_obj.get_unsent_valid_subscriptions().exists())
+
+    @tag("unit")
+    @mock.patch("requests.Session.post")
+    def test_send_notifications_web_url_error(self, mock_session_post):
+        mock_session_post.return_value.status_code = 500
+
+        subscription = self.tx_transfer_obj.get_unsent_valid_subscriptions().first()
+        subscription.recipient.telegram_id = None
+        subscription.recipient.web_url = "https://example.com/webhook/receiver/"
+        subscription.recipient.save()
+
+        logs, errors = notification_delivery_utils.send_transaction_transfer_notifications([self.tx_transfer_obj])
+        self.assertEqual(len(logs), 0)
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(self.tx_transfer_obj.get_unsent_valid_subscriptions().exists())
+
+    @tag("unit")
+    @mock.patch("requests.Session.post", side_effect=ValueError("unexpected"))
+    def test_send_notifications_unexpected_error(self, mock_session_post):
+        logs, errors = notification_delivery_utils.send_transaction_transfer_notifications([self.tx_transfer_obj])
+
+        self.assertEqual(len(logs), 0)
+        self.assertEqual(len(errors), 1)
+        self.assertIn("unexpected_error", errors[0][2])
+        self.assertTrue(self.tx_transfer_obj.get_unsent_valid_subscriptions().exists())
+
+    @tag("unit")
+    @mock.patch("smartbch.utils.notification_delivery.get_websocket_room_names", return_value=["room"])
+    @mock.patch("smartbch.utils.notification_delivery.get_channel_layer")
+    @mock.patch("requests.Session.post")
+    def test_send_notifications_websocket_error(self, mock_session_post, mock_get_channel_layer, mock_room_names):
+        mock_get_channel_layer.return_value.group_send = mock.AsyncMock(side_effect=ConnectionError("redis down"))
+
+        subscription = self.tx_transfer_obj.get_unsent_valid_subscriptions().first()
+        subscription.websocket = True
+        subscription.save()
+
+        logs, errors = notification_delivery_utils.send_transaction_transfer_notifications([self.tx_transfer_obj])
+
+        # telegram is still sent, the subscription is retried since the websocket message is not
+        self.assertEqual(mock_session_post.call_count, 1)
+        self.assertEqual(len(logs), 0)
+        self.assertEqual(len(errors), 1)
+        self.assertIn("websocket_error", errors[0][2])
+
+
 class TransactionTransferSubscriptionTestCase(TestCase):
     @mock.patch("web3.eth.Eth.get_transaction_receipt", return_value=mock_responses.test_sep20_transfer_tx_receipt)
     @mock.patch("web3.eth.Eth.get_transaction", return_value=mock_responses.test_sep20_transfer_tx)
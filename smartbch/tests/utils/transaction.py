@@ -2,7 +2,7 @@ from unittest import mock
 from django.test import TestCase, tag
 from smartbch.tests.mocker import response_values as mock_responses
 
-from smartbch.models import Transaction, Block, TokenContract
+from smartbch.models import AddressTransactionTransfer, Transaction, Block, TokenContract
 from smartbch.utils import transaction as transaction_utils
 
 class TransactionUtilsTestCase(TestCase):
@@ -43,6 +43,59 @@ class TransactionUtilsTestCase(TestCase):
             f"Expected to have {TokenContract} record with address={token_contract_address}"
         )
 
+    @tag("unit")
+    @mock.patch("smartbch.utils.contract.get_token_decimals", return_value=18)
+    @mock.patch("web3.eth.Eth.get_transaction_receipt", return_value=mock_responses.test_sep20_transfer_tx_receipt)
+    @mock.patch("web3.eth.Eth.get_transaction", return_value=mock_responses.test_sep20_transfer_tx)
+    def test_save_transaction_transfers_address_records(self, mock_tx, mock_tx_receipt, mock_get_token_decimals):
+        txid = mock_tx.return_value.hash.hex()
+
+        transaction_utils.save_transaction(txid)
+        tx_obj = transaction_utils.save_transaction_transfers(txid)
+        tx_transfer_obj = tx_obj.transfers.first()
+
+        self.assertTrue(
+            AddressTransactionTransfer.objects.filter(
+                address=tx_transfer_obj.from_addr.lower(),
+                record_type=AddressTransactionTransfer.OUTGOING,
+                transaction_transfer=tx_transfer_obj,
+                block_number=tx_obj.block.block_number,
+            ).exists(),
+            f"Expected to have outgoing address record for {tx_transfer_obj.from_addr}",
+        )
+        self.assertTrue(
+            AddressTransactionTransfer.objects.filter(
+                address=tx_transfer_obj.to_addr.lower(),
+                record_type=AddressTransactionTransfer.INCOMING,
+                transaction_transfer=tx_transfer_obj,
+            ).exists(),
+            f"Expected to have incoming address record for {tx_transfer_obj.to_addr}",
+        )
+
+    @tag("unit")
+    @mock.patch(
+        "smartbch.utils.contract.metadata.fetch_token_contracts_metadata",
+        side_effect=lambda addresses: { address: ("Token", "TKN", 18) for address in addresses },
+    )
+    @mock.patch("web3.eth.Eth.get_transaction_receipt", return_value=mock_responses.test_sep20_transfer_tx_receipt)
+    @mock.patch("web3.eth.Eth.get_transaction", return_value=mock_responses.test_sep20_transfer_tx)
+    def test_save_block_transaction_transfers(self, mock_tx, mock_tx_receipt, mock_fetch_metadata):
+        txid = mock_tx.return_value.hash.hex()
+        block_number = mock_tx.return_value.blockNumber
+
+        transaction_utils.save_transaction(txid)
+        tx_objs = transaction_utils.save_block_transaction_transfers(block_number)
+        self.assertEqual([tx_obj.txid for tx_obj in tx_objs], [txid])
+
+        tx_obj = Transaction.objects.get(txid=txid)
+        self.assertTrue(tx_obj.processed_transfers)
+        transfers_count = tx_obj.transfers.filter(token_contract__isnull=False).count()
+        self.assertTrue(transfers_count > 0, f"Expected to have transfer record with token contract")
+
+        # running again should upsert on the existing rows
+        transaction_utils.save_block_transaction_transfers(block_number)
+        self.assertEqual(tx_obj.transfers.filter(token_contract__isnull=False).count(), transfers_count)
+
     @tag("unit")
     @mock.patch("smartbch.utils.web3.SmartBCHModule.query_transfer_events", return_value=mock_responses.test_sbch_query_transfer_events)
     @mock.patch("smartbch.utils.web3.SmartBCHModule.query_tx_by_addr", return_value=mock_responses.test_sbch_query_tx_by_addr)
@@ -0,0 +1,36 @@
+from django.test import TestCase, tag
+from smartbch.tests.mocker import response_values as mock_responses
+
+from smartbch.utils import transfer_log as transfer_log_utils
+
+
+class TransferLogUtilsTestCase(TestCase):
+    @tag("unit")
+    def test_decode_transfer_logs(self):
+        transfer_logs = transfer_log_utils.decode_transfer_logs(mock_responses.test_block_logs)
+
+        # second log in the block is not a Transfer event
+        self.assertEqual(len(transfer_logs), 1)
+        transfer_log = transfer_logs[0]
+        self.assertEqual(transfer_log.token_type, 20)
+        self.assertEqual(transfer_log.address, mock_responses.test_block_logs[0].address)
+        self.assertEqual(transfer_log.transaction_hash, mock_responses.test_block_logs[0].transactionHash.hex())
+        self.assertEqual(transfer_log.log_index, 0)
+        self.assertEqual(transfer_log.from_addr, "0xfea305D5Fe76cf6Ea4A887234264a256AD269792")
+        self.assertEqual(transfer_log.to_addr, "0x659F04F36e90143fCaC202D4BC36C699C078fC98")
+        self.assertEqual(transfer_log.value, 0x7530)
+        self.assertIsNone(transfer_log.token_id)
+
+    @tag("unit")
+    def test_decode_erc721_transfer_log(self):
+        log = dict(mock_responses.test_block_logs[0])
+        log["topics"] = [
+            *log["topics"],
+            "0x000000000000000000000000000000000000000000000000000000000000002a",
+        ]
+        log["data"] = "0x"
+
+        transfer_log = transfer_log_utils.decode_transfer_log(log)
+        self.assertEqual(transfer_log.token_type, 721)
+        self.assertEqual(transfer_log.token_id, 42)
+        self.assertIsNone(transfer_log.value)
@@ -3,19 +3,14 @@ import datetime
 from django.db import models
 from django.utils.timezone import make_aware
 from web3.datastructures import AttributeDict
-from web3.exceptions import (
-    InvalidEventABI,
-    LogTopicError,
-    MismatchedABI,
-)
 
 from main.models import Address
 
 from smartbch.conf import settings as app_settings
 from smartbch.models import Block, Transaction
 
-from .contract import abi
 from .formatters import format_block_number
+from .transfer_log import TRANSFER_EVENT_TOPIC, decode_transfer_logs
 from .web3 import create_web3_client
 
 
@@ -125,41 +120,20 @@ def parse_block(block_number, save_transactions=True, save_all_transactions=Fals
         }
     )
 
-    # ERC20 and ERC721 Transfer event topic, apparenlty share the same topic in hex string
-    event_topic = '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'
     block_logs = w3.eth.get_logs({
         "fromBlock": format_block_number(block_number),
         "toBlock": format_block_number(block_number),
-        "topics": [event_topic],
+        "topics": [TRANSFER_EVENT_TOPIC],
     })
 
     if save_transactions:
         tx_log_addresses_map = {}
         if not save_all_transactions:
-            erc20 = w3.eth.contract('', abi=abi.get_token_abi(20))
-            erc721 = w3.eth.contract('', abi=abi.get_token_abi(721))
             # extracting the addresses of the Transfer events in logs
-            for log in block_logs:
-                tx_hex = ""
-                addresses = set()
-                try:
-                    parsed_log = erc20.events.Transfer().processLog(log)
-                    tx_hex = parsed_log.transactionHash.hex()
-                    addresses.add(parsed_log.args['from'])
-                    addresses.add(parsed_log.args.to)
-                except (InvalidEventABI, LogTopicError, MismatchedABI):
-                    pass
-
-                try:
-                    parsed_log = erc721.events.Transfer().processLog(log)
-                    tx_hex = parsed_log.transactionHash.hex()
-                    addresses.add(parsed_log.args['from'])
-                    addresses.add(parsed_log.args.to)
-                except (InvalidEventABI, LogTopicError, MismatchedABI):
-                    pass
-
-                if tx_hex:
-                    tx_log_addresses_map[tx_hex] = addresses
+            for transfer_log in decode_transfer_logs(block_logs):
+                addresses = tx_log_addresses_map.setdefault(transfer_log.transaction_hash, set())
+                addresses.add(transfer_log.from_addr)
+                addresses.add(transfer_log.to_addr)
 
         for transaction in block.transactions:
             if not save_all_transactions:
@@ -1,12 +1,12 @@
 import json
 import requests
-import functools
 import web3
 from web3 import exceptions
 from smartbch.models import TokenContract
 
 from ..web3 import create_web3_client
 from .abi import get_token_abi
+from .metadata import resolve_token_contracts_metadata
 
 
 def fetch_icons_from_marketcap():
@@ -59,7 +59,6 @@ def save_if_contract(address):
     return instance
 
 
-@functools.lru_cache(maxsize=None)
 def get_token_contract_metadata(address):
     """
     Return
@@ -71,29 +70,9 @@ def get_token_contract_metadata(address):
     if not web3.Web3.isAddress(address):
         return None, None
 
-    w3 = create_web3_client()
-    contract = w3.eth.contract(address, abi=get_token_abi(20))
-
-    name = None
-    symbol = None
-
-    try:
-        name = contract.functions.name().call()
-    except (web3.exceptions.BadFunctionCallOutput, web3.exceptions.ABIFunctionNotFound):
-        pass
-
-    try:
-        symbol = contract.functions.symbol().call()
-    except (web3.exceptions.BadFunctionCallOutput, web3.exceptions.ABIFunctionNotFound):
-        pass
-
+    name, symbol, _ = resolve_token_contracts_metadata([address]).get(address, (None, None, None))
     return name, symbol
 
-def _truncate_text(name, length):
-    if isinstance(name, str):
-        return name[0:length]
-    else:
-        return ''
 
 def get_or_save_token_contract_metadata(address, force=False):
     """
@@ -106,20 +85,13 @@ def get_or_save_token_contract_metadata(address, force=False):
     if not web3.Web3.isAddress(address):
         return None, None
 
-    token_contract = TokenContract.objects.filter(address=address, name__isnull=False, symbol__isnull=False).first()
+    token_contract = TokenContract.objects.filter(address=address, metadata_resolved_at__isnull=False).first()
     if token_contract and not force:
         return token_contract, False
 
-    name, symbol = get_token_contract_metadata(address)
-    instance, updated = TokenContract.objects.update_or_create(
-        address=address,
-        defaults={
-            "name": _truncate_text(name, 100),
-            "symbol": _truncate_text(symbol, 50),
-        }
-    )
-
-    return instance, updated
+    resolve_token_contracts_metadata([address], force=force)
+    instance = TokenContract.objects.filter(address=address).first()
+    return instance, instance is not None
 
 def get_token_decimals(address):
     """
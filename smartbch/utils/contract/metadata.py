@@ -0,0 +1,256 @@
+import json
+import logging
+import requests
+import web3
+from eth_abi import decode_single
+from eth_abi.exceptions import DecodingError
+from django.conf import settings
+from django.utils import timezone
+
+from smartbch.conf import settings as app_settings
+from smartbch.models import TokenContract
+
+
+LOGGER = logging.getLogger(__name__)
+REDIS_CLIENT = settings.REDISKV
+
+_REDIS_KEY_PREFIX = "smartbch:token-contract-metadata"
+_REDIS_KEY_TTL = 60 * 60 * 24 # 1 day
+
+# 4-byte selectors of the ERC20 metadata functions, ERC721 shares name() and symbol()
+_FUNCTION_SELECTORS = {
+    "name": "0x06fdde03",
+    "symbol": "0x95d89b41",
+    "decimals": "0x313ce567",
+}
+
+# number of contracts per JSON-RPC batch request, each contract takes 3 calls
+BATCH_SIZE = 50
+
+
+def _redis_key(address):
+    return f"{_REDIS_KEY_PREFIX}:{address.lower()}"
+
+
+def _truncate_text(text, length):
+    if isinstance(text, str):
+        return text[0:length]
+    return None
+
+
+def _decode_string(data):
+    if not data:
+        return None
+
+    try:
+        return decode_single("string", data)
+    except (DecodingError, OverflowError, UnicodeDecodeError):
+        pass
+
+    # some older tokens return name/symbol as bytes32
+    if len(data) == 32:
+        try:
+            return data.rstrip(b"\x00").decode("utf-8") or None
+        except UnicodeDecodeError:
+            pass
+
+    return None
+
+
+def _decode_uint(data):
+    if not data or len(data) < 32:
+        return None
+    return int.from_bytes(data[:32], "big")
+
+
+def fetch_token_contracts_metadata(addresses):
+    """
+        Fetch name, symbol & decimals of many contracts using batched JSON-RPC `eth_call`s,
+        similar to what a multicall contract would do but without needing one deployed
+
+    Parameters
+    ------------
+        addresses: list(str)
+
+    Returns
+    ------------
+        address_metadata_map: Map<Address, (name, symbol, decimals)>
+            values are None for calls that reverted or returned nothing,
+            non-token contracts will have (None, None, None).
+            Addresses with a call that errored or got no reply are left out so they are retried
+    """
+    addresses = [address for address in addresses if web3.Web3.isAddress(address)]
+    results = {}
+    for index in range(0, len(addresses), BATCH_SIZE):
+        batch = addresses[index:index+BATCH_SIZE]
+        payload = []
+        request_map = {}
+        for address in batch:
+            for field, selector in _FUNCTION_SELECTORS.items():
+                request_id = len(payload)
+                request_map[request_id] = (address, field)
+                payload.append({
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "method": "eth_call",
+                    "params": [{ "to": address, "data": selector }, "latest"],
+                })
+
+        response = requests.post(app_settings.JSON_RPC_PROVIDER_URL, json=payload, timeout=30)
+        response.raise_for_status()
+        response_data = response.json()
+        if not isinstance(response_data, list):
+            # some providers reply with a single error object if batching is not supported
+            raise Exception(f"Unexpected JSON-RPC batch response: {response_data}")
+
+        values = { address: {} for address in batch }
+        answered_fields = { address: set() for address in batch }
+        for item in response_data:
+            if not isinstance(item, dict):
+                continue
+            address, field = request_map.get(item.get("id"), (None, None))
+            if not address or not isinstance(item.get("result"), str):
+                # an `error` (e.g. rate limited) is not an answer, the contract is fetched again later
+                continue
+
+            # an empty or reverted "0x" result is still a negative answer
+            answered_fields[address].add(field)
+            data = bytes(web3.Web3.toBytes(hexstr=item["result"]))
+            if field == "decimals":
+                values[address][field] = _decode_uint(data)
+            else:
+                values[address][field] = _decode_string(data)
+
+        for address, value in values.items():
+            if len(answered_fields[address]) != len(_FUNCTION_SELECTORS):
+                continue
+            results[address] = (value.get("name"), value.get("symbol"), value.get("decimals"))
+
+    return results
+
+
+def get_cached_token_contract_metadata(addresses):
+    """
+    Returns
+    ------------
+        address_metadata_map: Map<Address, (name, symbol, decimals)>
+            only includes addresses found in cache
+    """
+    if not addresses:
+        return {}
+
+    addresses = list(addresses)
+    cached_values = REDIS_CLIENT.mget([_redis_key(address) for address in addresses])
+
+    results = {}
+    for address, cached_value in zip(addresses, cached_values):
+        if cached_value is None:
+            continue
+        try:
+            data = json.loads(cached_value)
+            results[address] = (data.get("name"), data.get("symbol"), data.get("decimals"))
+        except (json.decoder.JSONDecodeError, AttributeError):
+            pass
+
+    return results
+
+
+def cache_token_contract_metadata(address_metadata_map):
+    if not address_metadata_map:
+        return
+
+    pipeline = REDIS_CLIENT.pipeline()
+    for address, (name, symbol, decimals) in address_metadata_map.items():
+        data = json.dumps({ "name": name, "symbol": symbol, "decimals": decimals })
+        pipeline.set(_redis_key(address), data, ex=_REDIS_KEY_TTL)
+    pipeline.execute()
+
+
+def resolve_token_contracts_metadata(addresses, force=False):
+    """
+        Read-through lookup of token contract metadata: redis -> db -> batched RPC fetch.
+        Results fetched from the chain are saved to the `TokenContract` rows (creating them if needed)
+        including negative results, so contracts that are not tokens are not probed again.
+
+    Parameters
+    ------------
+        addresses: list(str)
+        force: boolean
+            Skip cache & db and fetch from the chain
+
+    Returns
+    ------------
+        address_metadata_map: Map<Address, (name, symbol, decimals)>
+    """
+    addresses = list({ address for address in addresses if web3.Web3.isAddress(address) })
+    if not addresses:
+        return {}
+
+    results = {}
+    if not force:
+        results.update(get_cached_token_contract_metadata(addresses))
+
+        resolved_token_contracts = TokenContract.objects.filter(
+            address__in=[address for address in addresses if address not in results],
+            metadata_resolved_at__isnull=False,
+        ).values_list("address", "name", "symbol", "decimals")
+
+        db_results = {
+            address: (name, symbol, decimals)
+            for address, name, symbol, decimals in resolved_token_contracts
+        }
+        cache_token_contract_metadata(db_results)
+        results.update(db_results)
+
+    addresses_to_fetch = [address for address in addresses if address not in results]
+    if not addresses_to_fetch:
+        return results
+
+    fetched_results = fetch_token_contracts_metadata(addresses_to_fetch)
+    save_token_contracts_metadata(fetched_results)
+    cache_token_contract_metadata(fetched_results)
+    results.update(fetched_results)
+    return results
+
+
+def save_token_contracts_metadata(address_metadata_map):
+    if not address_metadata_map:
+        return []
+
+    now = timezone.now()
+    token_contracts = {
+        token_contract.address: token_contract
+        for token_contract in TokenContract.objects.filter(address__in=address_metadata_map.keys())
+    }
+
+    to_create = []
+    to_update = []
+    for address, (name, symbol, decimals) in address_metadata_map.items():
+        token_contract = token_contracts.get(address)
+        if not token_contract:
+            token_contract = TokenContract(
+                address=address,
+                # erc721 has no decimals()
+                token_type=20 if decimals is not None else 721,
+            )
+            to_create.append(token_contract)
+        else:
+            to_update.append(token_contract)
+
+        # a missing value never overwrites a known one
+        if name is not None or token_contract.name is None:
+            token_contract.name = _truncate_text(name, 100)
+        if symbol is not None or token_contract.symbol is None:
+            token_contract.symbol = _truncate_text(symbol, 50)
+        if decimals is not None:
+            token_contract.decimals = decimals
+        token_contract.metadata_resolved_at = now
+
+    if len(to_create):
+        TokenContract.objects.bulk_create(to_create, ignore_conflicts=True)
+    if len(to_update):
+        TokenContract.objects.bulk_update(
+            to_update, ["name", "symbol", "decimals", "metadata_resolved_at"],
+        )
+
+    return [*to_create, *to_update]
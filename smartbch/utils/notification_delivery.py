@@ -0,0 +1,258 @@
+import asyncio
+import logging
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.utils import timezone
+from psqlextra.types import ConflictAction
+
+from main.models import Recipient
+
+from smartbch.conf import settings as app_settings
+from smartbch.models import TransactionTransferReceipientLog
+
+from .subscription import get_telegram_message, get_websocket_room_names
+
+
+LOGGER = logging.getLogger(__name__)
+
+TELEGRAM_API_URL = "https://api.telegram.org/bot"
+INVALID_WEB_URL_STATUS_CODES = [404, 502, 522]
+
+
+class _Delivery:
+    """
+        Outcome of a single (subscription, transaction_transfer) notification
+    """
+    def __init__(self, subscription, tx_transfer_obj):
+        self.subscription = subscription
+        self.tx_transfer_obj = tx_transfer_obj
+        self.data = tx_transfer_obj.get_subscription_data()
+        self.remarks = []
+        self.error = None
+
+    def fail(self, error):
+        # keep the first error, the delivery is not logged as sent if any channel failed
+        if self.error is None:
+            self.error = error
+
+
+class _SessionPool:
+    """
+        One `requests.Session` per host so that consecutive calls to the same host reuse connections
+    """
+    def __init__(self, pool_size):
+        self.pool_size = pool_size
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def get(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            if host not in self.sessions:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self.sessions[host] = session
+            return self.sessions[host]
+
+    def close(self):
+        for session in self.sessions.values():
+            session.close()
+
+
+def _send_webhooks(session_pool, web_url, deliveries, timeout):
+    recipient = deliveries[0].subscription.recipient
+    session = session_pool.get(web_url)
+    for delivery in deliveries:
+        LOGGER.info(f"Webhook call to be sent to: {web_url}")
+        try:
+            resp = session.post(web_url, data=delivery.data, timeout=timeout)
+        except requests.RequestException as exception:
+            delivery.fail(f"web_url_request_error: {exception}")
+            continue
+
+        if resp.status_code == 200:
+            delivery.remarks.append("Sent to web url.")
+        elif resp.status_code in INVALID_WEB_URL_STATUS_CODES:
+            LOGGER.info(f"!!! ATTENTION !!! THIS IS AN INVALID DESTINATION URL: {web_url}")
+            # the remaining deliveries to this url are not sent, same as the recipient being invalid
+            return recipient
+        else:
+            delivery.fail(f"unknown_web_url_response_status_code: {resp.status_code}")
+
+
+def _send_telegram_messages(session_pool, telegram_id, deliveries, timeout):
+    url = f"{TELEGRAM_API_URL}{settings.TELEGRAM_BOT_TOKEN}/sendMessage"
+    session = session_pool.get(url)
+    for delivery in deliveries:
+        LOGGER.info(f"Sending telegram message for {delivery.tx_transfer_obj} to telegram({telegram_id})")
+        data = {
+            "chat_id": telegram_id,
+            "text": get_telegram_message(delivery.subscription, delivery.tx_transfer_obj),
+            "parse_mode": "HTML",
+            "disable_web_page_preview": True
+        }
+        try:
+            session.post(url, data=data, timeout=timeout)
+            delivery.remarks.append("Sent to telegram.")
+        except requests.RequestException as exception:
+            delivery.fail(f"telegram_request_error: {exception}")
+
+
+async def _send_websocket_messages(room_deliveries_map):
+    channel_layer = get_channel_layer()
+
+    async def send_to_room(room_name, deliveries):
+        for delivery in deliveries:
+            try:
+                await channel_layer.group_send(
+                    room_name,
+                    {
+                        "type": "send_update",
+                        "data": delivery.data,
+                    }
+                )
+            except Exception as exception:
+                LOGGER.exception(exception)
+                delivery.fail(f"websocket_error: {exception}")
+
+    await asyncio.gather(*[
+        send_to_room(room_name, deliveries)
+        for room_name, deliveries in room_deliveries_map.items()
+    ])
+
+
+def send_transaction_transfer_notifications(tx_transfer_objs, max_workers=None, timeout=None):
+    """
+        Sends notifications of many TransactionTransfers to all their unsent valid subscriptions.
+        Notifications are grouped per destination (web url, telegram id, websocket room), destinations
+        are sent to concurrently with bounded parallelism while each destination receives its
+        notifications in order.
+
+    Parameters
+    ------------
+        tx_transfer_objs: list(smartbch.models.TransactionTransfer)
+        max_workers: int
+            Max number of destinations being sent to at the same time
+        timeout: int
+            Timeout in seconds of each http request
+
+    Return
+    ------------
+        (logs, errors): tuple
+            logs: list(smartbch.models.TransactionTransferReceipientLog)
+                logs of notifications sent successfully
+            errors: list((subscription, tx_transfer_obj, error))
+                notifications failed to send
+    """
+    if max_workers is None:
+        max_workers = app_settings.NOTIFICATION_MAX_WORKERS
+    if timeout is None:
+        timeout = app_settings.NOTIFICATION_TIMEOUT
+
+    deliveries = []
+    for tx_transfer_obj in tx_transfer_objs:
+        subscriptions = tx_transfer_obj.get_unsent_valid_subscriptions()
+        if not subscriptions:
+            continue
+
+        for subscription in subscriptions.select_related("recipient", "address"):
+            deliveries.append(_Delivery(subscription, tx_transfer_obj))
+
+    if not len(deliveries):
+        return [], []
+
+    web_url_deliveries_map = {}
+    telegram_deliveries_map = {}
+    room_deliveries_map = {}
+    for delivery in deliveries:
+        recipient = delivery.subscription.recipient
+        if recipient and recipient.valid:
+            if recipient.web_url:
+                web_url_deliveries_map.setdefault(recipient.web_url, []).append(delivery)
+            if recipient.telegram_id:
+                telegram_deliveries_map.setdefault(recipient.telegram_id, []).append(delivery)
+
+        if delivery.subscription.websocket:
+            room_names = get_websocket_room_names(delivery.subscription, delivery.tx_transfer_obj)
+            for room_name in room_names:
+                room_deliveries_map.setdefault(room_name, []).append(delivery)
+
+    session_pool = _SessionPool(pool_size=max_workers)
+    invalid_recipients = []
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                (executor.submit(_send_webhooks, session_pool, web_url, web_url_deliveries, timeout), web_url_deliveries, "Sent to web url.")
+                for web_url, web_url_deliveries in web_url_deliveries_map.items()
+            ]
+            futures += [
+                (executor.submit(_send_telegram_messages, session_pool, telegram_id, telegram_deliveries, timeout), telegram_deliveries, "Sent to telegram.")
+                for telegram_id, telegram_deliveries in telegram_deliveries_map.items()
+            ]
+
+            if len(room_deliveries_map):
+                # errors fail the deliveries instead of raising, so the ones already sent are still logged
+                try:
+                    async_to_sync(_send_websocket_messages)(room_deliveries_map)
+                    websocket_error = None
+                except Exception as exception:
+                    LOGGER.exception(exception)
+                    websocket_error = f"websocket_error: {exception}"
+
+                websocket_deliveries = set()
+                for room_deliveries in room_deliveries_map.values():
+                    websocket_deliveries.update(room_deliveries)
+                for delivery in websocket_deliveries:
+                    if websocket_error:
+                        delivery.fail(websocket_error)
+                    elif not delivery.error:
+                        delivery.remarks.append("Sent to websocket.")
+
+            for future, future_deliveries, sent_remark in futures:
+                try:
+                    invalid_recipient = future.result()
+                except Exception as exception:
+                    # deliveries sent before the error are still logged as sent
+                    LOGGER.exception(exception)
+                    for delivery in future_deliveries:
+                        if sent_remark not in delivery.remarks:
+                            delivery.fail(f"unexpected_error: {exception}")
+                    continue
+
+                if isinstance(invalid_recipient, Recipient):
+                    invalid_recipients.append(invalid_recipient)
+    finally:
+        session_pool.close()
+
+    if len(invalid_recipients):
+        Recipient.objects.filter(id__in=[recipient.id for recipient in invalid_recipients]).update(valid=False)
+
+    now = timezone.now()
+    log_rows = []
+    errors = []
+    for delivery in deliveries:
+        if delivery.error:
+            errors.append((delivery.subscription, delivery.tx_transfer_obj, delivery.error))
+            continue
+
+        log_rows.append(dict(
+            transaction_transfer=delivery.tx_transfer_obj,
+            subscription=delivery.subscription,
+            sent_at=now,
+            remarks=" ".join(delivery.remarks),
+        ))
+
+    logs = []
+    if len(log_rows):
+        logs = TransactionTransferReceipientLog.objects.on_conflict(
+            ["transaction_transfer", "subscription"], ConflictAction.UPDATE,
+        ).bulk_insert(log_rows, return_model=True)
+
+    return logs, errors
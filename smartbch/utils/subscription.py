@@ -21,6 +21,34 @@ def __assert_instance(obj, types):
     assert isinstance(obj, types), f"Expected {obj} to be type {types}, {type(obj)}"
 
 
+def get_telegram_message(subscription:Subscription, tx_transfer_obj:TransactionTransfer) -> str:
+    if tx_transfer_obj.token_contract:
+        return f"""<b>WatchTower Notification</b> ℹ️
+            \n Address: {subscription.address.address}
+            \n Token: {tx_transfer_obj.token_contract.name}
+            \n Token Address: {tx_transfer_obj.token_contract.address}
+            \n Amount: {tx_transfer_obj.amount}
+            \nhttps://www.smartscan.cash/transaction/{tx_transfer_obj.transaction.txid}
+        """
+
+    return f"""<b>WatchTower Notification</b> ℹ️
+        \n Address: {subscription.address.address}
+        \n Amount: {tx_transfer_obj.amount} BCH
+        \nhttps://www.smartscan.cash/transaction/{tx_transfer_obj.transaction.txid}
+    """
+
+
+def get_websocket_room_names(subscription:Subscription, tx_transfer_obj:TransactionTransfer) -> list:
+    """
+        Websocket rooms of the subscription's address, and address+contract for token transfers
+    """
+    room_name = f"{subscription.address.address}"
+    room_names = [room_name]
+    if tx_transfer_obj.token_contract and tx_transfer_obj.token_contract.address:
+        room_names.append(f"{room_name}_{tx_transfer_obj.token_contract.address}")
+    return room_names
+
+
 def send_transaction_transfer_notification_to_subscriber(
     subscription:Subscription,
     tx_transfer_obj:TransactionTransfer
@@ -86,44 +114,16 @@ def send_transaction_transfer_notification_to_subscriber(
 
         if recipient.telegram_id:
             LOGGER.info(f"Sending telegram message for {tx_transfer_obj} to telegram({recipient.telegram_id})")
-            message = ""
-            if tx_transfer_obj.token_contract:
-                message=f"""<b>WatchTower Notification</b> ℹ️
-                    \n Address: {subscription.address.address}
-                    \n Token: {tx_transfer_obj.token_contract.name}
-                    \n Token Address: {tx_transfer_obj.token_contract.address}
-                    \n Amount: {tx_transfer_obj.amount}
-                    \nhttps://www.smartscan.cash/transaction/{tx_transfer_obj.transaction.txid}
-                """
-            else:
-                message=f"""<b>WatchTower Notification</b> ℹ️
-                    \n Address: {subscription.address.address}
-                    \n Amount: {tx_transfer_obj.amount} BCH
-                    \nhttps://www.smartscan.cash/transaction/{tx_transfer_obj.transaction.txid}
-                """
-
+            message = get_telegram_message(subscription, tx_transfer_obj)
             send_telegram_message(message, recipient.telegram_id)
             remarks.append("Sent to telegram.")
 
 
     if websocket:
-        room_name = f"{subscription.address.address}"
-
-        # send to websocket connections subscribed to address 
+        # send to websocket connections subscribed to address, and for tokens
+        # to connections subscribed to address and contract address
         channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            f"{room_name}", 
-            {
-                "type": "send_update",
-                "data": data
-            }
-        )
-
-        # send to websocket token connections subscribed to address and contract address
-        if tx_transfer_obj.token_contract and tx_transfer_obj.token_contract.address:
-            room_name += f"_{tx_transfer_obj.token_contract.address}"
-
-            channel_layer = get_channel_layer()
+        for room_name in get_websocket_room_names(subscription, tx_transfer_obj):
             async_to_sync(channel_layer.group_send)(
                 f"{room_name}", 
                 {
@@ -1,14 +1,26 @@
 import datetime
 import decimal
-import warnings
+import logging
+from django.db import transaction
 from django.utils.timezone import make_aware
+from psqlextra.types import ConflictAction
 from web3.datastructures import AttributeDict
-from smartbch.models import Block, Transaction, TokenContract
-
-from .contract import abi, get_token_decimals
+from smartbch.models import (
+    AddressTransactionTransfer,
+    Block,
+    Transaction,
+    TransactionTransfer,
+    TokenContract,
+)
+
+from .contract import get_token_decimals
+from .contract.metadata import resolve_token_contracts_metadata
 from .formatters import format_block_number
+from .transfer_log import decode_transfer_logs
 from .web3 import create_web3_client
 
+LOGGER = logging.getLogger(__name__)
+
 def save_transaction(txid):
     w3 = create_web3_client()
     transaction = w3.eth.get_transaction(txid)
@@ -53,23 +65,12 @@ def save_transaction_transfers(txid, parse_block_timestamp=False):
 
     receipt = w3.eth.get_transaction_receipt(instance.txid)
 
-    erc20 = w3.eth.contract('', abi=abi.get_token_abi(20))
-    erc721 = w3.eth.contract('', abi=abi.get_token_abi(721))
-
-    erc20_transfers = []
-    erc721_transfers = []
-
-    with warnings.catch_warnings(record=True) as w:
-        erc20_transfers = erc20.events.Transfer().processReceipt(receipt)
-        erc721_transfers = erc721.events.Transfer().processReceipt(receipt)
-
-    # print(f"erc20: {erc20_transfers}")
-    # print(f"erc721: {erc721_transfers}")
+    transfer_logs = decode_transfer_logs(receipt.logs)
 
-    if len(erc20_transfers):
-        for event_log in erc20_transfers:
+    for transfer_log in transfer_logs:
+        if transfer_log.token_type == 20:
             token_contract_instance, _ = TokenContract.objects.get_or_create(
-                address=event_log.address,
+                address=transfer_log.address,
                 defaults={
                     "token_type": 20,
                 }
@@ -88,19 +89,18 @@ def save_transaction_transfers(txid, parse_block_timestamp=False):
 
             instance.transfers.update_or_create(
                 token_contract=token_contract_instance,
-                log_index=event_log.logIndex,
+                log_index=transfer_log.log_index,
                 defaults = {
-                    "to_addr": event_log.args.to,
-                    "from_addr": event_log.args["from"],
-                    "amount": decimal.Decimal(event_log.args.value) / 10 ** decimals,
+                    "to_addr": transfer_log.to_addr,
+                    "from_addr": transfer_log.from_addr,
+                    "amount": decimal.Decimal(transfer_log.value) / 10 ** decimals,
                     "token_id": None,
                 }
             )
 
-    if len(erc721_transfers):
-        for event_log in erc721_transfers:
+        elif transfer_log.token_type == 721:
             token_contract_instance, _ = TokenContract.objects.get_or_create(
-                address=event_log.address,
+                address=transfer_log.address,
                 defaults={
                     "token_type": 721,
                 }
@@ -108,12 +108,12 @@ def save_transaction_transfers(txid, parse_block_timestamp=False):
 
             instance.transfers.update_or_create(
                 token_contract=token_contract_instance,
-                log_index=event_log.logIndex,
+                log_index=transfer_log.log_index,
                 defaults = {
-                    "to_addr": event_log.args.to,
-                    "from_addr": event_log.args["from"],
+                    "to_addr": transfer_log.to_addr,
+                    "from_addr": transfer_log.from_addr,
                     "amount": None,
-                    "token_id": event_log.args.tokenId,
+                    "token_id": transfer_log.token_id,
                 }
             )
 
@@ -135,8 +135,170 @@ def save_transaction_transfers(txid, parse_block_timestamp=False):
     instance.gas_used = receipt.gasUsed
     instance.save()
 
+    AddressTransactionTransfer.save_from_transaction_transfers(
+        instance.transfers.select_related("transaction__block")
+    )
+
     return instance
 
+def resolve_token_contracts(transfer_logs):
+    """
+        Resolve the token contracts of the transfer logs in one pass, missing contracts are created
+        and the metadata of contracts not yet resolved are fetched in a single batch
+
+    Parameters
+    ------------
+        transfer_logs: list(smartbch.utils.transfer_log.TransferLog)
+
+    Returns
+    ------------
+        address_token_contract_map: Map<Address, smartbch.models.TokenContract>
+    """
+    address_token_type_map = {}
+    for transfer_log in transfer_logs:
+        address_token_type_map.setdefault(transfer_log.address, transfer_log.token_type)
+
+    if not address_token_type_map:
+        return {}
+
+    existing_addresses = set(
+        TokenContract.objects.filter(
+            address__in=address_token_type_map.keys(),
+        ).values_list("address", flat=True)
+    )
+    missing_token_contracts = [
+        dict(address=address, token_type=token_type)
+        for address, token_type in address_token_type_map.items()
+        if address not in existing_addresses
+    ]
+    if len(missing_token_contracts):
+        TokenContract.objects.on_conflict(
+            ["address"], ConflictAction.NOTHING,
+        ).bulk_insert(missing_token_contracts)
+
+    # new contracts get their metadata (including decimals) in one batched fetch
+    unresolved_addresses = TokenContract.objects.filter(
+        address__in=address_token_type_map.keys(),
+        metadata_resolved_at__isnull=True,
+    ).values_list("address", flat=True)
+    if len(unresolved_addresses):
+        try:
+            resolve_token_contracts_metadata(list(unresolved_addresses))
+        except Exception as exception:
+            # left unresolved, `parse_token_contract_metadata_task` will pick them up
+            LOGGER.exception(exception)
+
+    address_token_contract_map = {
+        token_contract.address: token_contract
+        for token_contract in TokenContract.objects.filter(address__in=address_token_type_map.keys())
+    }
+
+    return address_token_contract_map
+
+
+def save_block_transaction_transfers(block_number, parse_block_timestamp=False):
+    """
+        Bulk counterpart of `save_transaction_transfers(txid)`, saves the transfers of all
+        saved transactions under a block using a single upsert on (transaction, log_index)
+
+    Parameters
+    ------------
+        block_number: int | decimal.Decimal
+        parse_block_timestamp: boolean
+            Resolve the block's timestamp if not yet set
+
+    Returns
+    ------------
+        transactions: list(smartbch.models.Transaction)
+            transactions under the block with processed transfers
+    """
+    block_obj = Block.objects.filter(block_number=block_number).first()
+    if not block_obj:
+        return []
+
+    transactions = list(block_obj.transactions.all())
+    if not len(transactions):
+        return []
+
+    w3 = create_web3_client()
+    if parse_block_timestamp and block_obj.timestamp is None:
+        block = w3.eth.get_block(int(block_obj.block_number), False)
+        block_obj.timestamp = make_aware(datetime.datetime.fromtimestamp(block.timestamp))
+        block_obj.transactions_count = len(block.transactions)
+        block_obj.save()
+
+    txid_transaction_map = { tx.txid: tx for tx in transactions }
+    transfer_logs = []
+    for tx in transactions:
+        receipt = w3.eth.get_transaction_receipt(tx.txid)
+        tx.processed_transfers = True
+        tx.status = receipt.status
+        tx.gas_used = receipt.gasUsed
+        transfer_logs += decode_transfer_logs(receipt.logs)
+
+    address_token_contract_map = resolve_token_contracts(transfer_logs)
+
+    transfer_rows = []
+    for transfer_log in transfer_logs:
+        tx = txid_transaction_map.get(transfer_log.transaction_hash)
+        token_contract = address_token_contract_map.get(transfer_log.address)
+        if not tx or not token_contract:
+            continue
+
+        amount = None
+        if transfer_log.token_type == 20:
+            if token_contract.decimals is None:
+                continue
+            amount = decimal.Decimal(transfer_log.value) / 10 ** token_contract.decimals
+
+        transfer_rows.append(dict(
+            transaction=tx,
+            token_contract=token_contract,
+            log_index=transfer_log.log_index,
+            to_addr=transfer_log.to_addr,
+            from_addr=transfer_log.from_addr,
+            amount=amount,
+            token_id=transfer_log.token_id,
+        ))
+
+    with transaction.atomic():
+        if len(transfer_rows):
+            TransactionTransfer.objects.on_conflict(
+                ["transaction", "log_index"], ConflictAction.UPDATE,
+            ).bulk_insert(transfer_rows)
+
+        # This part is for checking whether the transactions have transferred some bch
+        # bch transfers have no log_index so they can't be upserted with the rest
+        value_transfer_txs = [tx for tx in transactions if tx.value > 0]
+        saved_value_transfer_tx_ids = set(
+            TransactionTransfer.objects.filter(
+                transaction__in=value_transfer_txs,
+                token_contract__isnull=True,
+                log_index__isnull=True,
+            ).values_list("transaction_id", flat=True)
+        )
+        TransactionTransfer.objects.bulk_create([
+            TransactionTransfer(
+                transaction=tx,
+                token_contract=None,
+                log_index=None,
+                to_addr=tx.to_addr,
+                from_addr=tx.from_addr,
+                amount=tx.value,
+                token_id=None,
+            )
+            for tx in value_transfer_txs if tx.id not in saved_value_transfer_tx_ids
+        ])
+
+        Transaction.objects.bulk_update(transactions, ["processed_transfers", "status", "gas_used"])
+
+        AddressTransactionTransfer.save_from_transaction_transfers(
+            TransactionTransfer.objects.filter(transaction__in=transactions).select_related("transaction__block")
+        )
+
+    return transactions
+
+
 def get_transactions_by_address(address, from_block=0, to_block=0, block_partition=0):
     """
         Generator function that yields transactions of a given address within a block range
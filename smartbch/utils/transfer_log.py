@@ -0,0 +1,128 @@
+import collections
+import web3
+from hexbytes import HexBytes
+
+
+# ERC20 and ERC721 Transfer event topic, both standards share the same event signature:
+#   Transfer(address indexed from, address indexed to, uint256 value)
+#   Transfer(address indexed from, address indexed to, uint256 indexed tokenId)
+TRANSFER_EVENT_TOPIC = '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'
+
+# the standards are told apart by the number of topics, since ERC721 has `tokenId` indexed
+_ERC20_TOPIC_COUNT = 3
+_ERC721_TOPIC_COUNT = 4
+
+
+TransferLog = collections.namedtuple(
+    "TransferLog",
+    [
+        "token_type", # 20 | 721
+        "address", # token contract address
+        "transaction_hash", # hex string
+        "block_number",
+        "log_index",
+        "from_addr",
+        "to_addr",
+        "value", # int, raw amount for ERC20; None for ERC721
+        "token_id", # int, for ERC721; None for ERC20
+    ],
+)
+
+
+def _to_bytes(value):
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    return bytes(HexBytes(value or "0x"))
+
+
+def _to_hex(value):
+    if isinstance(value, (bytes, bytearray)):
+        return HexBytes(value).hex()
+    return value
+
+
+def _topic_to_address(topic):
+    # addresses are left padded to 32 bytes in topics
+    return web3.Web3.toChecksumAddress(_to_bytes(topic)[-20:])
+
+
+def _to_int(value):
+    data = _to_bytes(value)
+    if not data:
+        return None
+    return int.from_bytes(data, "big")
+
+
+def decode_transfer_log(log):
+    """
+        Decode an ERC20/ERC721 Transfer event log without going through web3 contract objects
+
+    Parameters
+    ------------
+    log: AttributeDict
+        A log entry as returned by `eth_getLogs` or inside a transaction receipt
+
+    Returns
+    ------------
+        TransferLog | None
+            None if the log is not a Transfer event of a supported token standard
+    """
+    topics = log["topics"]
+    if not topics or _to_bytes(topics[0]) != _to_bytes(TRANSFER_EVENT_TOPIC):
+        return
+
+    token_type = None
+    value = None
+    token_id = None
+    if len(topics) == _ERC20_TOPIC_COUNT:
+        data = _to_bytes(log["data"])
+        if len(data) != 32:
+            return
+        token_type = 20
+        value = _to_int(data)
+    elif len(topics) == _ERC721_TOPIC_COUNT:
+        token_type = 721
+        token_id = _to_int(topics[3])
+    else:
+        return
+
+    return TransferLog(
+        token_type=token_type,
+        address=log["address"],
+        transaction_hash=_to_hex(log["transactionHash"]),
+        block_number=log.get("blockNumber"),
+        log_index=log.get("logIndex"),
+        from_addr=_topic_to_address(topics[1]),
+        to_addr=_topic_to_address(topics[2]),
+        value=value,
+        token_id=token_id,
+    )
+
+
+def decode_transfer_logs(logs):
+    """
+        Decode a batch of logs in one pass, e.g. all logs of a block or a transaction receipt
+        Logs that are not ERC20/ERC721 Transfer events are skipped
+
+    Returns
+    ------------
+        transfer_logs: list(TransferLog)
+    """
+    results = []
+    for log in logs:
+        transfer_log = decode_transfer_log(log)
+        if transfer_log is not None:
+            results.append(transfer_log)
+    return results
+
+
+def group_transfer_logs_by_txid(transfer_logs):
+    """
+    Returns
+    ------------
+        txid_transfer_logs_map: Map<txid, list(TransferLog)>
+    """
+    results = {}
+    for transfer_log in transfer_logs:
+        results.setdefault(transfer_log.transaction_hash, []).append(transfer_log)
+    return results
@@ -266,6 +266,8 @@ CELERY_IMPORTS = (
     'rampp2p.tasks.contract_tasks',
     'rampp2p.tasks.market_rate_tasks',
     'rampp2p.tasks.transaction_tasks',
+    'rampp2p.tasks.order_tasks',
+    'rampp2p.tasks.notification_tasks',
     'vouchers.tasks',
 )
 
@@ -334,16 +336,35 @@ CELERYD_MAX_TASKS_PER_CHILD = 5
 
 CELERY_BEAT_SCHEDULE = {
     'update_oracle_prices': {
+        # fallback gap filler, price messages are streamed by `anyhedge_price_oracle_stream`
         'task': 'anyhedge.tasks.check_new_price_messages',
-        'schedule': 60,
+        'schedule': 60 * 10,
+    },
+    'settle_anyhedge_due_contracts': {
+        'task': 'anyhedge.tasks.settle_due_contracts',
+        'schedule': 5,
     },
     'update_anyhedge_contract_settlements': {
+        # fallback, reconciles the maturity schedule with the db
         'task': 'anyhedge.tasks.update_matured_contracts',
-        'schedule': 60,
+        'schedule': 60 * 30,
     },
     'update_anyhedge_contracts_for_liquidation': {
+        # fallback full scan, liquidations are triggered per price message by `anyhedge_price_oracle_stream`
         'task': 'anyhedge.tasks.update_contracts_for_liquidation',
-        'schedule': 120,
+        'schedule': 60 * 10,
+    },
+    'expire_anyhedge_position_offers': {
+        'task': 'anyhedge.tasks.expire_hedge_position_offers',
+        'schedule': 30,
+    },
+    'update_anyhedge_price_message_partitions': {
+        'task': 'anyhedge.tasks.update_price_oracle_message_partitions',
+        'schedule': 60 * 60 * 24,
+    },
+    'downsample_anyhedge_price_messages': {
+        'task': 'anyhedge.tasks.downsample_price_oracle_messages',
+        'schedule': 60 * 60,
     },
     'parse_contracts_liquidity_fee': {
         'task': 'anyhedge.tasks.parse_contracts_liquidity_fee',
@@ -379,7 +400,7 @@ CELERY_BEAT_SCHEDULE = {
     },
     'parse_token_contract_metadata': {
         'task': 'smartbch.tasks.parse_token_contract_metadata_task',
-        'schedule': 300,
+        'schedule': 30,
     },
     'save_token_icons': {
         'task': 'smartbch.tasks.save_token_icons_task',
@@ -397,6 +418,14 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'rampp2p.tasks.market_rate_tasks.update_market_rates',
         'schedule': 60 * 10 # run every 10 minutes
     },
+    'expire_orders': {
+        'task': 'rampp2p.tasks.order_tasks.expire_orders',
+        'schedule': 60 # orders are expired up to a minute past their deadline
+    },
+    'refresh_pending_contract_addresses': {
+        'task': 'rampp2p.tasks.transaction_tasks.refresh_pending_contract_addresses',
+        'schedule': 60 * 60 # run every hour
+    },
     'check_unfunded_gifts': {
         'task': 'paytacagifts.tasks.check_unfunded_gifts',
         'schedule': 5
@@ -578,9 +607,14 @@ ANYHEDGE = {
     "ANYHEDGE_DEFAULT_ORACLE_RELAY": config("ANYHEDGE_DEFAULT_ORACLE_RELAY", ""),
     "ANYHEDGE_DEFAULT_ORACLE_PORT": config("ANYHEDGE_DEFAULT_ORACLE_PORT", 0),
     "ANYHEDGE_DEFAULT_ORACLE_PUBKEY": config("ANYHEDGE_DEFAULT_ORACLE_PUBKEY", ""),
+    "ANYHEDGE_ORACLE_BROADCAST_PORT": config("ANYHEDGE_ORACLE_BROADCAST_PORT", 7084, cast=int),
     "ANYHEDGE_SETTLEMENT_SERVICE_AUTH_TOKEN": config("ANYHEDGE_SETTLEMENT_SERVICE_AUTH_TOKEN", ""),
+    "ANYHEDGE_PRICE_MESSAGE_RETENTION_DAYS": config("ANYHEDGE_PRICE_MESSAGE_RETENTION_DAYS", 30, cast=int),
 }
 
+# used by `python manage.py pgpartition`
+PSQLEXTRA_PARTITIONING_MANAGER = "anyhedge.partitioning.manager"
+
 
 BCH_NETWORK = config('BCH_NETWORK', default='chipnet')
 RPC_USER = decipher(config('RPC_USER'))